@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0001_initial'),
+        # 考试记录已迁移至 submissions.Submission
+        ('submissions', '0002_submission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='is_time_limited',
+            field=models.BooleanField(default=True, help_text='是否启用考试时间限制', verbose_name='是否限时'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='examrecord',
+            unique_together=set(),
+        ),
+        migrations.DeleteModel(
+            name='ExamRecord',
+        ),
+    ]
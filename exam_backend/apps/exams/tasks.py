@@ -14,6 +14,7 @@ def cleanup_expired_exams():
     """
     from apps.exams.models import Exam
     from apps.submissions.models import Submission
+    from apps.submissions.signals import submission_submitted
 
     now = timezone.now()
 
@@ -42,6 +43,7 @@ def cleanup_expired_exams():
                 record.status = Submission.Status.TIMEOUT
                 record.end_time = now
                 record.save(update_fields=['status', 'end_time'])
+                submission_submitted.send(sender=Submission, submission=record)
 
 
 @shared_task
@@ -59,6 +61,9 @@ def auto_submit_exam(submission_id):
             submission.end_time = timezone.now()
             submission.save(update_fields=['status', 'end_time'])
 
+            from apps.submissions.signals import submission_submitted
+            submission_submitted.send(sender=Submission, submission=submission)
+
             # 触发自动阅卷
             from apps.grading.tasks import auto_grade_submission
             auto_grade_submission.delay(submission_id)
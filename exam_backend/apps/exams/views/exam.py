@@ -21,6 +21,7 @@ from apps.exams.serializers import (
 )
 from apps.submissions.models import Submission
 from apps.submissions.serializers import SubmissionSerializer
+from apps.submissions.signals import submission_started
 from apps.papers.serializers import PaperExamSerializer
 from utils.exceptions import (
     ExamNotStartedException,
@@ -136,6 +137,7 @@ class ExamViewSet(MultiSerializerMixin, MultiPermissionMixin, viewsets.ModelView
                 user_agent=request.META.get('HTTP_USER_AGENT', ''),
                 question_order=question_order,
             )
+            submission_started.send(sender=Submission, submission=record)
 
         serializer = ExamPaperSerializer(record)
         return Response({
@@ -3,7 +3,7 @@ Grading Admin
 """
 from django.contrib import admin
 
-from apps.grading.models import GradingTask
+from apps.grading.models import ExamGradingCounter, GradingTask, PlagiarismMatch
 
 
 @admin.register(GradingTask)
@@ -12,3 +12,18 @@ class GradingTaskAdmin(admin.ModelAdmin):
     list_filter = ['status', 'exam']
     search_fields = ['exam__title', 'grader__username']
     ordering = ['-created_at']
+
+
+@admin.register(ExamGradingCounter)
+class ExamGradingCounterAdmin(admin.ModelAdmin):
+    list_display = ['id', 'exam', 'submission_count', 'pending_count', 'updated_at']
+    search_fields = ['exam__title']
+    ordering = ['-updated_at']
+
+
+@admin.register(PlagiarismMatch)
+class PlagiarismMatchAdmin(admin.ModelAdmin):
+    list_display = ['id', 'exam', 'paper_question', 'answer', 'matched_answer', 'similarity', 'created_at']
+    list_filter = ['exam']
+    ordering = ['-similarity']
+    raw_id_fields = ['answer', 'matched_answer']
@@ -5,3 +5,6 @@ class GradingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.grading'
     verbose_name = '阅卷管理'
+
+    def ready(self):
+        from apps.grading import receivers  # noqa: F401
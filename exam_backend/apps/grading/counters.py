@@ -0,0 +1,96 @@
+"""
+阅卷计数器维护
+按考试记录待批改主观题数量与提交记录数量：交卷、批改时增量更新，
+必要时通过分组聚合整体重建
+"""
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from apps.grading.models import ExamGradingCounter
+from apps.submissions.models import Answer, Submission
+
+SUBJECTIVE_TYPES = ['short', 'programming', 'blank']
+
+PENDING_STATUSES = [Answer.Status.ANSWERED, Answer.Status.MARKED]
+
+# 已交卷的提交记录，其中的主观题才计入待批改
+SUBMITTED_STATUSES = [
+    Submission.Status.SUBMITTED,
+    Submission.Status.TIMEOUT,
+    Submission.Status.GRADING,
+    Submission.Status.FINISHED,
+]
+
+
+def pending_answers():
+    """待批改主观题查询集"""
+    return Answer.objects.filter(
+        paper_question__question__type__in=SUBJECTIVE_TYPES,
+        status__in=PENDING_STATUSES,
+        submission__status__in=SUBMITTED_STATUSES,
+    )
+
+
+def increment(exam_id, submission_count=0, pending_count=0):
+    """
+    原子地调整计数器（可为负数，结果不小于 0）
+    """
+    values = {}
+    if submission_count:
+        values['submission_count'] = Greatest(F('submission_count') + submission_count, 0)
+    if pending_count:
+        values['pending_count'] = Greatest(F('pending_count') + pending_count, 0)
+    if not values:
+        return
+
+    if not ExamGradingCounter.objects.filter(exam_id=exam_id).update(**values):
+        ExamGradingCounter.objects.get_or_create(exam_id=exam_id)
+        ExamGradingCounter.objects.filter(exam_id=exam_id).update(**values)
+
+
+def rebuild(exam_ids=None):
+    """
+    使用分组聚合重建计数器
+
+    Args:
+        exam_ids: 需要重建的考试 ID 列表，None 表示全部
+
+    Returns:
+        重建的计数器数量
+    """
+    submissions = Submission.objects.order_by()
+    answers = pending_answers().order_by()
+    if exam_ids is not None:
+        submissions = submissions.filter(exam_id__in=exam_ids)
+        answers = answers.filter(submission__exam_id__in=exam_ids)
+
+    submission_counts = dict(
+        submissions.values('exam_id').annotate(total=Count('id')).values_list('exam_id', 'total')
+    )
+    pending_counts = dict(
+        answers.values('submission__exam_id').annotate(total=Count('id'))
+        .values_list('submission__exam_id', 'total')
+    )
+
+    target_ids = set(exam_ids) if exam_ids is not None else set(submission_counts) | set(pending_counts)
+
+    stale = ExamGradingCounter.objects.exclude(exam_id__in=target_ids)
+    if exam_ids is None:
+        stale.update(submission_count=0, pending_count=0)
+
+    counters = [
+        ExamGradingCounter(
+            exam_id=exam_id,
+            submission_count=submission_counts.get(exam_id, 0),
+            pending_count=pending_counts.get(exam_id, 0),
+        )
+        for exam_id in target_ids
+    ]
+    ExamGradingCounter.objects.bulk_create(
+        counters,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['exam'],
+        update_fields=['submission_count', 'pending_count', 'updated_at'],
+    )
+    return len(counters)
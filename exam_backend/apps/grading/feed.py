@@ -0,0 +1,134 @@
+"""
+阅卷答案流
+按 (paper_question_id, id) 做键集分页，并将下一页预取到阅卷人的缓存中
+"""
+import base64
+import binascii
+
+from django.core.cache import cache
+from django.db.models import Q, Sum
+
+from apps.grading import counters
+from apps.grading.models import ExamGradingCounter
+from apps.grading.serializers import AnswerToGradeSerializer
+from apps.submissions.models import Answer
+from utils.exceptions import InvalidOperationException
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# 预取页的缓存时间（秒），过期后回源数据库
+PREFETCH_TIMEOUT = 300
+
+
+def encode_cursor(paper_question_id, answer_id):
+    """将排序键编码为不透明游标"""
+    raw = f'{paper_question_id}:{answer_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    """解析游标，返回 (paper_question_id, answer_id)"""
+    try:
+        paper_question_id, answer_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return int(paper_question_id), int(answer_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidOperationException('无效的分页游标')
+
+
+def cache_key(grader_id, exam_id, question_id, cursor, page_size):
+    return f'grading:feed:{grader_id}:{exam_id or "-"}:{question_id or "-"}:{page_size}:{cursor or "-"}'
+
+
+def build_queryset(exam_id=None, question_id=None):
+    """
+    待批改答案查询集，按 (paper_question_id, id) 排序
+    与阅卷计数器口径一致：只含已交卷提交记录、未删除考试的答案
+    """
+    queryset = Answer.objects.filter(
+        status__in=counters.PENDING_STATUSES,
+        submission__status__in=counters.SUBMITTED_STATUSES,
+        submission__exam__is_deleted=False,
+    ).select_related(
+        'submission', 'submission__user',
+        'paper_question', 'paper_question__question'
+    )
+
+    if exam_id:
+        queryset = queryset.filter(submission__exam_id=exam_id)
+
+    if question_id:
+        queryset = queryset.filter(paper_question__question_id=question_id)
+    else:
+        # 只获取主观题
+        queryset = queryset.filter(paper_question__question__type__in=counters.SUBJECTIVE_TYPES)
+
+    return queryset.order_by('paper_question_id', 'id')
+
+
+def fetch_page(exam_id=None, question_id=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    从数据库读取一页待批改答案（单次查询）
+
+    Returns:
+        {'results': [...], 'next_cursor': str | None}
+    """
+    queryset = build_queryset(exam_id, question_id)
+
+    if cursor:
+        paper_question_id, answer_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(paper_question_id__gt=paper_question_id) |
+            Q(paper_question_id=paper_question_id, id__gt=answer_id)
+        )
+
+    answers = list(queryset[:page_size + 1])
+    has_more = len(answers) > page_size
+    answers = answers[:page_size]
+
+    next_cursor = None
+    if has_more:
+        last = answers[-1]
+        next_cursor = encode_cursor(last.paper_question_id, last.id)
+
+    return {
+        'results': AnswerToGradeSerializer(answers, many=True).data,
+        'next_cursor': next_cursor,
+    }
+
+
+def get_page(grader_id, exam_id=None, question_id=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    获取一页待批改答案，优先使用预取缓存
+
+    Returns:
+        (page, from_cache)
+    """
+    key = cache_key(grader_id, exam_id, question_id, cursor, page_size)
+    page = cache.get(key)
+    if page is not None:
+        cache.delete(key)
+        return page, True
+    return fetch_page(exam_id, question_id, cursor, page_size), False
+
+
+def prefetch_page(grader_id, exam_id=None, question_id=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """读取指定页并写入阅卷人的预取缓存"""
+    page = fetch_page(exam_id, question_id, cursor, page_size)
+    cache.set(cache_key(grader_id, exam_id, question_id, cursor, page_size), page, PREFETCH_TIMEOUT)
+    return page
+
+
+def estimated_total(exam_id=None, question_id=None):
+    """
+    根据阅卷计数器估算待批改总数，避免对多表连接执行 COUNT
+
+    Returns:
+        待批改数；按题目过滤时计数器无法给出，返回 None
+    """
+    if question_id:
+        return None
+    queryset = ExamGradingCounter.objects.filter(exam__is_deleted=False)
+    if exam_id:
+        queryset = queryset.filter(exam_id=exam_id)
+    return queryset.aggregate(total=Sum('pending_count'))['total'] or 0
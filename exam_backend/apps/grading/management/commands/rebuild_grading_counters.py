@@ -0,0 +1,23 @@
+"""
+重建考试阅卷计数器
+"""
+from django.core.management.base import BaseCommand
+
+from apps.grading import counters
+
+
+class Command(BaseCommand):
+    help = '使用分组聚合重建考试的待批改数与提交记录数'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--exam',
+            type=int,
+            action='append',
+            dest='exam_ids',
+            help='仅重建指定考试，可重复指定',
+        )
+
+    def handle(self, *args, **options):
+        count = counters.rebuild(options['exam_ids'])
+        self.stdout.write(self.style.SUCCESS(f'已重建 {count} 个考试的阅卷计数器'))
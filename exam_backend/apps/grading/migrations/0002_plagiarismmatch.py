@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0002_submission'),
+        ('exams', '0002_exam_is_time_limited_delete_examrecord'),
+        ('papers', '0001_initial'),
+        ('grading', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlagiarismMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('similarity', models.FloatField(help_text='MinHash 估计的 Jaccard 相似度', verbose_name='相似度')),
+                ('answer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plagiarism_matches', to='submissions.answer', verbose_name='答案')),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plagiarism_matches', to='exams.exam', verbose_name='考试')),
+                ('matched_answer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='submissions.answer', verbose_name='相似答案')),
+                ('paper_question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plagiarism_matches', to='papers.paperquestion', verbose_name='试卷题目')),
+            ],
+            options={
+                'verbose_name': '答案查重结果',
+                'verbose_name_plural': '答案查重结果',
+                'db_table': 'plagiarism_matches',
+                'ordering': ['-similarity'],
+                'indexes': [models.Index(fields=['exam', 'paper_question'], name='plagiarism__exam_id_5b1673_idx')],
+            },
+        ),
+    ]
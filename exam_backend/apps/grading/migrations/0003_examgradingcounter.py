@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_counters(apps, schema_editor):
+    """按现有数据初始化阅卷计数器"""
+    Submission = apps.get_model('submissions', 'Submission')
+    Answer = apps.get_model('submissions', 'Answer')
+    ExamGradingCounter = apps.get_model('grading', 'ExamGradingCounter')
+
+    submission_counts = dict(
+        Submission.objects.order_by().values('exam_id')
+        .annotate(total=models.Count('id')).values_list('exam_id', 'total')
+    )
+    pending_counts = dict(
+        Answer.objects.order_by().filter(
+            paper_question__question__type__in=['short', 'programming', 'blank'],
+            status__in=['answered', 'marked'],
+            submission__status__in=['submitted', 'timeout', 'grading', 'finished'],
+        ).values('submission__exam_id').annotate(total=models.Count('id'))
+        .values_list('submission__exam_id', 'total')
+    )
+
+    ExamGradingCounter.objects.bulk_create([
+        ExamGradingCounter(
+            exam_id=exam_id,
+            submission_count=submission_counts.get(exam_id, 0),
+            pending_count=pending_counts.get(exam_id, 0),
+        )
+        for exam_id in set(submission_counts) | set(pending_counts)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0002_exam_is_time_limited_delete_examrecord'),
+        ('grading', '0002_plagiarismmatch'),
+        ('submissions', '0002_submission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamGradingCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('submission_count', models.PositiveIntegerField(default=0, verbose_name='提交记录数')),
+                ('pending_count', models.PositiveIntegerField(default=0, verbose_name='待批改主观题数')),
+                ('exam', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='grading_counter', to='exams.exam', verbose_name='考试')),
+            ],
+            options={
+                'verbose_name': '阅卷计数器',
+                'verbose_name_plural': '阅卷计数器',
+                'db_table': 'exam_grading_counters',
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -74,3 +74,70 @@ class GradingTask(TimeStampMixin, models.Model):
         if self.total_count == 0:
             return 0
         return round(self.graded_count / self.total_count * 100, 2)
+
+
+class ExamGradingCounter(TimeStampMixin, models.Model):
+    """
+    考试阅卷计数器
+    在交卷、批改时增量维护，待阅卷列表直接读取，无需逐个考试统计
+    """
+    exam = models.OneToOneField(
+        'exams.Exam',
+        on_delete=models.CASCADE,
+        related_name='grading_counter',
+        verbose_name='考试'
+    )
+    submission_count = models.PositiveIntegerField('提交记录数', default=0)
+    pending_count = models.PositiveIntegerField('待批改主观题数', default=0)
+
+    class Meta:
+        db_table = 'exam_grading_counters'
+        verbose_name = '阅卷计数器'
+        verbose_name_plural = verbose_name
+
+    def __str__(self):
+        return f'{self.exam.title} - 待批改 {self.pending_count}'
+
+
+class PlagiarismMatch(TimeStampMixin, models.Model):
+    """
+    答案查重结果
+    记录同一考试同一题目下相似度超过阈值的两份答案
+    """
+    exam = models.ForeignKey(
+        'exams.Exam',
+        on_delete=models.CASCADE,
+        related_name='plagiarism_matches',
+        verbose_name='考试'
+    )
+    paper_question = models.ForeignKey(
+        'papers.PaperQuestion',
+        on_delete=models.CASCADE,
+        related_name='plagiarism_matches',
+        verbose_name='试卷题目'
+    )
+    answer = models.ForeignKey(
+        'submissions.Answer',
+        on_delete=models.CASCADE,
+        related_name='plagiarism_matches',
+        verbose_name='答案'
+    )
+    matched_answer = models.ForeignKey(
+        'submissions.Answer',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='相似答案'
+    )
+    similarity = models.FloatField('相似度', help_text='MinHash 估计的 Jaccard 相似度')
+
+    class Meta:
+        db_table = 'plagiarism_matches'
+        verbose_name = '答案查重结果'
+        verbose_name_plural = verbose_name
+        ordering = ['-similarity']
+        indexes = [
+            models.Index(fields=['exam', 'paper_question']),
+        ]
+
+    def __str__(self):
+        return f'{self.exam.title} - 第{self.paper_question.question_number}题 ({self.similarity:.2f})'
@@ -0,0 +1,160 @@
+"""
+答案查重
+基于 MinHash 签名 + LSH 分桶，避免对同一题目的所有答案做两两比较
+"""
+import logging
+import re
+import zlib
+
+import numpy as np
+
+# 哈希函数族参数：h(x) = ((a * x + b) mod p) & 0xFFFFFFFF
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text):
+    """
+    归一化答案文本：转小写并压缩空白
+    对代码和中文都按字符处理，不依赖分词
+    """
+    return _WHITESPACE_RE.sub(' ', (text or '').lower()).strip()
+
+
+def shingle_hashes(text, k=5):
+    """
+    将文本切分为长度为 k 的字符片段（shingle），返回去重后的 32 位哈希数组
+    """
+    if len(text) <= k:
+        grams = {text}
+    else:
+        grams = {text[i:i + k] for i in range(len(text) - k + 1)}
+    return np.fromiter(
+        (zlib.crc32(gram.encode('utf-8')) for gram in grams),
+        dtype=np.uint64,
+        count=len(grams),
+    )
+
+
+def choose_bands(threshold, num_perm):
+    """
+    选择 LSH 分桶参数 (bands, rows)
+    使近似阈值 (1/b)^(1/r) 略低于目标阈值，以召回率优先，最终再用签名相似度过滤
+    """
+    target = max(threshold - 0.1, 0.05)
+    best = (num_perm, 1)
+    best_gap = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        gap = abs((1 / bands) ** (1 / rows) - target)
+        if best_gap is None or gap < best_gap:
+            best, best_gap = (bands, rows), gap
+    return best
+
+
+class MinHashLSH:
+    """
+    MinHash + LSH 相似答案检测器
+
+    用法：
+        detector = MinHashLSH(threshold=0.8)
+        pairs = detector.find_similar(texts)  # [(i, j, similarity), ...]
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, shingle_size=5,
+                 min_length=20, max_bucket_size=200, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.min_length = min_length
+        self.max_bucket_size = max_bucket_size
+        # 超过 max_bucket_size 的桶数（累计），这些桶按组上报
+        self.oversized_buckets = 0
+        self.bands, self.rows = choose_bands(threshold, num_perm)
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        """计算单个文本的 MinHash 签名"""
+        hashes = shingle_hashes(text, self.shingle_size)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def signatures(self, texts):
+        """批量计算签名，返回 (n, num_perm) 矩阵"""
+        matrix = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for i, text in enumerate(texts):
+            matrix[i] = self.signature(text)
+        return matrix
+
+    def candidate_pairs(self, matrix):
+        """
+        LSH 分桶：任一 band 完全相同的两行即为候选对
+        超过 max_bucket_size 的桶（大量雷同答案）不再两两组合，而是整组与桶内首个答案配对
+        返回形如 (n_pairs, 2) 的索引数组，i < j
+        """
+        pairs = set()
+        oversized = largest = 0
+        for band in range(self.bands):
+            block = np.ascontiguousarray(matrix[:, band * self.rows:(band + 1) * self.rows])
+            _, bucket_ids = np.unique(block, axis=0, return_inverse=True)
+            bucket_ids = bucket_ids.reshape(-1)
+            order = np.argsort(bucket_ids, kind='stable')
+            boundaries = np.flatnonzero(np.diff(bucket_ids[order])) + 1
+            for members in np.split(order, boundaries):
+                size = len(members)
+                if size < 2:
+                    continue
+                members = np.sort(members)
+                if size > self.max_bucket_size:
+                    oversized += 1
+                    largest = max(largest, size)
+                    pairs.update((int(members[0]), int(member)) for member in members[1:])
+                    continue
+                for x in range(size - 1):
+                    for y in range(x + 1, size):
+                        pairs.add((int(members[x]), int(members[y])))
+        if oversized:
+            self.oversized_buckets += oversized
+            logger.warning('查重发现 %d 个超大分桶（最大 %d 个答案），已按组上报', oversized, largest)
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.array(sorted(pairs), dtype=np.int64)
+
+    def find_similar(self, texts):
+        """
+        找出相似度不低于阈值的文本对
+
+        Args:
+            texts: 原始答案文本列表
+
+        Returns:
+            [(i, j, similarity), ...]，i、j 为 texts 中的下标，按相似度降序
+        """
+        normalized = [normalize_text(text) for text in texts]
+        indices = [i for i, text in enumerate(normalized) if len(text) >= self.min_length]
+        if len(indices) < 2:
+            return []
+
+        matrix = self.signatures([normalized[i] for i in indices])
+        pairs = self.candidate_pairs(matrix)
+        if not len(pairs):
+            return []
+
+        similarity = (matrix[pairs[:, 0]] == matrix[pairs[:, 1]]).mean(axis=1)
+        keep = similarity >= self.threshold
+
+        result = [
+            (indices[i], indices[j], round(float(sim), 4))
+            for (i, j), sim in zip(pairs[keep], similarity[keep])
+        ]
+        result.sort(key=lambda item: -item[2])
+        return result
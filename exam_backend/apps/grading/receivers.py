@@ -0,0 +1,39 @@
+"""
+阅卷模块信号处理
+"""
+from collections import Counter
+
+from django.dispatch import receiver
+
+from apps.grading import counters
+from apps.submissions.signals import answer_graded, submission_started, submission_submitted
+
+
+@receiver(submission_started)
+def count_submission(sender, submission, **kwargs):
+    """新建提交记录，计入考试提交数"""
+    counters.increment(submission.exam_id, submission_count=1)
+
+
+@receiver(submission_submitted)
+def count_pending_answers(sender, submission, **kwargs):
+    """交卷后，将其待批改主观题计入考试待批改数"""
+    pending = counters.pending_answers().filter(submission=submission).count()
+    counters.increment(submission.exam_id, pending_count=pending)
+
+
+@receiver(answer_graded)
+def release_pending_answers(sender, answers, previous, **kwargs):
+    """主观题批改完成，从考试待批改数中扣除"""
+    released = Counter()
+    for answer in answers:
+        status = previous.get(answer.id, (None,))[0]
+        if (
+            status in counters.PENDING_STATUSES
+            and answer.question.type in counters.SUBJECTIVE_TYPES
+            and answer.submission.status in counters.SUBMITTED_STATUSES
+        ):
+            released[answer.submission.exam_id] += 1
+
+    for exam_id, count in released.items():
+        counters.increment(exam_id, pending_count=-count)
@@ -0,0 +1,306 @@
+"""
+客观题评分策略
+试卷（或大题）选择评分策略，批改前按试卷编译为每道题的评分规则，
+同一道题的相同作答只计算一次，批改结果通过 bulk_update 批量写回
+
+选择题的作答编码为选项位掩码（第 i 个选项对应 1 << i，按 order、label 排序），
+评分按位比较，掩码同时写入 Answer.option_mask 供统计分析使用
+"""
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.utils import timezone
+
+from apps.papers.models import Paper, PaperQuestion
+from apps.submissions.models import Answer
+from apps.submissions.signals import answer_graded, answer_state
+
+OBJECTIVE_TYPES = ['single', 'multi', 'judge']
+
+_ZERO = Decimal('0')
+_SCORE_QUANT = Decimal('0.1')
+
+POLICIES = {}
+
+
+def register_policy(cls):
+    """注册评分策略，code 与 Paper.ScoringPolicy 的取值对应"""
+    POLICIES[cls.code] = cls()
+    return cls
+
+
+def _quantize(value):
+    return Decimal(value).quantize(_SCORE_QUANT, rounding=ROUND_HALF_UP)
+
+
+class ScoringPolicy:
+    """
+    评分策略基类
+    单选、判断题只有对错之分；多选题由子类实现 score_multi，
+    selected / correct 为选项位掩码
+    """
+    code = None
+
+    def score_choice(self, is_correct, is_blank, max_score, config):
+        """单选、判断题评分"""
+        return max_score if is_correct else _ZERO
+
+    def score_multi(self, selected, correct, max_score, config):
+        """多选题评分"""
+        raise NotImplementedError
+
+
+@register_policy
+class HalfCreditPolicy(ScoringPolicy):
+    """全对得满分，少选（非空真子集）得一半分，错选不得分"""
+    code = Paper.ScoringPolicy.HALF_CREDIT
+
+    def score_multi(self, selected, correct, max_score, config):
+        if selected == correct:
+            return max_score
+        if selected and not selected & ~correct:
+            return max_score / 2
+        return _ZERO
+
+
+@register_policy
+class AllOrNothingPolicy(ScoringPolicy):
+    """全对才得分"""
+    code = Paper.ScoringPolicy.ALL_OR_NOTHING
+
+    def score_multi(self, selected, correct, max_score, config):
+        return max_score if selected == correct else _ZERO
+
+
+@register_policy
+class ProportionalPolicy(ScoringPolicy):
+    """少选按选对的比例得分，有错选不得分"""
+    code = Paper.ScoringPolicy.PROPORTIONAL
+
+    def score_multi(self, selected, correct, max_score, config):
+        if not selected or selected & ~correct:
+            return _ZERO
+        return max_score * selected.bit_count() / correct.bit_count()
+
+
+@register_policy
+class PerOptionPenaltyPolicy(ScoringPolicy):
+    """
+    每选对一个正确选项加 满分/正确选项数，每选错一个扣 penalty 倍该分值
+    config: penalty（默认 1），allow_negative（默认 False，单题最低 0 分）
+    """
+    code = Paper.ScoringPolicy.PER_OPTION_PENALTY
+
+    def score_multi(self, selected, correct, max_score, config):
+        if not correct:
+            # 答案为空或无法解析：没有可计分的正确选项
+            return _ZERO
+        unit = max_score / correct.bit_count()
+        penalty = Decimal(str(config.get('penalty', 1)))
+        score = unit * (selected & correct).bit_count() - unit * penalty * (selected & ~correct).bit_count()
+        if not config.get('allow_negative', False):
+            score = max(score, _ZERO)
+        return score
+
+
+@register_policy
+class NegativeMarkingPolicy(ScoringPolicy):
+    """
+    答对得满分，未作答不得分，答错倒扣 penalty 倍满分
+    config: penalty（默认 0.25）
+    """
+    code = Paper.ScoringPolicy.NEGATIVE_MARKING
+
+    def _penalty(self, max_score, config):
+        return -max_score * Decimal(str(config.get('penalty', 0.25)))
+
+    def score_choice(self, is_correct, is_blank, max_score, config):
+        if is_correct:
+            return max_score
+        return _ZERO if is_blank else self._penalty(max_score, config)
+
+    def score_multi(self, selected, correct, max_score, config):
+        if selected == correct:
+            return max_score
+        return _ZERO if not selected else self._penalty(max_score, config)
+
+
+def get_policy(code):
+    """按代码获取评分策略，未知代码回退为默认策略"""
+    return POLICIES.get(code) or POLICIES[Paper.ScoringPolicy.HALF_CREDIT]
+
+
+def parse_labels(content):
+    """解析选择题作答 'A,C' 为选项标签集合"""
+    return frozenset(label.strip() for label in (content or '').split(',') if label.strip())
+
+
+def option_bits(labels):
+    """按选项顺序生成 {label: bit}"""
+    return {label: 1 << position for position, label in enumerate(labels)}
+
+
+def encode_labels(labels, bits):
+    """
+    将选项标签集合编码为位掩码
+    不属于该题的标签记为最高位之上的一位，保证按位比较时判为错选
+    """
+    mask = 0
+    for label in labels:
+        mask |= bits.get(label, 1 << len(bits))
+    return mask
+
+
+class CompiledRule:
+    """
+    单道客观题的评分规则
+    按作答内容缓存结果：同一道题的作答取值有限，批量批改时大多命中缓存
+    """
+    __slots__ = ('question_type', 'bits', 'correct', 'max_score', 'policy', 'config', '_results')
+
+    def __init__(self, question_type, correct_answer, max_score, policy, config, labels=None):
+        self.question_type = question_type
+        self.max_score = Decimal(max_score)
+        self.policy = policy
+        self.config = config or {}
+        self.bits = None
+        if question_type in ['single', 'multi']:
+            correct_labels = parse_labels(correct_answer)
+            # 题目缺少选项数据时按正确答案中的标签编码
+            self.bits = option_bits(labels or sorted(correct_labels))
+            self.correct = encode_labels(correct_labels, self.bits)
+        elif question_type == 'judge':
+            self.correct = (correct_answer or '').strip().lower()
+        else:
+            self.correct = (correct_answer or '').strip()
+        self._results = {}
+
+    def evaluate(self, content):
+        """
+        评分
+
+        Returns:
+            (score, is_correct)
+        """
+        return self.grade(content)[:2]
+
+    def grade(self, content):
+        """
+        评分并编码选项
+
+        Returns:
+            (score, is_correct, option_mask)，非选择题 option_mask 为 None
+        """
+        content = content or ''
+        result = self._results.get(content)
+        if result is None:
+            result = self._grade(content)
+            self._results[content] = result
+        return result
+
+    def _grade(self, content):
+        if self.bits is not None:
+            selected = encode_labels(parse_labels(content), self.bits)
+            is_correct = selected == self.correct
+            if self.question_type == 'multi':
+                score = self.policy.score_multi(selected, self.correct, self.max_score, self.config)
+            else:
+                score = self.policy.score_choice(is_correct, not selected, self.max_score, self.config)
+            return _quantize(score), is_correct, selected
+
+        value = content.strip()
+        if self.question_type == 'judge':
+            value = value.lower()
+        is_correct = value == self.correct
+        score = self.policy.score_choice(is_correct, not value, self.max_score, self.config)
+        return _quantize(score), is_correct, None
+
+
+def compile_rule(paper_question):
+    """编译单道试卷题目的评分规则，非客观题返回 None"""
+    question = paper_question.question
+    if question.type not in OBJECTIVE_TYPES:
+        return None
+
+    section = paper_question.section
+    if section is not None and section.scoring_policy:
+        code, config = section.scoring_policy, section.scoring_config
+    else:
+        code, config = paper_question.paper.scoring_policy, paper_question.paper.scoring_config
+
+    labels = [option.label for option in question.options.all()]
+    return CompiledRule(question.type, question.answer, paper_question.score, get_policy(code), config, labels)
+
+
+def compile_paper(paper_id):
+    """
+    编译整张试卷的客观题评分规则（题目与选项各一次查询）
+
+    Returns:
+        {paper_question_id: CompiledRule}
+    """
+    paper_questions = PaperQuestion.objects.filter(
+        paper_id=paper_id,
+        question__type__in=OBJECTIVE_TYPES,
+    ).select_related('paper', 'section', 'question').prefetch_related('question__options')
+    return {paper_question.id: compile_rule(paper_question) for paper_question in paper_questions}
+
+
+def grade_answers(answers, rules):
+    """
+    按编译好的规则批量批改答案，批量写回并发送 answer_graded 信号
+    没有对应规则的答案（主观题）被忽略
+
+    Returns:
+        已批改的答案列表
+    """
+    by_question = defaultdict(list)
+    for answer in answers:
+        if answer.paper_question_id in rules:
+            by_question[answer.paper_question_id].append(answer)
+
+    now = timezone.now()
+    graded = []
+    previous = {}
+    for paper_question_id, group in by_question.items():
+        rule = rules[paper_question_id]
+        for answer in group:
+            previous[answer.id] = answer_state(answer)
+            answer.score, answer.is_correct, answer.option_mask = rule.grade(answer.answer_content)
+            answer.status = Answer.Status.GRADED
+            answer.updated_at = now
+            graded.append(answer)
+
+    if graded:
+        Answer.objects.bulk_update(
+            graded, ['score', 'is_correct', 'option_mask', 'status', 'updated_at'], batch_size=1000
+        )
+        answer_graded.send(sender=Answer, answers=graded, previous=previous)
+    return graded
+
+
+def grade_submission(submission, rules=None):
+    """
+    批改提交记录中的全部客观题并更新 objective_score
+
+    Args:
+        rules: compile_paper 的结果；批量批改同一场考试时由调用方编译一次后复用
+
+    Returns:
+        客观题得分
+    """
+    if rules is None:
+        rules = compile_paper(submission.exam.paper_id)
+
+    answers = list(
+        submission.answers.filter(paper_question_id__in=list(rules)).select_related('paper_question__question')
+    )
+    for answer in answers:
+        answer.submission = submission
+
+    graded = grade_answers(answers, rules)
+    objective_score = sum((answer.score for answer in graded), _ZERO)
+
+    submission.objective_score = objective_score
+    submission.save(update_fields=['objective_score'])
+    return objective_score
@@ -3,6 +3,8 @@ from .grading import (
     GradeAnswerSerializer,
     BatchGradeSerializer,
     AnswerToGradeSerializer,
+    PlagiarismMatchSerializer,
+    DetectPlagiarismSerializer,
 )
 
 __all__ = [
@@ -10,4 +12,6 @@ __all__ = [
     'GradeAnswerSerializer',
     'BatchGradeSerializer',
     'AnswerToGradeSerializer',
+    'PlagiarismMatchSerializer',
+    'DetectPlagiarismSerializer',
 ]
@@ -3,7 +3,7 @@
 """
 from rest_framework import serializers
 
-from apps.grading.models import GradingTask
+from apps.grading.models import GradingTask, PlagiarismMatch
 from apps.submissions.models import Answer
 
 
@@ -61,3 +61,31 @@ class AnswerToGradeSerializer(serializers.ModelSerializer):
             'score', 'max_score', 'comment', 'user_name',
             'status', 'created_at'
         ]
+
+
+class PlagiarismMatchSerializer(serializers.ModelSerializer):
+    """
+    答案查重结果序列化器
+    """
+    question_number = serializers.IntegerField(source='paper_question.question_number', read_only=True)
+    user_name = serializers.CharField(source='answer.submission.user.username', read_only=True)
+    matched_user_name = serializers.CharField(source='matched_answer.submission.user.username', read_only=True)
+    answer_content = serializers.CharField(source='answer.answer_content', read_only=True)
+    matched_answer_content = serializers.CharField(source='matched_answer.answer_content', read_only=True)
+
+    class Meta:
+        model = PlagiarismMatch
+        fields = [
+            'id', 'exam', 'paper_question', 'question_number',
+            'answer', 'user_name', 'answer_content',
+            'matched_answer', 'matched_user_name', 'matched_answer_content',
+            'similarity', 'created_at'
+        ]
+
+
+class DetectPlagiarismSerializer(serializers.Serializer):
+    """
+    发起答案查重序列化器
+    """
+    exam_id = serializers.IntegerField()
+    threshold = serializers.FloatField(required=False, default=0.8, min_value=0.1, max_value=1.0)
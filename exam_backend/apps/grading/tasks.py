@@ -9,56 +9,66 @@ def auto_grade_submission(submission_id):
     """
     自动批改客观题
     """
-    from apps.submissions.models import Answer, Submission
-    from django.db.models import Sum
+    from apps.submissions.models import Submission
 
     try:
-        submission = Submission.objects.get(id=submission_id)
+        submission = Submission.objects.select_related('exam').get(id=submission_id)
+    except Submission.DoesNotExist:
+        return
+
+    _grade_submission(submission)
 
-        # 批改所有客观题
-        objective_score = 0
-        for answer in submission.answers.filter(
-            paper_question__question__type__in=['single', 'multi', 'judge']
-        ):
-            if answer.auto_grade():
-                objective_score += answer.score or 0
 
-        submission.objective_score = objective_score
-        submission.save(update_fields=['objective_score'])
+def _grade_submission(submission, rules=None):
+    """批改客观题；没有主观题时直接完成评分"""
+    from apps.grading import scoring
+    from apps.submissions.models import Submission
+    from apps.submissions.signals import submission_finished
 
-        # 检查是否需要人工阅卷
-        has_subjective = submission.answers.filter(
-            paper_question__question__type__in=['short', 'programming', 'blank']
-        ).exists()
+    objective_score = scoring.grade_submission(submission, rules)
 
-        if not has_subjective:
-            # 全是客观题，直接完成
-            submission.score = objective_score
-            submission.status = Submission.Status.FINISHED
-            submission.save(update_fields=['score', 'status'])
+    # 检查是否需要人工阅卷
+    has_subjective = submission.answers.filter(
+        paper_question__question__type__in=['short', 'programming', 'blank']
+    ).exists()
 
-    except Submission.DoesNotExist:
-        pass
+    if not has_subjective:
+        # 全是客观题，直接完成
+        previous_score = submission.score
+        was_finished = submission.status == Submission.Status.FINISHED
+        submission.score = objective_score
+        submission.status = Submission.Status.FINISHED
+        submission.save(update_fields=['score', 'status'])
+        submission_finished.send(
+            sender=Submission, submission=submission,
+            previous_score=previous_score, was_finished=was_finished
+        )
 
 
 @shared_task
 def batch_auto_grade_exam(exam_id):
     """
     批量自动批改考试的所有客观题
+    评分规则按试卷只编译一次，在同一任务内逐份批改
     """
     from apps.exams.models import Exam
+    from apps.grading import scoring
     from apps.submissions.models import Submission
 
     try:
         exam = Exam.objects.get(id=exam_id)
+    except Exam.DoesNotExist:
+        return 0
 
-        for submission in exam.submissions.filter(
-            status__in=[Submission.Status.SUBMITTED, Submission.Status.GRADING]
-        ):
-            auto_grade_submission.delay(submission.id)
+    rules = scoring.compile_paper(exam.paper_id)
 
-    except Exam.DoesNotExist:
-        pass
+    count = 0
+    for submission in exam.submissions.filter(
+        status__in=[Submission.Status.SUBMITTED, Submission.Status.GRADING]
+    ).select_related('exam').iterator(chunk_size=500):
+        _grade_submission(submission, rules)
+        count += 1
+    return count
 
 
 @shared_task
@@ -81,3 +91,75 @@ def notify_grading_complete(submission_id):
 
     except Submission.DoesNotExist:
         pass
+
+
+@shared_task
+def detect_exam_plagiarism(exam_id, threshold=0.8):
+    """
+    考试答案查重
+    对每道主观题（简答、编程）的答案做 MinHash + LSH 相似度检测，结果覆盖写入 PlagiarismMatch
+    """
+    from django.db import transaction
+
+    from apps.exams.models import Exam
+    from apps.grading.models import PlagiarismMatch
+    from apps.grading.plagiarism import MinHashLSH
+    from apps.submissions.models import Answer
+
+    try:
+        exam = Exam.objects.select_related('paper').get(id=exam_id)
+    except Exam.DoesNotExist:
+        return 0
+
+    detector = MinHashLSH(threshold=threshold)
+    matches = []
+
+    paper_questions = exam.paper.paper_questions.filter(
+        question__type__in=['short', 'programming']
+    ).values_list('id', flat=True)
+
+    for paper_question_id in paper_questions:
+        rows = list(
+            Answer.objects.filter(
+                submission__exam=exam,
+                paper_question_id=paper_question_id,
+            ).exclude(answer_content='').values_list('id', 'answer_content')
+        )
+        if len(rows) < 2:
+            continue
+
+        answer_ids = [row[0] for row in rows]
+        for i, j, similarity in detector.find_similar([row[1] for row in rows]):
+            matches.append(PlagiarismMatch(
+                exam=exam,
+                paper_question_id=paper_question_id,
+                answer_id=answer_ids[i],
+                matched_answer_id=answer_ids[j],
+                similarity=similarity,
+            ))
+
+    with transaction.atomic():
+        PlagiarismMatch.objects.filter(exam=exam).delete()
+        PlagiarismMatch.objects.bulk_create(matches, batch_size=1000)
+
+    return len(matches)
+
+
+@shared_task
+def rebuild_grading_counters(exam_ids=None):
+    """
+    重建考试阅卷计数器（分组聚合）
+    """
+    from apps.grading import counters
+
+    return counters.rebuild(exam_ids)
+
+
+@shared_task
+def prefetch_grading_page(grader_id, exam_id, question_id, cursor, page_size):
+    """
+    预取阅卷人的下一页待批改答案到缓存
+    """
+    from apps.grading import feed
+
+    feed.prefetch_page(grader_id, exam_id, question_id, cursor, page_size)
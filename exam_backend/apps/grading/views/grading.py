@@ -10,14 +10,20 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.exams.models import Exam
-from apps.grading.models import GradingTask
+from apps.grading import feed
+from apps.grading.models import ExamGradingCounter, GradingTask, PlagiarismMatch
 from apps.grading.serializers import (
     GradingTaskSerializer,
     GradeAnswerSerializer,
     BatchGradeSerializer,
-    AnswerToGradeSerializer,
+    PlagiarismMatchSerializer,
+    DetectPlagiarismSerializer,
 )
+from apps.grading.tasks import detect_exam_plagiarism, prefetch_grading_page
 from apps.submissions.models import Answer, Submission
+from apps.submissions.signals import answer_graded, answer_state, submission_finished
+from utils.exceptions import ResourceNotFoundException
+from utils.pagination import StandardResultsSetPagination
 from utils.permissions import IsTeacherOrAdmin
 
 
@@ -47,27 +53,24 @@ class GradingViewSet(viewsets.ViewSet):
         获取待阅卷的考试列表
         GET /api/v1/grading/pending_exams/
         """
-        # 获取有待批改主观题的考试
-        exams = Exam.objects.filter(
-            status__in=[Exam.Status.ENDED, Exam.Status.GRADING],
-            is_deleted=False
-        ).select_related('paper')
-
-        result = []
-        for exam in exams:
-            pending_count = Answer.objects.filter(
-                submission__exam=exam,
-                paper_question__question__type__in=['short', 'programming', 'blank'],
-                status__in=[Answer.Status.ANSWERED, Answer.Status.MARKED]
-            ).count()
-
-            if pending_count > 0:
-                result.append({
-                    'exam_id': exam.id,
-                    'exam_title': exam.title,
-                    'pending_count': pending_count,
-                    'total_records': exam.submissions.count(),
-                })
+        # 直接读取按考试维护的阅卷计数器，单次查询
+        counters = ExamGradingCounter.objects.filter(
+            exam__status__in=[Exam.Status.ENDED, Exam.Status.GRADING],
+            exam__is_deleted=False,
+            pending_count__gt=0,
+        ).order_by('-exam__start_time').values(
+            'exam_id', 'exam__title', 'pending_count', 'submission_count'
+        )
+
+        result = [
+            {
+                'exam_id': counter['exam_id'],
+                'exam_title': counter['exam__title'],
+                'pending_count': counter['pending_count'],
+                'total_records': counter['submission_count'],
+            }
+            for counter in counters
+        ]
 
         return Response({
             'success': True,
@@ -77,35 +80,32 @@ class GradingViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'])
     def get_answers_to_grade(self, request):
         """
-        获取待批改的答案
-        GET /api/v1/grading/get_answers_to_grade/?exam_id=1&question_id=2
+        获取待批改的答案（游标分页）
+        GET /api/v1/grading/get_answers_to_grade/?exam_id=1&question_id=2&cursor=xxx&page_size=50
         """
         exam_id = request.query_params.get('exam_id')
         question_id = request.query_params.get('question_id')
+        cursor = request.query_params.get('cursor')
 
-        queryset = Answer.objects.filter(
-            status__in=[Answer.Status.ANSWERED, Answer.Status.MARKED]
-        ).select_related(
-            'submission', 'submission__user',
-            'paper_question', 'paper_question__question'
-        )
+        try:
+            page_size = int(request.query_params.get('page_size', feed.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            page_size = feed.DEFAULT_PAGE_SIZE
+        page_size = min(max(page_size, 1), feed.MAX_PAGE_SIZE)
 
-        if exam_id:
-            queryset = queryset.filter(submission__exam_id=exam_id)
+        page, _ = feed.get_page(request.user.id, exam_id, question_id, cursor, page_size)
 
-        if question_id:
-            queryset = queryset.filter(paper_question__question_id=question_id)
-        else:
-            # 只获取主观题
-            queryset = queryset.filter(
-                paper_question__question__type__in=['short', 'programming', 'blank']
+        # 阅卷人处理当前页时，后台预取下一页
+        if page['next_cursor']:
+            prefetch_grading_page.delay(
+                request.user.id, exam_id, question_id, page['next_cursor'], page_size
             )
 
-        serializer = AnswerToGradeSerializer(queryset[:50], many=True)
         return Response({
             'success': True,
-            'data': serializer.data,
-            'total': queryset.count()
+            'data': page['results'],
+            'next_cursor': page['next_cursor'],
+            'total': feed.estimated_total(exam_id, question_id),
         })
 
     @action(detail=False, methods=['post'])
@@ -122,7 +122,9 @@ class GradingViewSet(viewsets.ViewSet):
         comment = serializer.validated_data.get('comment', '')
 
         try:
-            answer = Answer.objects.get(id=answer_id)
+            answer = Answer.objects.select_related(
+                'submission', 'paper_question__question'
+            ).get(id=answer_id)
         except Answer.DoesNotExist:
             return Response({
                 'success': False,
@@ -136,6 +138,7 @@ class GradingViewSet(viewsets.ViewSet):
                 'message': f'分数不能超过满分 {answer.max_score}'
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        previous = {answer.id: answer_state(answer)}
         answer.score = score
         answer.comment = comment
         answer.status = Answer.Status.GRADED
@@ -143,6 +146,7 @@ class GradingViewSet(viewsets.ViewSet):
         answer.graded_at = timezone.now()
         answer.is_correct = score == answer.max_score
         answer.save()
+        answer_graded.send(sender=Answer, answers=[answer], previous=previous)
 
         # 检查是否所有答案都已批改
         self._check_and_update_submission(answer.submission)
@@ -164,12 +168,17 @@ class GradingViewSet(viewsets.ViewSet):
         grades = serializer.validated_data['grades']
         success_count = 0
         submissions_to_check = set()
+        graded_answers = []
+        previous = {}
 
         with transaction.atomic():
             for grade_data in grades:
                 try:
-                    answer = Answer.objects.get(id=grade_data['answer_id'])
+                    answer = Answer.objects.select_related(
+                        'submission', 'paper_question__question'
+                    ).get(id=grade_data['answer_id'])
                     if grade_data['score'] <= answer.max_score:
+                        previous[answer.id] = answer_state(answer)
                         answer.score = grade_data['score']
                         answer.comment = grade_data.get('comment', '')
                         answer.status = Answer.Status.GRADED
@@ -177,11 +186,15 @@ class GradingViewSet(viewsets.ViewSet):
                         answer.graded_at = timezone.now()
                         answer.is_correct = grade_data['score'] == answer.max_score
                         answer.save()
+                        graded_answers.append(answer)
                         success_count += 1
                         submissions_to_check.add(answer.submission_id)
                 except Answer.DoesNotExist:
                     continue
 
+            if graded_answers:
+                answer_graded.send(sender=Answer, answers=graded_answers, previous=previous)
+
             # 检查并更新提交记录
             for submission_id in submissions_to_check:
                 try:
@@ -195,6 +208,61 @@ class GradingViewSet(viewsets.ViewSet):
             'message': f'成功批改 {success_count} 个答案'
         })
 
+    @action(detail=False, methods=['post'])
+    def detect_plagiarism(self, request):
+        """
+        发起答案查重（异步）
+        POST /api/v1/grading/detect_plagiarism/
+        """
+        serializer = DetectPlagiarismSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        exam_id = serializer.validated_data['exam_id']
+        if not Exam.objects.filter(id=exam_id, is_deleted=False).exists():
+            raise ResourceNotFoundException('考试不存在')
+
+        detect_exam_plagiarism.delay(exam_id, serializer.validated_data['threshold'])
+
+        return Response({
+            'success': True,
+            'message': '查重任务已提交'
+        }, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'])
+    def plagiarism(self, request):
+        """
+        获取答案查重结果
+        GET /api/v1/grading/plagiarism/?exam_id=1&paper_question_id=2&min_similarity=0.9
+        """
+        exam_id = request.query_params.get('exam_id')
+        if not exam_id:
+            return Response({
+                'success': False,
+                'message': '缺少 exam_id 参数'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = PlagiarismMatch.objects.filter(exam_id=exam_id).select_related(
+            'paper_question',
+            'answer', 'answer__submission__user',
+            'matched_answer', 'matched_answer__submission__user',
+        )
+
+        paper_question_id = request.query_params.get('paper_question_id')
+        if paper_question_id:
+            queryset = queryset.filter(paper_question_id=paper_question_id)
+
+        try:
+            min_similarity = float(request.query_params.get('min_similarity', 0))
+        except ValueError:
+            min_similarity = 0
+        if min_similarity:
+            queryset = queryset.filter(similarity__gte=min_similarity)
+
+        paginator = StandardResultsSetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = PlagiarismMatchSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     def _check_and_update_submission(self, submission):
         """
         检查并更新提交记录状态和分数
@@ -212,10 +280,17 @@ class GradingViewSet(viewsets.ViewSet):
                 paper_question__question__type__in=['short', 'programming', 'blank']
             ).aggregate(total=Sum('score'))['total'] or 0
 
+            previous_score = submission.score
+            was_finished = submission.status == Submission.Status.FINISHED
+
             submission.score = total_score
             submission.subjective_score = subjective_score
             submission.status = Submission.Status.FINISHED
             submission.save(update_fields=['score', 'subjective_score', 'status'])
+            submission_finished.send(
+                sender=Submission, submission=submission,
+                previous_score=previous_score, was_finished=was_finished
+            )
 
 
 class GradingTaskViewSet(viewsets.ModelViewSet):
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('papers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paper',
+            name='scoring_config',
+            field=models.JSONField(blank=True, default=dict, help_text='如：{"penalty": 0.25}，倒扣满分的 25%', verbose_name='评分策略参数'),
+        ),
+        migrations.AddField(
+            model_name='paper',
+            name='scoring_policy',
+            field=models.CharField(choices=[('half_credit', '多选少选得一半分'), ('all_or_nothing', '全对才得分'), ('proportional', '按选对比例得分'), ('per_option_penalty', '按选项加减分'), ('negative_marking', '答错倒扣分')], default='half_credit', max_length=30, verbose_name='评分策略'),
+        ),
+        migrations.AddField(
+            model_name='papersection',
+            name='scoring_config',
+            field=models.JSONField(blank=True, default=dict, verbose_name='评分策略参数'),
+        ),
+        migrations.AddField(
+            model_name='papersection',
+            name='scoring_policy',
+            field=models.CharField(blank=True, choices=[('half_credit', '多选少选得一半分'), ('all_or_nothing', '全对才得分'), ('proportional', '按选对比例得分'), ('per_option_penalty', '按选项加减分'), ('negative_marking', '答错倒扣分')], max_length=30, verbose_name='评分策略'),
+        ),
+    ]
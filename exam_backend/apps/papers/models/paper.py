@@ -17,6 +17,13 @@ class Paper(TimeStampMixin, SoftDeleteMixin, CreatedByMixin, models.Model):
         PUBLISHED = 'published', '已发布'
         ARCHIVED = 'archived', '已归档'
 
+    class ScoringPolicy(models.TextChoices):
+        HALF_CREDIT = 'half_credit', '多选少选得一半分'
+        ALL_OR_NOTHING = 'all_or_nothing', '全对才得分'
+        PROPORTIONAL = 'proportional', '按选对比例得分'
+        PER_OPTION_PENALTY = 'per_option_penalty', '按选项加减分'
+        NEGATIVE_MARKING = 'negative_marking', '答错倒扣分'
+
     # 基本信息
     title = models.CharField('试卷标题', max_length=200)
     description = models.TextField('试卷描述', blank=True)
@@ -40,6 +47,20 @@ class Paper(TimeStampMixin, SoftDeleteMixin, CreatedByMixin, models.Model):
     show_answer_after_submit = models.BooleanField('提交后显示答案', default=True)
     allow_review = models.BooleanField('允许查看解析', default=True)
 
+    # 客观题评分策略（大题可单独覆盖）
+    scoring_policy = models.CharField(
+        '评分策略',
+        max_length=30,
+        choices=ScoringPolicy.choices,
+        default=ScoringPolicy.HALF_CREDIT
+    )
+    scoring_config = models.JSONField(
+        '评分策略参数',
+        default=dict,
+        blank=True,
+        help_text='如：{"penalty": 0.25}，倒扣满分的 25%'
+    )
+
     # 分类
     category = models.ForeignKey(
         'tags.Category',
@@ -3,6 +3,7 @@
 """
 from django.db import models
 
+from apps.papers.models.paper import Paper
 from utils.mixins import OrderMixin
 
 
@@ -28,6 +29,15 @@ class PaperSection(OrderMixin, models.Model):
         help_text='限制此大题只能添加特定类型的题目'
     )
 
+    # 评分策略（为空时沿用试卷的策略）
+    scoring_policy = models.CharField(
+        '评分策略',
+        max_length=30,
+        choices=Paper.ScoringPolicy.choices,
+        blank=True
+    )
+    scoring_config = models.JSONField('评分策略参数', default=dict, blank=True)
+
     class Meta:
         db_table = 'paper_sections'
         verbose_name = '试卷大题'
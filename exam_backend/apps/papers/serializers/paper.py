@@ -4,7 +4,7 @@
 from rest_framework import serializers
 
 from apps.papers.models import Paper
-from apps.papers.serializers.paper_section import PaperSectionSerializer
+from apps.papers.serializers.paper_section import PaperSectionSerializer, validate_scoring_config
 from apps.papers.serializers.paper_question import PaperQuestionSerializer, PaperQuestionExamSerializer
 
 
@@ -43,6 +43,7 @@ class PaperDetailSerializer(serializers.ModelSerializer):
             'pass_score', 'time_limit', 'status', 'status_display',
             'is_random_question', 'is_random_option',
             'show_answer_after_submit', 'allow_review',
+            'scoring_policy', 'scoring_config',
             'sections', 'paper_questions', 'question_count',
             'category', 'created_by', 'created_by_name',
             'created_at', 'updated_at'
@@ -75,9 +76,13 @@ class PaperCreateSerializer(serializers.ModelSerializer):
         fields = [
             'title', 'description', 'total_score', 'pass_score',
             'time_limit', 'status', 'is_random_question', 'is_random_option',
-            'show_answer_after_submit', 'allow_review', 'category'
+            'show_answer_after_submit', 'allow_review',
+            'scoring_policy', 'scoring_config', 'category'
         ]
 
+    def validate_scoring_config(self, value):
+        return validate_scoring_config(value)
+
     def create(self, validated_data):
         validated_data['created_by'] = self.context['request'].user
         return super().create(validated_data)
@@ -7,6 +7,16 @@ from apps.papers.models import PaperSection
 from apps.papers.serializers.paper_question import PaperQuestionSerializer
 
 
+def validate_scoring_config(value):
+    """校验评分策略参数：penalty 为非负数"""
+    if not isinstance(value, dict):
+        raise serializers.ValidationError('评分策略参数必须是对象')
+    penalty = value.get('penalty')
+    if penalty is not None and (isinstance(penalty, bool) or not isinstance(penalty, (int, float)) or penalty < 0):
+        raise serializers.ValidationError('penalty 必须是非负数')
+    return value
+
+
 class PaperSectionSerializer(serializers.ModelSerializer):
     """
     试卷大题序列化器
@@ -19,5 +29,9 @@ class PaperSectionSerializer(serializers.ModelSerializer):
         model = PaperSection
         fields = [
             'id', 'title', 'description', 'question_type', 'order',
+            'scoring_policy', 'scoring_config',
             'paper_questions', 'question_count', 'section_score'
         ]
+
+    def validate_scoring_config(self, value):
+        return validate_scoring_config(value)
@@ -161,6 +161,8 @@ class PaperViewSet(MultiSerializerMixin, MultiPermissionMixin, viewsets.ModelVie
                 is_random_option=paper.is_random_option,
                 show_answer_after_submit=paper.show_answer_after_submit,
                 allow_review=paper.allow_review,
+                scoring_policy=paper.scoring_policy,
+                scoring_config=paper.scoring_config,
                 category=paper.category,
                 created_by=request.user,
             )
@@ -173,6 +175,8 @@ class PaperViewSet(MultiSerializerMixin, MultiPermissionMixin, viewsets.ModelVie
                     title=section.title,
                     description=section.description,
                     question_type=section.question_type,
+                    scoring_policy=section.scoring_policy,
+                    scoring_config=section.scoring_config,
                     order=section.order,
                 )
                 section_map[section.id] = new_section
@@ -3,7 +3,7 @@ Questions Admin
 """
 from django.contrib import admin
 
-from apps.questions.models import Question, Option, Attachment
+from apps.questions.models import Question, Option, Attachment, SearchOutbox
 
 
 class OptionInline(admin.TabularInline):
@@ -48,3 +48,11 @@ class AttachmentAdmin(admin.ModelAdmin):
     list_display = ['id', 'question', 'name', 'type', 'size', 'created_at']
     list_filter = ['type', 'created_at']
     search_fields = ['name', 'description']
+
+
+@admin.register(SearchOutbox)
+class SearchOutboxAdmin(admin.ModelAdmin):
+    list_display = ['id', 'question_id', 'action', 'attempts', 'next_attempt_at', 'created_at']
+    list_filter = ['action']
+    search_fields = ['question_id']
+    readonly_fields = ['question_id', 'action', 'attempts', 'last_error', 'created_at']
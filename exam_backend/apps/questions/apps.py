@@ -5,3 +5,6 @@ class QuestionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.questions'
     verbose_name = '题库管理'
+
+    def ready(self):
+        from apps.questions import receivers  # noqa: F401
@@ -3,49 +3,25 @@
 支持 PostgreSQL 全文检索
 """
 import django_filters
-from django.contrib.postgres.search import (
-    SearchVector,
-    SearchQuery,
-    SearchRank,
-    TrigramSimilarity,
-)
-from django.db.models import Q, F
 
 from apps.questions.models import Question
+from apps.questions.services import inverted_index
+from apps.questions.services.search import full_text_search
 
 
 class FullTextSearchFilter(django_filters.CharFilter):
     """
     PostgreSQL 全文检索过滤器
-    支持中文分词搜索
+    查询 search_vector 存储列，标题三元组相似度用于模糊匹配；非 PostgreSQL 数据库降级为 icontains。
+    启用进程内倒排索引时改用索引命中结果
     """
 
     def filter(self, qs, value):
         if not value:
             return qs
-
-        # 创建搜索向量 - 包含标题和内容
-        # 使用 'simple' 配置支持中文，或安装 zhparser 扩展后使用 'chinese'
-        search_vector = SearchVector('title', weight='A', config='simple') + \
-                        SearchVector('content', weight='B', config='simple')
-
-        # 创建搜索查询
-        search_query = SearchQuery(value, config='simple')
-
-        # 计算搜索排名
-        search_rank = SearchRank(search_vector, search_query)
-
-        # 同时使用三元组相似度进行模糊匹配（需要 pg_trgm 扩展）
-        # 这对于短查询词和拼写错误更友好
-        title_similarity = TrigramSimilarity('title', value)
-
-        return qs.annotate(
-            search=search_vector,
-            rank=search_rank,
-            title_similarity=title_similarity,
-        ).filter(
-            Q(search=search_query) | Q(title_similarity__gt=0.1)
-        ).order_by('-rank', '-title_similarity')
+        if inverted_index.enabled():
+            return inverted_index.filter_queryset(qs, value)
+        return full_text_search(qs, value)
 
 
 class QuestionFilter(django_filters.FilterSet):
@@ -0,0 +1,20 @@
+"""
+构建题目倒排索引快照
+"""
+from django.core.management.base import BaseCommand
+
+from apps.questions.services import inverted_index
+
+
+class Command(BaseCommand):
+    help = '从题库构建进程内倒排索引快照（USE_INVERTED_INDEX 启用时用于搜索）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directory', help='快照目录，默认 SEARCH_INDEX_DIR')
+
+    def handle(self, *args, **options):
+        path = inverted_index.build(options['directory'])
+        snapshot = inverted_index.Snapshot(path)
+        self.stdout.write(self.style.SUCCESS(
+            f'已构建索引快照 {path}：{len(snapshot.doc_ids)} 道题，{snapshot.term_count} 个词项'
+        ))
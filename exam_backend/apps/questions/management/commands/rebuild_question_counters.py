@@ -0,0 +1,14 @@
+"""
+按已批改答案重建题目使用次数与正确次数
+"""
+from django.core.management.base import BaseCommand
+
+from apps.questions.services import counters
+
+
+class Command(BaseCommand):
+    help = '按已批改答案重建题目的使用次数与正确次数，并清空 Redis 中未写回的增量'
+
+    def handle(self, *args, **options):
+        total = counters.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'已重建题目计数，共 {total} 道题有作答记录'))
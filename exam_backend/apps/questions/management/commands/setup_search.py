@@ -4,6 +4,8 @@
 from django.core.management.base import BaseCommand
 from django.db import connection
 
+from apps.questions.services.search import SEARCH_VECTOR_COLUMN, SEARCH_VECTOR_INDEX, SEARCH_VECTOR_SQL
+
 
 class Command(BaseCommand):
     help = '设置 PostgreSQL 全文检索扩展（pg_trgm）和搜索索引'
@@ -43,15 +45,20 @@ class Command(BaseCommand):
                 except Exception as e:
                     self.stdout.write(self.style.WARNING(f'unaccent 扩展安装失败: {e}'))
 
-            # 创建 GIN 索引用于全文搜索
-            self.stdout.write('创建全文搜索索引...')
+            # 全文搜索存储列与 GIN 索引（通常已由迁移 questions.0003 创建）
+            self.stdout.write('创建全文搜索列与索引...')
             try:
-                # 题目表的全文搜索索引
-                cursor.execute('''
-                    CREATE INDEX IF NOT EXISTS questions_search_idx 
-                    ON questions 
-                    USING GIN (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(content, '')));
+                cursor.execute(f'''
+                    ALTER TABLE questions ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} tsvector
+                    GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED;
+                ''')
+                cursor.execute(f'''
+                    CREATE INDEX IF NOT EXISTS {SEARCH_VECTOR_INDEX}
+                    ON questions
+                    USING GIN ({SEARCH_VECTOR_COLUMN});
                 ''')
+                # 旧版表达式索引与查询不一致，不会被使用
+                cursor.execute('DROP INDEX IF EXISTS questions_search_idx;')
                 self.stdout.write(self.style.SUCCESS('全文搜索索引创建成功'))
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f'全文搜索索引创建失败: {e}'))
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:16
+
+import apps.questions.models.attachment
+from django.db import migrations, models
+import utils.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachment',
+            name='checksum',
+            field=models.CharField(blank=True, help_text='MD5 或 SHA256', max_length=64, verbose_name='文件校验和'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='mime_type',
+            field=models.CharField(blank=True, max_length=100, verbose_name='MIME类型'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='storage_key',
+            field=models.CharField(blank=True, help_text='对象存储中的完整路径', max_length=500, verbose_name='存储键'),
+        ),
+        migrations.AlterField(
+            model_name='attachment',
+            name='file',
+            field=models.FileField(storage=utils.storage.get_attachment_storage, upload_to=apps.questions.models.attachment.attachment_upload_path, verbose_name='文件'),
+        ),
+    ]
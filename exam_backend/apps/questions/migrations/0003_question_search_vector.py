@@ -0,0 +1,45 @@
+"""
+题目全文检索存储生成列
+search_vector 为标题/内容/答案/解析按 A/B/C/D 加权的 tsvector，配合 GIN 索引；
+仅在 PostgreSQL（12+）上创建，其他数据库的搜索降级为 icontains
+"""
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(content, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(answer, '')), 'C') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(answer_analysis, '')), 'D')"
+)
+
+
+def add_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'ALTER TABLE questions ADD COLUMN IF NOT EXISTS search_vector tsvector '
+        f'GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS questions_search_vector_idx ON questions USING GIN (search_vector)'
+    )
+    # setup_search 旧版创建的表达式索引与查询不一致，从未被使用
+    schema_editor.execute('DROP INDEX IF EXISTS questions_search_idx')
+
+
+def remove_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS questions_search_vector_idx')
+    schema_editor.execute('ALTER TABLE questions DROP COLUMN IF EXISTS search_vector')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0002_attachment_checksum_attachment_mime_type_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, remove_search_vector),
+    ]
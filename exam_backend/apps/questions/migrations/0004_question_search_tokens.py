@@ -0,0 +1,109 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:55
+
+import re
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# 分词规则的固定副本（与本迁移编写时的 apps.questions.services.tokenizer.index_text 一致），
+# 之后修改分词器不影响本迁移
+CJK_RUN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+')
+
+
+def _ngrams(run):
+    return list(run) + [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def index_text(text):
+    if not text:
+        return ''
+    return ' '.join(CJK_RUN.sub(lambda match: f' {" ".join(_ngrams(match.group()))} ', text).split())
+
+TOKEN_FIELDS = {
+    'title': 'title_tokens',
+    'content': 'content_tokens',
+    'answer': 'answer_tokens',
+    'answer_analysis': 'analysis_tokens',
+}
+
+# search_vector 改为由分词字段生成
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(title_tokens, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(content_tokens, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(answer_tokens, '')), 'C') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(analysis_tokens, '')), 'D')"
+)
+
+PREVIOUS_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(content, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(answer, '')), 'C') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(answer_analysis, '')), 'D')"
+)
+
+
+def fill_tokens(apps, schema_editor):
+    Question = apps.get_model('questions', 'Question')
+    queryset = Question.objects.order_by('id').only('id', *TOKEN_FIELDS)
+    batch = []
+    for question in queryset.iterator(chunk_size=BATCH_SIZE):
+        for field, token_field in TOKEN_FIELDS.items():
+            setattr(question, token_field, index_text(getattr(question, field)))
+        batch.append(question)
+        if len(batch) >= BATCH_SIZE:
+            Question.objects.bulk_update(batch, list(TOKEN_FIELDS.values()))
+            batch = []
+    if batch:
+        Question.objects.bulk_update(batch, list(TOKEN_FIELDS.values()))
+
+
+def _replace_search_vector(schema_editor, expression):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS questions_search_vector_idx')
+    schema_editor.execute('ALTER TABLE questions DROP COLUMN IF EXISTS search_vector')
+    schema_editor.execute(
+        f'ALTER TABLE questions ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({expression}) STORED'
+    )
+    schema_editor.execute('CREATE INDEX questions_search_vector_idx ON questions USING GIN (search_vector)')
+
+
+def use_token_search_vector(apps, schema_editor):
+    _replace_search_vector(schema_editor, SEARCH_VECTOR_SQL)
+
+
+def use_text_search_vector(apps, schema_editor):
+    _replace_search_vector(schema_editor, PREVIOUS_SEARCH_VECTOR_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0003_question_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='analysis_tokens',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='解析分词'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='answer_tokens',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='答案分词'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='content_tokens',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='内容分词'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='title_tokens',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='标题分词'),
+        ),
+        migrations.RunPython(fill_tokens, migrations.RunPython.noop),
+        migrations.RunPython(use_token_search_vector, use_text_search_vector),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0004_question_search_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_id', models.BigIntegerField(verbose_name='题目ID')),
+                ('action', models.CharField(choices=[('index', '索引'), ('delete', '删除')], default='index', max_length=10, verbose_name='操作')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='尝试次数')),
+                ('next_attempt_at', models.DateTimeField(blank=True, null=True, verbose_name='下次处理时间')),
+                ('last_error', models.TextField(blank=True, verbose_name='最近错误')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+            ],
+            options={
+                'verbose_name': '搜索索引发件箱',
+                'verbose_name_plural': '搜索索引发件箱',
+                'db_table': 'question_search_outbox',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['next_attempt_at', 'id'], name='search_outbox_due_idx')],
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from .question import Question
 from .option import Option
 from .attachment import Attachment
+from .outbox import SearchOutbox
 
-__all__ = ['Question', 'Option', 'Attachment']
+__all__ = ['Question', 'Option', 'Attachment', 'SearchOutbox']
@@ -0,0 +1,36 @@
+"""
+搜索索引发件箱模型
+"""
+from django.db import models
+
+
+class SearchOutbox(models.Model):
+    """
+    搜索索引发件箱
+    题目变更时在同一事务内写入一行，由 Celery 任务批量同步到搜索引擎；失败按指数退避重试
+    """
+
+    class Action(models.TextChoices):
+        INDEX = 'index', '索引'
+        DELETE = 'delete', '删除'
+
+    # 不使用外键：题目被物理删除后仍需同步删除索引
+    question_id = models.BigIntegerField('题目ID')
+    action = models.CharField('操作', max_length=10, choices=Action.choices, default=Action.INDEX)
+    attempts = models.PositiveSmallIntegerField('尝试次数', default=0)
+    # 为空表示已超过最大重试次数，不再处理
+    next_attempt_at = models.DateTimeField('下次处理时间', null=True, blank=True)
+    last_error = models.TextField('最近错误', blank=True)
+    created_at = models.DateTimeField('创建时间', auto_now_add=True)
+
+    class Meta:
+        db_table = 'question_search_outbox'
+        verbose_name = '搜索索引发件箱'
+        verbose_name_plural = verbose_name
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['next_attempt_at', 'id'], name='search_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_action_display()} #{self.question_id}'
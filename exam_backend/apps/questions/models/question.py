@@ -79,6 +79,12 @@ class Question(TimeStampMixin, SoftDeleteMixin, CreatedByMixin, models.Model):
     # 状态
     is_public = models.BooleanField('是否公开', default=True)
 
+    # 全文检索分词（汉字展开为单字与二字词，由 save 自动维护）
+    title_tokens = models.TextField('标题分词', blank=True, default='', editable=False)
+    content_tokens = models.TextField('内容分词', blank=True, default='', editable=False)
+    answer_tokens = models.TextField('答案分词', blank=True, default='', editable=False)
+    analysis_tokens = models.TextField('解析分词', blank=True, default='', editable=False)
+
     class Meta:
         db_table = 'questions'
         verbose_name = '题目'
@@ -89,9 +95,31 @@ class Question(TimeStampMixin, SoftDeleteMixin, CreatedByMixin, models.Model):
             models.Index(fields=['is_public', 'is_deleted']),
         ]
 
+    # 原文字段 -> 分词字段
+    SEARCH_TOKEN_FIELDS = {
+        'title': 'title_tokens',
+        'content': 'content_tokens',
+        'answer': 'answer_tokens',
+        'answer_analysis': 'analysis_tokens',
+    }
+
     def __str__(self):
         return f'[{self.get_type_display()}] {self.title[:50]}'
 
+    def save(self, *args, **kwargs):
+        from apps.questions.services.tokenizer import index_text
+
+        update_fields = kwargs.get('update_fields')
+        changed = [
+            (field, token_field) for field, token_field in self.SEARCH_TOKEN_FIELDS.items()
+            if update_fields is None or field in update_fields
+        ]
+        for field, token_field in changed:
+            setattr(self, token_field, index_text(getattr(self, field)))
+        if update_fields is not None and changed:
+            kwargs['update_fields'] = {*update_fields, *(token_field for _, token_field in changed)}
+        super().save(*args, **kwargs)
+
     @property
     def correct_rate(self):
         """正确率"""
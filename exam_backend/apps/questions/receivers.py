@@ -0,0 +1,44 @@
+"""
+题库模块信号处理
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.questions.models import Question, SearchOutbox
+from apps.questions.services import counters, inverted_index, outbox
+from apps.submissions.signals import answer_graded
+
+
+@receiver(answer_graded)
+def count_question_usage(sender, answers, previous, **kwargs):
+    """答案被批改，累计题目的使用次数与正确次数"""
+    counters.record_graded(answers, previous)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def update_search_index(sender, instance, signal, **kwargs):
+    """题目保存或删除（含软删除），更新倒排索引并写入 Elasticsearch 发件箱"""
+    inverted_index.record_change(instance.id)
+    deleted = signal is post_delete or instance.is_deleted
+    outbox.record(instance.id, SearchOutbox.Action.DELETE if deleted else SearchOutbox.Action.INDEX)
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def update_search_index_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """题目标签变化，更新倒排索引的标签分面与 Elasticsearch 文档"""
+    if reverse and action == 'pre_clear':
+        # tag.questions.clear() 的 post_clear 不带 pk_set，清除前记下受影响的题目
+        instance._cleared_question_ids = list(instance.questions.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        question_ids = [instance.id]
+    elif action == 'post_clear':
+        question_ids = instance.__dict__.pop('_cleared_question_ids', [])
+    else:
+        question_ids = list(pk_set or ())
+    for question_id in question_ids:
+        inverted_index.record_change(question_id)
+        outbox.record(question_id)
@@ -1,6 +1,7 @@
 """
 题目序列化器
 """
+from django.db import transaction
 from rest_framework import serializers
 
 from apps.questions.models import Question, Option, Attachment
@@ -127,15 +128,17 @@ class QuestionCreateSerializer(serializers.ModelSerializer):
         # 设置创建者
         validated_data['created_by'] = self.context['request'].user
 
-        question = Question.objects.create(**validated_data)
+        # 题目、选项、标签与搜索索引发件箱在同一事务内写入
+        with transaction.atomic():
+            question = Question.objects.create(**validated_data)
 
-        # 创建选项
-        for option_data in options_data:
-            Option.objects.create(question=question, **option_data)
+            # 创建选项
+            for option_data in options_data:
+                Option.objects.create(question=question, **option_data)
 
-        # 设置标签
-        if tag_ids:
-            question.tags.set(tag_ids)
+            # 设置标签
+            if tag_ids:
+                question.tags.set(tag_ids)
 
         return question
 
@@ -164,19 +167,20 @@ class QuestionUpdateSerializer(serializers.ModelSerializer):
         options_data = validated_data.pop('options', None)
         tag_ids = validated_data.pop('tag_ids', None)
 
-        # 更新基本字段
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        # 更新选项（如果提供）
-        if options_data is not None:
-            instance.options.all().delete()
-            for option_data in options_data:
-                Option.objects.create(question=instance, **option_data)
-
-        # 更新标签
-        if tag_ids is not None:
-            instance.tags.set(tag_ids)
+        with transaction.atomic():
+            # 更新基本字段
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+
+            # 更新选项（如果提供）
+            if options_data is not None:
+                instance.options.all().delete()
+                for option_data in options_data:
+                    Option.objects.create(question=instance, **option_data)
+
+            # 更新标签
+            if tag_ids is not None:
+                instance.tags.set(tag_ids)
 
         return instance
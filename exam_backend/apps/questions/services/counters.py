@@ -0,0 +1,168 @@
+"""
+题目使用次数与正确次数
+答案批改时将每道题的增量累加到 Redis 哈希，定时任务取出后用一条
+UPDATE ... FROM (VALUES ...) 批量写回 questions 表，热门题目不再逐答案加行锁。
+缓存后端不是 Redis 时，增量在事务提交后直接批量写回
+"""
+import uuid
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from apps.questions.models import Question
+from apps.submissions.models import Answer
+from utils.redis import get_redis
+
+COUNTERS_KEY = 'questions:counters'
+# 写回期间的快照；写回失败时保留，下次优先处理
+FLUSHING_KEY = 'questions:counters:flushing'
+# 写回锁，避免重叠的定时任务重复写回同一快照
+FLUSH_LOCK_KEY = 'questions:counters:flush_lock'
+FLUSH_LOCK_TIMEOUT = 300
+
+# KEYS: 锁；ARGV: 加锁时的令牌。只释放自己持有的锁
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+FLUSH_BATCH_SIZE = 500
+
+_TABLE = Question._meta.db_table
+
+
+def _deltas(answers, previous):
+    """
+    每道题的 (使用次数, 正确次数) 增量
+    首次批改计入使用次数；重新批改只调整正确次数
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for answer in answers:
+        status, was_correct, _ = previous.get(answer.id, (None, None, None))
+        if status == Answer.Status.GRADED:
+            use, correct = 0, int(bool(answer.is_correct)) - int(bool(was_correct))
+        else:
+            use, correct = 1, int(bool(answer.is_correct))
+        if use or correct:
+            item = deltas[answer.paper_question.question_id]
+            item[0] += use
+            item[1] += correct
+    return {question_id: tuple(item) for question_id, item in deltas.items() if any(item)}
+
+
+def record_graded(answers, previous):
+    """答案批改后记录题目计数增量（事务提交后执行）"""
+    deltas = _deltas(answers, previous)
+    if deltas:
+        transaction.on_commit(lambda: incr(deltas))
+
+
+def incr(deltas):
+    """将 {question_id: (use, correct)} 累加到 Redis 哈希；Redis 不可用时直接写回"""
+    client = get_redis()
+    if client is None:
+        apply(deltas)
+        return
+
+    pipe = client.pipeline(transaction=False)
+    for question_id, (use, correct) in deltas.items():
+        if use:
+            pipe.hincrby(COUNTERS_KEY, f'use:{question_id}', use)
+        if correct:
+            pipe.hincrby(COUNTERS_KEY, f'correct:{question_id}', correct)
+    pipe.execute()
+
+
+def _parse(fields):
+    deltas = defaultdict(lambda: [0, 0])
+    for field, value in fields.items():
+        name, question_id = (field.decode() if isinstance(field, bytes) else field).split(':')
+        deltas[int(question_id)][0 if name == 'use' else 1] += int(value)
+    return {question_id: tuple(item) for question_id, item in deltas.items()}
+
+
+def flush():
+    """
+    取出 Redis 中累计的增量并写回数据库
+
+    Returns:
+        写回的题目数
+    """
+    client = get_redis()
+    if client is None:
+        return 0
+
+    token = uuid.uuid4().hex
+    if not client.set(FLUSH_LOCK_KEY, token, nx=True, ex=FLUSH_LOCK_TIMEOUT):
+        # 上一次写回尚未结束
+        return 0
+
+    try:
+        # 先改名取得快照，写回期间的新增量进入新的哈希
+        if not client.exists(FLUSHING_KEY):
+            if not client.exists(COUNTERS_KEY):
+                return 0
+            client.rename(COUNTERS_KEY, FLUSHING_KEY)
+
+        deltas = _parse(client.hgetall(FLUSHING_KEY))
+        with transaction.atomic():
+            apply(deltas)
+            # 在提交前删除快照：删除前退出时写回随事务回滚、快照保留待重做，
+            # 不会重复累加；删除后提交失败至多丢失本批增量，可由 rebuild 校正
+            client.delete(FLUSHING_KEY)
+        return len(deltas)
+    finally:
+        client.eval(RELEASE_LOCK_SCRIPT, 1, FLUSH_LOCK_KEY, token)
+
+
+def apply(deltas):
+    """
+    一条 UPDATE ... FROM (VALUES ...) 批量累加题目计数（每批 FLUSH_BATCH_SIZE 道题）
+    PostgreSQL 与 SQLite 3.33+ 均支持
+    """
+    items = [(question_id, use, correct) for question_id, (use, correct) in deltas.items()]
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            values = ', '.join(['(%s, %s, %s)'] * len(batch))
+            cursor.execute(
+                f'''
+                WITH delta (id, use_delta, correct_delta) AS (VALUES {values})
+                UPDATE {_TABLE} SET
+                    use_count = CASE WHEN {_TABLE}.use_count + delta.use_delta < 0
+                        THEN 0 ELSE {_TABLE}.use_count + delta.use_delta END,
+                    correct_count = CASE WHEN {_TABLE}.correct_count + delta.correct_delta < 0
+                        THEN 0 ELSE {_TABLE}.correct_count + delta.correct_delta END
+                FROM delta
+                WHERE {_TABLE}.id = delta.id
+                ''',
+                [value for item in batch for value in item],
+            )
+
+
+def rebuild():
+    """
+    按已批改答案重建全部题目的计数（分组聚合）
+
+    Returns:
+        有作答记录的题目数
+    """
+    rows = Answer.objects.filter(status=Answer.Status.GRADED).order_by().values(
+        'paper_question__question_id'
+    ).annotate(
+        use=Count('id'),
+        correct=Count('id', filter=Q(is_correct=True)),
+    ).values_list('paper_question__question_id', 'use', 'correct')
+
+    client = get_redis()
+    if client is not None:
+        client.delete(COUNTERS_KEY, FLUSHING_KEY)
+
+    with transaction.atomic():
+        Question.objects.exclude(use_count=0, correct_count=0).update(use_count=0, correct_count=0)
+        deltas = {question_id: (use, correct) for question_id, use, correct in rows}
+        apply(deltas)
+    return len(deltas)
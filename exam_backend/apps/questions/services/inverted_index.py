@@ -0,0 +1,537 @@
+"""
+进程内倒排索引搜索
+作为 Elasticsearch 的替代：从 questions 表构建 BM25 倒排索引，词项按 tokenizer 切分（中文单字与二字词），
+标题/内容/答案/解析分别加权；支持题型、难度、标签过滤与分面统计，以及英文词的一次编辑距离模糊匹配。
+
+索引快照以 .npy 与字节文件保存在 SEARCH_INDEX_DIR 下，按 mmap 方式加载，多个进程共享同一份页缓存；
+题目保存或删除后在本进程的增量层生效，并记录到 Redis 变更日志，其他进程在下次搜索时补齐。
+增量层过大时由定时任务重建快照
+"""
+import json
+import math
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter, namedtuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, IntegerField, Prefetch, When
+
+from apps.questions.models import Question
+from apps.questions.services.tokenizer import index_text, query_text
+from apps.tags.models import Tag
+from utils.redis import get_redis
+
+# BM25 参数
+K1 = 1.2
+B = 0.75
+
+# 字段权重，与 Elasticsearch 查询的 title^3、content^2 一致
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'content': 2.0,
+    'answer': 1.0,
+    'answer_analysis': 1.0,
+}
+
+# 模糊匹配：仅对未命中的英文/数字词，在同首字母的词项中找一次编辑距离内的词
+FUZZY_MIN_LENGTH = 4
+FUZZY_MAX_CANDIDATES = 2000
+FUZZY_WEIGHT = 0.5
+
+# 两次检查快照与变更日志的最小间隔（秒）
+SYNC_INTERVAL = 1.0
+# 列表过滤时最多取的命中数
+MAX_FILTER_HITS = 1000
+BUILD_CHUNK_SIZE = 2000
+# 保留的历史快照数（其他进程可能仍在使用）
+KEEP_SNAPSHOTS = 2
+
+TYPES = list(Question.Type.values)
+
+SEQ_KEY = 'questions:search_index:seq'
+CHANGES_KEY = 'questions:search_index:changes'
+
+# KEYS: 序号, 变更日志；ARGV: 题目 ID
+APPEND_CHANGE_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('ZADD', KEYS[2], seq, ARGV[1])
+return seq
+"""
+
+TERM_PATTERN = re.compile(r'\w+')
+FUZZY_PATTERN = re.compile(r'[a-z0-9]+')
+
+ARRAYS = [
+    'term_offsets', 'postings_offsets', 'postings_docs', 'postings_tf',
+    'doc_ids', 'doc_lengths', 'doc_types', 'doc_difficulty', 'doc_public',
+    'tag_keys', 'tag_offsets', 'tag_docs',
+]
+
+Document = namedtuple('Document', ['terms', 'length', 'type', 'difficulty', 'is_public', 'tags'])
+
+
+def enabled():
+    return getattr(settings, 'USE_INVERTED_INDEX', False)
+
+
+def index_dir():
+    return str(getattr(settings, 'SEARCH_INDEX_DIR', os.path.join(settings.BASE_DIR, 'search_index')))
+
+
+def terms(text, query=False):
+    """切分词项（小写）；查询时中文只取二字词"""
+    text = query_text(text) if query else index_text(text)
+    return TERM_PATTERN.findall(text.lower())
+
+
+def document(question):
+    """题目的索引文档：加权词频、文档长度、题型、难度与标签"""
+    weights = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for term in terms(getattr(question, field)):
+            weights[term] += weight
+    return Document(
+        terms=dict(weights),
+        length=float(sum(weights.values())),
+        type=TYPES.index(question.type) if question.type in TYPES else -1,
+        difficulty=question.difficulty,
+        is_public=question.is_public,
+        tags=tuple(sorted(tag.id for tag in question.tags.all())),
+    )
+
+
+def _questions(ids=None):
+    queryset = Question.objects.filter(is_deleted=False).only(
+        'id', 'type', 'difficulty', 'is_public', *FIELD_WEIGHTS
+    ).prefetch_related(Prefetch('tags', queryset=Tag.objects.only('id')))
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    return queryset.order_by('id')
+
+
+def _within_one_edit(a, b):
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+# ---------------------------------------------------------------- 快照
+
+def _current_path(directory):
+    try:
+        with open(os.path.join(directory, 'CURRENT')) as fp:
+            name = fp.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, name) if name else None
+
+
+def build(directory=None):
+    """
+    从 questions 表构建索引快照并切换为当前快照
+
+    Returns:
+        快照目录
+    """
+    directory = directory or index_dir()
+    client = get_redis()
+    # 构建期间的变更序号大于 seq，加载后由变更日志补齐
+    seq = int(client.get(SEQ_KEY) or 0) if client is not None else 0
+
+    vocabulary = {}
+    term_ids, doc_indexes, tfs = [], [], []
+    doc_ids, doc_lengths, doc_types, doc_difficulty, doc_public = [], [], [], [], []
+    tag_pairs = []
+    for question in _questions().iterator(chunk_size=BUILD_CHUNK_SIZE):
+        doc = document(question)
+        position = len(doc_ids)
+        doc_ids.append(question.id)
+        doc_lengths.append(doc.length)
+        doc_types.append(doc.type)
+        doc_difficulty.append(doc.difficulty)
+        doc_public.append(doc.is_public)
+        tag_pairs.extend((tag_id, position) for tag_id in doc.tags)
+        for term, tf in doc.terms.items():
+            term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+            doc_indexes.append(position)
+            tfs.append(tf)
+
+    # 词项按字典序（即 UTF-8 字节序）排列，查询时二分查找
+    ordered = sorted(vocabulary)
+    rank = np.empty(len(vocabulary), dtype=np.int64)
+    rank[np.asarray([vocabulary[term] for term in ordered], dtype=np.int64)] = np.arange(len(ordered))
+    encoded = [term.encode() for term in ordered]
+
+    term_rank = rank[np.asarray(term_ids, dtype=np.int64)] if term_ids else np.zeros(0, dtype=np.int64)
+    order = np.lexsort((np.asarray(doc_indexes, dtype=np.int64), term_rank))
+    tag_pairs.sort()
+    tag_keys, tag_counts = np.unique(np.asarray([tag for tag, _ in tag_pairs], dtype=np.int64), return_counts=True)
+
+    arrays = {
+        'term_offsets': np.concatenate(([0], np.cumsum([len(item) for item in encoded], dtype=np.int64))),
+        'postings_offsets': np.concatenate(([0], np.cumsum(np.bincount(term_rank, minlength=len(ordered))))),
+        'postings_docs': np.asarray(doc_indexes, dtype=np.int32)[order],
+        'postings_tf': np.asarray(tfs, dtype=np.float32)[order],
+        'doc_ids': np.asarray(doc_ids, dtype=np.int64),
+        'doc_lengths': np.asarray(doc_lengths, dtype=np.float32),
+        'doc_types': np.asarray(doc_types, dtype=np.int8),
+        'doc_difficulty': np.asarray(doc_difficulty, dtype=np.int8),
+        'doc_public': np.asarray(doc_public, dtype=bool),
+        'tag_keys': tag_keys,
+        'tag_offsets': np.concatenate(([0], np.cumsum(tag_counts))).astype(np.int64),
+        'tag_docs': np.asarray([position for _, position in tag_pairs], dtype=np.int32),
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    path = tempfile.mkdtemp(prefix=f'{int(time.time() * 1000)}-{seq}-', dir=directory)
+    name = os.path.basename(path)
+    for key, array in arrays.items():
+        np.save(os.path.join(path, f'{key}.npy'), array)
+    with open(os.path.join(path, 'terms.bin'), 'wb') as fp:
+        fp.write(b''.join(encoded))
+    with open(os.path.join(path, 'meta.json'), 'w') as fp:
+        json.dump({
+            'seq': seq,
+            'doc_count': len(doc_ids),
+            'avgdl': float(np.mean(doc_lengths)) if doc_lengths else 0.0,
+        }, fp)
+
+    previous = _current_path(directory)
+    pointer = os.path.join(directory, 'CURRENT.tmp')
+    with open(pointer, 'w') as fp:
+        fp.write(name)
+    os.replace(pointer, os.path.join(directory, 'CURRENT'))
+
+    # 早于上一份快照的变更已不再需要
+    if client is not None and previous is not None:
+        client.zremrangebyscore(CHANGES_KEY, '-inf', Snapshot(previous).seq)
+    _prune(directory)
+    return path
+
+
+def _prune(directory):
+    names = sorted(
+        (name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name))),
+        key=lambda name: int(name.split('-')[0]),
+    )
+    for name in names[:-KEEP_SNAPSHOTS]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+class Snapshot:
+    """只读索引快照（mmap）"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as fp:
+            meta = json.load(fp)
+        self.seq = meta['seq']
+        self.avgdl = meta['avgdl'] or 1.0
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+        terms_path = os.path.join(path, 'terms.bin')
+        if os.path.getsize(terms_path):
+            self.term_bytes = np.memmap(terms_path, dtype=np.uint8, mode='r')
+        else:
+            self.term_bytes = np.zeros(0, dtype=np.uint8)
+        self.term_count = len(self.term_offsets) - 1
+
+    def term(self, i):
+        return self.term_bytes[self.term_offsets[i]:self.term_offsets[i + 1]].tobytes()
+
+    def _bisect(self, key):
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, term):
+        """词项序号，不存在时返回 None"""
+        key = term.encode()
+        i = self._bisect(key)
+        return i if i < self.term_count and self.term(i) == key else None
+
+    def prefix_range(self, prefix):
+        key = prefix.encode()
+        return self._bisect(key), self._bisect(key + b'\xff')
+
+    def postings(self, i):
+        lo, hi = self.postings_offsets[i], self.postings_offsets[i + 1]
+        return self.postings_docs[lo:hi], self.postings_tf[lo:hi]
+
+
+# ---------------------------------------------------------------- 索引
+
+class InvertedIndex:
+    """
+    快照 + 增量层
+    被更新或删除的题目在快照中屏蔽，更新后的文档保存在增量层；
+    文档频率与平均长度沿用快照统计，增量层较小时对排序影响可忽略
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.alive = np.ones(len(snapshot.doc_ids), dtype=bool)
+        self.norms = (K1 * (1 - B + B * np.asarray(snapshot.doc_lengths) / snapshot.avgdl)).astype(np.float32)
+        self.overlay = {}
+        self.overlay_df = Counter()
+        self.synced_seq = snapshot.seq
+        self.lock = threading.Lock()
+
+    @property
+    def doc_count(self):
+        return int(self.alive.sum()) + len(self.overlay)
+
+    def _base_position(self, question_id):
+        doc_ids = self.snapshot.doc_ids
+        position = int(np.searchsorted(doc_ids, question_id))
+        if position < len(doc_ids) and doc_ids[position] == question_id:
+            return position
+        return None
+
+    def remove(self, question_id):
+        with self.lock:
+            position = self._base_position(question_id)
+            if position is not None:
+                self.alive[position] = False
+            doc = self.overlay.pop(question_id, None)
+            if doc is not None:
+                self.overlay_df.subtract(doc.terms.keys())
+
+    def upsert(self, question_id, doc):
+        self.remove(question_id)
+        with self.lock:
+            self.overlay[question_id] = doc
+            self.overlay_df.update(doc.terms.keys())
+
+    def refresh(self, question_ids):
+        """从数据库重新载入题目（已删除的移出索引）"""
+        found = set()
+        for question in _questions(question_ids):
+            self.upsert(question.id, document(question))
+            found.add(question.id)
+        for question_id in set(question_ids) - found:
+            self.remove(question_id)
+
+    def sync(self):
+        """按 Redis 变更日志补齐其他进程的题目变更"""
+        client = get_redis()
+        if client is None:
+            return
+        seq = int(client.get(SEQ_KEY) or 0)
+        if seq <= self.synced_seq:
+            return
+        changed = client.zrangebyscore(CHANGES_KEY, f'({self.synced_seq}', seq)
+        self.refresh([int(member) for member in changed])
+        self.synced_seq = seq
+
+    def _expand(self, query):
+        """查询词项及其权重；未命中的英文词按模糊匹配展开"""
+        expanded = []
+        for term in set(terms(query, query=True)):
+            if self.snapshot.find(term) is not None or self.overlay_df[term] > 0:
+                expanded.append((term, 1.0))
+            elif len(term) >= FUZZY_MIN_LENGTH and FUZZY_PATTERN.fullmatch(term):
+                expanded.extend((candidate, FUZZY_WEIGHT) for candidate in self._fuzzy(term))
+        return expanded
+
+    def _fuzzy(self, term):
+        lo, hi = self.snapshot.prefix_range(term[0])
+        candidates = []
+        for i in range(lo, min(hi, lo + FUZZY_MAX_CANDIDATES)):
+            candidate = self.snapshot.term(i).decode()
+            if _within_one_edit(term, candidate):
+                candidates.append(candidate)
+        return candidates
+
+    def _filter_mask(self, type, difficulty, tags, public_only):
+        snapshot = self.snapshot
+        mask = self.alive.copy()
+        if public_only:
+            mask &= snapshot.doc_public
+        if type is not None:
+            mask &= np.asarray(snapshot.doc_types) == (TYPES.index(type) if type in TYPES else -2)
+        if difficulty is not None:
+            mask &= np.asarray(snapshot.doc_difficulty) == int(difficulty)
+        if tags:
+            tagged = np.zeros(len(mask), dtype=bool)
+            for tag_id in tags:
+                position = int(np.searchsorted(snapshot.tag_keys, tag_id))
+                if position < len(snapshot.tag_keys) and snapshot.tag_keys[position] == tag_id:
+                    tagged[snapshot.tag_docs[snapshot.tag_offsets[position]:snapshot.tag_offsets[position + 1]]] = True
+            mask &= tagged
+        return mask
+
+    def _overlay_matches(self, doc, type, difficulty, tags, public_only):
+        return (
+            (not public_only or doc.is_public)
+            and (type is None or doc.type == (TYPES.index(type) if type in TYPES else -2))
+            and (difficulty is None or doc.difficulty == int(difficulty))
+            and (not tags or bool(set(tags) & set(doc.tags)))
+        )
+
+    def search(self, query, limit=20, type=None, difficulty=None, tags=None, public_only=False, facets=False):
+        """
+        BM25 检索（词项间为“或”关系，按得分排序）
+
+        Args:
+            type: 题型
+            difficulty: 难度
+            tags: 标签 ID 列表，命中任一即可
+            public_only: 只检索公开题目
+            facets: 是否统计命中结果的题型、难度、标签分布
+
+        Returns:
+            {'ids': [...], 'scores': [...], 'total': 命中数, 'facets': {...} 或 None}
+        """
+        # 增量层与屏蔽位由 on_commit 回调修改，检索期间持锁避免读到修改中的字典
+        with self.lock:
+            return self._search(query, limit, type, difficulty, tags, public_only, facets)
+
+    def _search(self, query, limit, type, difficulty, tags, public_only, facets):
+        snapshot = self.snapshot
+        n = self.doc_count
+        scores = np.zeros(len(snapshot.doc_ids), dtype=np.float32)
+        overlay_scores = Counter()
+
+        for term, boost in self._expand(query):
+            position = snapshot.find(term)
+            docs, tfs = snapshot.postings(position) if position is not None else ((), ())
+            df = len(docs) + self.overlay_df[term]
+            if not df:
+                continue
+            idf = boost * math.log(1 + (n - df + 0.5) / (df + 0.5))
+            if len(docs):
+                scores[docs] += idf * tfs * (K1 + 1) / (tfs + self.norms[docs])
+            for question_id, doc in self.overlay.items():
+                tf = doc.terms.get(term)
+                if tf:
+                    norm = K1 * (1 - B + B * doc.length / snapshot.avgdl)
+                    overlay_scores[question_id] += idf * tf * (K1 + 1) / (tf + norm)
+
+        candidates = np.flatnonzero((scores > 0) & self._filter_mask(type, difficulty, tags, public_only))
+        overlay_hits = [
+            (score, question_id) for question_id, score in overlay_scores.items()
+            if self._overlay_matches(self.overlay[question_id], type, difficulty, tags, public_only)
+        ]
+
+        top = candidates
+        if len(candidates) > limit:
+            top = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        hits = [(float(scores[i]), int(snapshot.doc_ids[i])) for i in top] + overlay_hits
+        hits.sort(key=lambda hit: (-hit[0], hit[1]))
+        hits = hits[:limit]
+
+        return {
+            'ids': [question_id for _, question_id in hits],
+            'scores': [round(score, 4) for score, _ in hits],
+            'total': len(candidates) + len(overlay_hits),
+            'facets': self._facets(candidates, [question_id for _, question_id in overlay_hits]) if facets else None,
+        }
+
+    def _facets(self, candidates, overlay_ids):
+        snapshot = self.snapshot
+        type_counts = np.bincount(np.asarray(snapshot.doc_types)[candidates], minlength=len(TYPES))
+        difficulty_counts = Counter(np.asarray(snapshot.doc_difficulty)[candidates].tolist())
+
+        matched = np.zeros(len(snapshot.doc_ids), dtype=bool)
+        matched[candidates] = True
+        cumulative = np.concatenate(([0], np.cumsum(matched[snapshot.tag_docs])))
+        tag_counts = cumulative[snapshot.tag_offsets[1:]] - cumulative[snapshot.tag_offsets[:-1]]
+        tags = Counter({int(tag_id): int(count) for tag_id, count in zip(snapshot.tag_keys, tag_counts) if count})
+
+        types = Counter({TYPES[i]: int(count) for i, count in enumerate(type_counts) if count})
+        for question_id in overlay_ids:
+            doc = self.overlay[question_id]
+            if doc.type >= 0:
+                types[TYPES[doc.type]] += 1
+            difficulty_counts[doc.difficulty] += 1
+            tags.update(doc.tags)
+
+        return {
+            'type': dict(types),
+            'difficulty': {int(key): int(value) for key, value in sorted(difficulty_counts.items())},
+            'tags': dict(tags.most_common()),
+        }
+
+
+# ---------------------------------------------------------------- 进程级实例
+
+_index = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_index():
+    """
+    当前进程的索引：首次使用时加载快照（不存在则从题库构建），
+    之后每 SYNC_INTERVAL 秒检查一次是否有新快照与其他进程的变更
+    """
+    global _index, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < SYNC_INTERVAL:
+        return _index
+
+    with _lock:
+        _checked_at = now
+        directory = index_dir()
+        path = _current_path(directory) or build(directory)
+        if _index is None or _index.snapshot.path != path:
+            _index = InvertedIndex(Snapshot(path))
+        _index.sync()
+    return _index
+
+
+def reset():
+    """丢弃当前进程的索引，下次使用时重新加载"""
+    global _index
+    _index = None
+
+
+def search(query, limit=20, **filters):
+    return get_index().search(query, limit, **filters)
+
+
+def _apply_change(question_id):
+    client = get_redis()
+    if client is not None:
+        # 序号递增与写入变更日志须原子执行，否则其他进程可能读到新序号却取不到该变更
+        client.eval(APPEND_CHANGE_SCRIPT, 2, SEQ_KEY, CHANGES_KEY, question_id)
+    if _index is not None:
+        _index.refresh([question_id])
+
+
+def record_change(question_id):
+    """题目保存、删除或标签变化后更新索引（事务提交后执行）"""
+    if enabled():
+        transaction.on_commit(lambda: _apply_change(question_id))
+
+
+def filter_queryset(queryset, query):
+    """按索引命中过滤查询集，并保持相关度顺序"""
+    ids = search(query, MAX_FILTER_HITS)['ids']
+    if not ids:
+        return queryset.none()
+    return queryset.filter(id__in=ids).annotate(
+        search_position=Case(
+            *[When(id=question_id, then=position) for position, question_id in enumerate(ids)],
+            output_field=IntegerField(),
+        )
+    ).order_by('search_position')
@@ -0,0 +1,152 @@
+"""
+搜索索引发件箱
+题目创建、修改、删除时在同一事务内写入发件箱行（事务回滚则一并回滚，不会出现索引与数据库不一致），
+Celery 任务按批领取到期的行（以租约代替长事务），同一题目的多条变更合并为最后一次操作，
+以一次 bulk 请求同步到 Elasticsearch；失败的行按指数退避重试，超过最大次数后停止处理
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.questions.models import Question, SearchOutbox
+
+BATCH_SIZE = 500
+MAX_ATTEMPTS = 8
+# 退避：BASE_DELAY × 2^(尝试次数-1)，不超过 MAX_DELAY
+BASE_DELAY = timedelta(seconds=30)
+MAX_DELAY = timedelta(hours=1)
+# 领取后的租约：超过该时间仍未记录结果的行可被重新领取
+LEASE = timedelta(minutes=5)
+
+
+def enabled():
+    from apps.questions.services.search import search_service
+
+    return search_service.use_elasticsearch and search_service.es_client is not None
+
+
+def record(question_id, action=SearchOutbox.Action.INDEX):
+    """写入发件箱（在调用方的事务内）；事务提交后触发一次处理，同一事务的多行共用一次"""
+    if not enabled():
+        return
+    SearchOutbox.objects.create(question_id=question_id, action=action, next_attempt_at=timezone.now())
+    # 同一事务只投递一次处理任务：已登记且尚未执行的回调仍在 run_on_commit 中（回滚时随之丢弃）
+    pending = getattr(connection, '_search_outbox_schedule', None)
+    if pending is None or pending.done or not any(callback[1] is pending for callback in connection.run_on_commit):
+        pending = _Schedule()
+        connection._search_outbox_schedule = pending
+        transaction.on_commit(pending)
+
+
+class _Schedule:
+    """事务提交后投递一次发件箱处理任务"""
+
+    def __init__(self):
+        self.done = False
+
+    def __call__(self):
+        from apps.questions.tasks import process_search_outbox
+
+        self.done = True
+        process_search_outbox.delay()
+
+
+def backoff(attempts):
+    return min(BASE_DELAY * 2 ** (attempts - 1), MAX_DELAY)
+
+
+def _claim(batch_size):
+    """
+    领取一批到期的行：将 next_attempt_at 推后 LEASE 作为租约后立即提交，
+    调用 Elasticsearch 时不持有行锁与事务；进程中途退出时租约到期后由其他任务重新领取
+    """
+    with transaction.atomic():
+        queryset = SearchOutbox.objects.filter(next_attempt_at__lte=timezone.now()).order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            # 多个任务并发领取时跳过已被锁定的行
+            queryset = queryset.select_for_update(skip_locked=True)
+        else:
+            queryset = queryset.select_for_update()
+        rows = list(queryset[:batch_size])
+        if rows:
+            SearchOutbox.objects.filter(id__in=[row.id for row in rows]).update(
+                next_attempt_at=timezone.now() + LEASE
+            )
+    return rows
+
+
+def _send(rows):
+    """
+    将一批行同步到 Elasticsearch（不在事务内）
+
+    Returns:
+        {题目ID: 错误信息}，仅包含失败的题目
+    """
+    from apps.questions.services.search import search_service
+
+    # 同一题目只执行最后一次操作
+    latest = {}
+    for row in rows:
+        latest[row.question_id] = row.action
+    index_ids = [question_id for question_id, action in latest.items() if action == SearchOutbox.Action.INDEX]
+    delete_ids = [question_id for question_id, action in latest.items() if action == SearchOutbox.Action.DELETE]
+
+    questions = list(Question.objects.filter(id__in=index_ids, is_deleted=False).prefetch_related('tags'))
+    # 待索引但已删除的题目改为删除索引
+    delete_ids += sorted(set(index_ids) - {question.id for question in questions})
+
+    try:
+        errors = {}
+        if questions:
+            errors.update(search_service.bulk_index_questions(questions))
+        if delete_ids:
+            errors.update(search_service.bulk_delete_questions(delete_ids))
+    except Exception as e:
+        # 连接失败等整体错误：本批全部重试
+        errors = {question_id: repr(e) for question_id in latest}
+    return errors
+
+
+def process(batch_size=BATCH_SIZE):
+    """
+    处理一批到期的发件箱行：领取、同步、记录结果分别进行，
+    Elasticsearch 请求期间不持有数据库事务
+
+    Returns:
+        (成功行数, 失败行数)
+    """
+    rows = _claim(batch_size)
+    if not rows:
+        return 0, 0
+
+    errors = _send(rows)
+
+    done = [row.id for row in rows if row.question_id not in errors]
+    failed = [row for row in rows if row.question_id in errors]
+    now = timezone.now()
+    for row in failed:
+        row.attempts += 1
+        row.last_error = str(errors[row.question_id])[:2000]
+        row.next_attempt_at = now + backoff(row.attempts) if row.attempts < MAX_ATTEMPTS else None
+    with transaction.atomic():
+        SearchOutbox.objects.filter(id__in=done).delete()
+        SearchOutbox.objects.bulk_update(failed, ['attempts', 'last_error', 'next_attempt_at'])
+
+    return len(done), len(failed)
+
+
+def drain(batch_size=BATCH_SIZE, max_batches=20):
+    """
+    连续处理多批，直到没有到期的行或达到批数上限
+
+    Returns:
+        成功行数
+    """
+    total = 0
+    for _ in range(max_batches):
+        succeeded, failed = process(batch_size)
+        total += succeeded
+        if succeeded + failed < batch_size:
+            break
+    return total
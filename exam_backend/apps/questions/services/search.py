@@ -1,17 +1,83 @@
 """
 搜索服务
-支持 PostgreSQL 全文检索和可选的 Elasticsearch 集成
+支持 PostgreSQL 全文检索、可选的 Elasticsearch 集成以及进程内倒排索引（见 inverted_index）
+全文检索直接查询 questions.search_vector 存储生成列（标题/内容/答案/解析的分词字段加权，GIN 索引），
+中文按单字与二字词切分（见 tokenizer），非 PostgreSQL 数据库降级为 icontains
 """
 from django.conf import settings
+from django.contrib.postgres.lookups import TrigramSimilar
 from django.contrib.postgres.search import (
-    SearchVector,
     SearchQuery,
     SearchRank,
+    SearchVectorField,
     TrigramSimilarity,
 )
-from django.db.models import Q, Value, F
+from django.db import connections
+from django.db.models import Q, F
+from django.db.models.expressions import RawSQL
 from django.db.models.functions import Greatest
 
+from apps.questions.services.tokenizer import query_text
+
+SEARCH_CONFIG = 'simple'
+SEARCH_VECTOR_COLUMN = 'search_vector'
+SEARCH_VECTOR_INDEX = 'questions_search_vector_idx'
+
+# 存储生成列定义，与迁移 questions.0004 保持一致；分词字段见 tokenizer.index_text
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(title_tokens, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(content_tokens, '')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(answer_tokens, '')), 'C') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(analysis_tokens, '')), 'D')"
+)
+
+
+def supports_full_text(queryset):
+    """查询集所在数据库是否支持全文检索（存储生成列仅在 PostgreSQL 上创建）"""
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def stored_search_vector(queryset):
+    """引用 questions.search_vector 存储列的表达式"""
+    quote_name = connections[queryset.db].ops.quote_name
+    table = queryset.model._meta.db_table
+    return RawSQL(f'{quote_name(table)}.{quote_name(SEARCH_VECTOR_COLUMN)}', [], output_field=SearchVectorField())
+
+
+def full_text_search(queryset, query, similarity_fields=('title',), contains_fields=('title', 'content')):
+    """
+    全文检索题目
+
+    PostgreSQL：关键词按 tokenizer.query_text 切分后与 search_vector 匹配（GIN 索引），
+    或三元组相似（%，需 pg_trgm 与三元组索引），按相关度与相似度排序；
+    其他数据库或关键词切分后为空时：icontains 匹配
+
+    Args:
+        queryset: 题目查询集
+        query: 搜索关键词
+        similarity_fields: 参与三元组模糊匹配的字段
+        contains_fields: 降级时参与子串匹配的字段
+    """
+    tokens = query_text(query)
+    if not supports_full_text(queryset) or not tokens:
+        contains = Q()
+        for field in contains_fields:
+            contains |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(contains)
+
+    search_query = SearchQuery(tokens, config=SEARCH_CONFIG)
+    similarities = [TrigramSimilarity(field, query) for field in similarity_fields]
+    condition = Q(search=search_query)
+    for field in similarity_fields:
+        condition |= Q(TrigramSimilar(F(field), query))
+
+    return queryset.annotate(
+        search=stored_search_vector(queryset),
+    ).annotate(
+        rank=SearchRank(F('search'), search_query),
+        similarity=Greatest(*similarities) if len(similarities) > 1 else similarities[0],
+    ).filter(condition).order_by('-rank', '-similarity')
+
 
 class SearchService:
     """
@@ -21,6 +87,7 @@ class SearchService:
 
     def __init__(self):
         self.use_elasticsearch = getattr(settings, 'USE_ELASTICSEARCH', False)
+        self.use_inverted_index = getattr(settings, 'USE_INVERTED_INDEX', False)
         if self.use_elasticsearch:
             self._init_elasticsearch()
 
@@ -53,6 +120,8 @@ class SearchService:
         """
         if self.use_elasticsearch and self.es_client:
             return self._search_with_elasticsearch(query, queryset, limit)
+        if self.use_inverted_index:
+            return self._search_with_inverted_index(query, queryset, limit)
         return self._search_with_postgres(query, queryset, limit)
 
     def _search_with_postgres(self, query, queryset=None, limit=50):
@@ -67,41 +136,24 @@ class SearchService:
         if not query:
             return queryset[:limit]
 
-        # 构建搜索向量
-        # weight: A > B > C > D，权重从高到低
-        search_vector = (
-            SearchVector('title', weight='A', config='simple') +
-            SearchVector('content', weight='B', config='simple') +
-            SearchVector('answer', weight='C', config='simple') +
-            SearchVector('answer_analysis', weight='D', config='simple')
-        )
-
-        # 构建搜索查询
-        search_query = SearchQuery(query, config='simple')
+        # 权重 A > B > C > D 已写入 search_vector 存储列
+        return full_text_search(queryset, query, similarity_fields=('title', 'content'))[:limit]
 
-        # 计算搜索排名
-        search_rank = SearchRank(search_vector, search_query)
-
-        # 三元组相似度（用于模糊匹配）
-        title_similarity = TrigramSimilarity('title', query)
-        content_similarity = TrigramSimilarity('content', query)
+    def _search_with_inverted_index(self, query, queryset=None, limit=50):
+        """
+        使用进程内倒排索引搜索（BM25）
+        索引命中后再经查询集过滤，保证可见范围与软删除一致
+        """
+        from apps.questions.models import Question
+        from apps.questions.services import inverted_index
 
-        # 综合相似度
-        combined_similarity = Greatest(title_similarity, content_similarity)
+        if queryset is None:
+            queryset = Question.objects.filter(is_deleted=False)
 
-        # 执行搜索
-        results = queryset.annotate(
-            search=search_vector,
-            rank=search_rank,
-            similarity=combined_similarity,
-        ).filter(
-            Q(search=search_query) |
-            Q(similarity__gt=0.1) |
-            Q(title__icontains=query) |
-            Q(content__icontains=query)
-        ).order_by('-rank', '-similarity')[:limit]
+        if not query:
+            return queryset[:limit]
 
-        return results
+        return inverted_index.filter_queryset(queryset, query)[:limit]
 
     def _search_with_elasticsearch(self, query, queryset=None, limit=50):
         """
@@ -152,12 +204,24 @@ class SearchService:
 
     def index_question(self, question):
         """
-        将题目索引到 Elasticsearch
+        将题目加入索引队列（写入搜索索引发件箱，由 Celery 任务异步同步）
         """
-        if not self.use_elasticsearch or not self.es_client:
-            return
+        from apps.questions.services import outbox
+
+        outbox.record(question.id)
+
+    def delete_question_index(self, question_id):
+        """
+        将题目索引删除加入队列
+        """
+        from apps.questions.models import SearchOutbox
+        from apps.questions.services import outbox
 
-        doc = {
+        outbox.record(question_id, SearchOutbox.Action.DELETE)
+
+    def _question_document(self, question):
+        """题目的索引文档；tags 需已预取"""
+        return {
             'title': question.title,
             'content': question.content,
             'answer': question.answer,
@@ -165,65 +229,64 @@ class SearchService:
             'type': question.type,
             'difficulty': question.difficulty,
             'category_id': question.category_id,
-            'tags': list(question.tags.values_list('name', flat=True)),
+            'tags': [tag.name for tag in question.tags.all()],
             'created_at': question.created_at.isoformat() if question.created_at else None,
         }
 
-        try:
-            self.es_client.index(
-                index=getattr(settings, 'ELASTICSEARCH_QUESTION_INDEX', 'questions'),
-                id=str(question.id),
-                body=doc
-            )
-        except Exception as e:
-            pass  # 静默失败，不影响主流程
-
-    def delete_question_index(self, question_id):
+    def _bulk(self, actions, ignore_not_found=False):
         """
-        从 Elasticsearch 删除题目索引
+        执行 bulk 请求
+
+        Returns:
+            {题目ID: 错误信息}，仅包含失败的条目；连接失败等整体错误直接抛出
         """
-        if not self.use_elasticsearch or not self.es_client:
-            return
+        if not actions:
+            return {}
 
-        try:
-            self.es_client.delete(
-                index=getattr(settings, 'ELASTICSEARCH_QUESTION_INDEX', 'questions'),
-                id=str(question_id)
-            )
-        except Exception:
-            pass
+        from elasticsearch.helpers import bulk
+
+        _, items = bulk(self.es_client, actions, raise_on_error=False, raise_on_exception=True)
+        errors = {}
+        for item in items:
+            (_, result), = item.items()
+            if ignore_not_found and result.get('status') == 404:
+                continue
+            errors[int(result['_id'])] = result.get('error') or result.get('status')
+        return errors
 
     def bulk_index_questions(self, questions):
         """
-        批量索引题目到 Elasticsearch
+        批量索引题目到 Elasticsearch（传入查询集时预取标签）
+
+        Returns:
+            {题目ID: 错误信息}
         """
         if not self.use_elasticsearch or not self.es_client:
-            return
+            return {}
 
-        from elasticsearch.helpers import bulk
+        if hasattr(questions, 'prefetch_related'):
+            questions = questions.prefetch_related('tags')
+        index = getattr(settings, 'ELASTICSEARCH_QUESTION_INDEX', 'questions')
+        return self._bulk([
+            {'_index': index, '_id': str(question.id), '_source': self._question_document(question)}
+            for question in questions
+        ])
 
-        actions = []
-        for question in questions:
-            actions.append({
-                '_index': getattr(settings, 'ELASTICSEARCH_QUESTION_INDEX', 'questions'),
-                '_id': str(question.id),
-                '_source': {
-                    'title': question.title,
-                    'content': question.content,
-                    'answer': question.answer,
-                    'answer_analysis': question.answer_analysis,
-                    'type': question.type,
-                    'difficulty': question.difficulty,
-                    'category_id': question.category_id,
-                    'tags': list(question.tags.values_list('name', flat=True)),
-                    'created_at': question.created_at.isoformat() if question.created_at else None,
-                }
-            })
+    def bulk_delete_questions(self, question_ids):
+        """
+        批量删除题目索引，不存在的文档视为成功
 
-        try:
-            bulk(self.es_client, actions)
-        except Exception:
-            pass
+        Returns:
+            {题目ID: 错误信息}
+        """
+        if not self.use_elasticsearch or not self.es_client:
+            return {}
+
+        index = getattr(settings, 'ELASTICSEARCH_QUESTION_INDEX', 'questions')
+        return self._bulk(
+            [{'_op_type': 'delete', '_index': index, '_id': str(question_id)} for question_id in question_ids],
+            ignore_not_found=True,
+        )
 
 
 # 全局搜索服务实例
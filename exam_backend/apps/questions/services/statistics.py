@@ -0,0 +1,49 @@
+"""
+题目统计
+一次条件聚合查询得到总数及按题型、难度的分布，结果短时缓存
+"""
+from django.core.cache import cache
+from django.db.models import Count
+
+from apps.questions.models import Question
+from utils.db import choice_counts
+
+STATISTICS_CACHE_TIMEOUT = 60
+
+
+def cache_key(scope):
+    return f'questions:statistics:{scope}'
+
+
+def compute(queryset):
+    """
+    计算题目统计
+
+    Returns:
+        {'total', 'by_type': {名称: 数量}, 'by_difficulty': {名称: 数量}}
+    """
+    counts = queryset.order_by().aggregate(
+        total=Count('pk'),
+        **choice_counts('type', Question.Type.choices),
+        **choice_counts('difficulty', Question.Difficulty.choices),
+    )
+    return {
+        'total': counts['total'],
+        'by_type': {label: counts[f'type_{value}'] for value, label in Question.Type.choices},
+        'by_difficulty': {label: counts[f'difficulty_{value}'] for value, label in Question.Difficulty.choices},
+    }
+
+
+def get_statistics(queryset, scope):
+    """
+    读取题目统计
+
+    Args:
+        scope: 查询集的可见范围（如 public / all），用于区分缓存
+    """
+    key = cache_key(scope)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute(queryset)
+        cache.set(key, stats, STATISTICS_CACHE_TIMEOUT)
+    return stats
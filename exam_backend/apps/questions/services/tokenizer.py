@@ -0,0 +1,41 @@
+"""
+中日韩文本分词
+PostgreSQL 的 simple 配置把一整段连续汉字当作一个词，无法按词检索。
+写入时将汉字串展开为单字与相邻二字（bigram），查询时按同样规则切分，
+使全文检索无需 zhparser 等扩展即可命中中文子串并按相关度排序
+"""
+import re
+
+# 中日韩统一表意文字（含扩展 A 与兼容区）、日文假名、韩文音节
+CJK_RUN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+')
+
+
+def _ngrams(run, unigrams):
+    bigrams = [run[i:i + 2] for i in range(len(run) - 1)]
+    if unigrams or not bigrams:
+        return list(run) + bigrams
+    return bigrams
+
+
+def index_text(text):
+    """
+    写入时的分词结果：汉字串替换为单字与二字词，其余文本保持原样交由 simple 配置处理
+
+    >>> index_text('牛顿定律 F=ma')
+    '牛 顿 定 律 牛顿 顿定 定律 F=ma'
+    """
+    if not text:
+        return ''
+    return ' '.join(CJK_RUN.sub(lambda match: f' {" ".join(_ngrams(match.group(), True))} ', text).split())
+
+
+def query_text(text):
+    """
+    查询时的分词结果：两字及以上的汉字串只取二字词（全部命中即包含该子串），单字保留
+
+    >>> query_text('牛顿定律')
+    '牛顿 顿定 定律'
+    """
+    if not text:
+        return ''
+    return ' '.join(CJK_RUN.sub(lambda match: f' {" ".join(_ngrams(match.group(), False))} ', text).split())
@@ -0,0 +1,38 @@
+"""
+题库相关 Celery 任务
+"""
+from celery import shared_task
+
+
+@shared_task
+def flush_question_counters():
+    """
+    将 Redis 中累计的题目使用次数、正确次数批量写回数据库
+    """
+    from apps.questions.services import counters
+
+    return counters.flush()
+
+
+@shared_task
+def rebuild_search_index():
+    """
+    从题库重建倒排索引快照，合并各进程的增量层
+    """
+    from apps.questions.services import inverted_index
+
+    if not inverted_index.enabled():
+        return None
+    return inverted_index.build()
+
+
+@shared_task
+def process_search_outbox():
+    """
+    将搜索索引发件箱中到期的变更批量同步到 Elasticsearch
+    """
+    from apps.questions.services import outbox
+
+    if not outbox.enabled():
+        return 0
+    return outbox.drain()
@@ -1,6 +1,7 @@
 """
 题目视图
 """
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
@@ -10,12 +11,15 @@ from rest_framework.response import Response
 
 from apps.questions.filters import QuestionFilter
 from apps.questions.models import Question
+from apps.questions.services import inverted_index, statistics as question_statistics
+from apps.questions.services.search import search_service
 from apps.questions.serializers import (
     QuestionListSerializer,
     QuestionDetailSerializer,
     QuestionCreateSerializer,
     QuestionUpdateSerializer,
 )
+from utils.exceptions import InvalidOperationException
 from utils.mixins import MultiSerializerMixin, MultiPermissionMixin
 from utils.permissions import IsTeacherOrAdmin, ReadOnly
 
@@ -64,8 +68,9 @@ class QuestionViewSet(MultiSerializerMixin, MultiPermissionMixin, viewsets.Model
         return queryset
 
     def perform_destroy(self, instance):
-        """软删除"""
-        instance.soft_delete()
+        """软删除（与搜索索引发件箱同一事务）"""
+        with transaction.atomic():
+            instance.soft_delete()
 
     @action(detail=False, methods=['get'])
     def statistics(self, request):
@@ -73,19 +78,8 @@ class QuestionViewSet(MultiSerializerMixin, MultiPermissionMixin, viewsets.Model
         题目统计
         GET /api/v1/questions/statistics/
         """
-        queryset = self.get_queryset()
-
-        stats = {
-            'total': queryset.count(),
-            'by_type': {},
-            'by_difficulty': {},
-        }
-
-        for type_choice in Question.Type.choices:
-            stats['by_type'][type_choice[1]] = queryset.filter(type=type_choice[0]).count()
-
-        for diff_choice in Question.Difficulty.choices:
-            stats['by_difficulty'][diff_choice[1]] = queryset.filter(difficulty=diff_choice[0]).count()
+        scope = 'public' if request.user.role == 'student' else 'all'
+        stats = question_statistics.get_statistics(self.get_queryset(), scope)
 
         return Response({
             'success': True,
@@ -110,6 +104,58 @@ class QuestionViewSet(MultiSerializerMixin, MultiPermissionMixin, viewsets.Model
             'data': serializer.data
         })
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        关键词搜索（相关度排序）；启用进程内倒排索引时支持过滤与题型、难度、标签分面
+        GET /api/v1/questions/search/?q=牛顿&type=single&difficulty=2&tags=1,2&limit=20
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise InvalidOperationException('请输入搜索关键词')
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+            difficulty = request.query_params.get('difficulty')
+            difficulty = int(difficulty) if difficulty else None
+            tags = [int(tag) for tag in request.query_params.get('tags', '').split(',') if tag]
+        except ValueError:
+            raise InvalidOperationException('参数格式错误')
+        question_type = request.query_params.get('type') or None
+
+        queryset = self.get_queryset()
+        if not inverted_index.enabled():
+            if question_type:
+                queryset = queryset.filter(type=question_type)
+            if difficulty is not None:
+                queryset = queryset.filter(difficulty=difficulty)
+            if tags:
+                queryset = queryset.filter(tags__in=tags).distinct()
+            questions = search_service.search_questions(query, queryset, limit)
+            return Response({
+                'success': True,
+                'data': {
+                    'results': QuestionListSerializer(questions, many=True).data,
+                    'total': None,
+                    'facets': None,
+                }
+            })
+
+        result = inverted_index.search(
+            query, limit, type=question_type, difficulty=difficulty, tags=tags,
+            public_only=request.user.role == 'student', facets=True,
+        )
+        questions = {question.id: question for question in queryset.filter(id__in=result['ids'])}
+        return Response({
+            'success': True,
+            'data': {
+                'results': QuestionListSerializer(
+                    [questions[question_id] for question_id in result['ids'] if question_id in questions], many=True
+                ).data,
+                'total': result['total'],
+                'facets': result['facets'],
+            }
+        })
+
     @action(detail=True, methods=['post'], permission_classes=[IsTeacherOrAdmin])
     def duplicate(self, request, pk=None):
         """
@@ -118,32 +164,33 @@ class QuestionViewSet(MultiSerializerMixin, MultiPermissionMixin, viewsets.Model
         """
         question = self.get_object()
 
-        # 复制题目
-        new_question = Question.objects.create(
-            title=f'{question.title} (副本)',
-            type=question.type,
-            difficulty=question.difficulty,
-            score=question.score,
-            content=question.content,
-            answer=question.answer,
-            answer_analysis=question.answer_analysis,
-            programming_language=question.programming_language,
-            time_limit=question.time_limit,
-            memory_limit=question.memory_limit,
-            test_cases=question.test_cases,
-            category=question.category,
-            is_public=False,  # 副本默认不公开
-            created_by=request.user,
-        )
-
-        # 复制选项
-        for option in question.options.all():
-            option.pk = None
-            option.question = new_question
-            option.save()
-
-        # 复制标签
-        new_question.tags.set(question.tags.all())
+        with transaction.atomic():
+            # 复制题目
+            new_question = Question.objects.create(
+                title=f'{question.title} (副本)',
+                type=question.type,
+                difficulty=question.difficulty,
+                score=question.score,
+                content=question.content,
+                answer=question.answer,
+                answer_analysis=question.answer_analysis,
+                programming_language=question.programming_language,
+                time_limit=question.time_limit,
+                memory_limit=question.memory_limit,
+                test_cases=question.test_cases,
+                category=question.category,
+                is_public=False,  # 副本默认不公开
+                created_by=request.user,
+            )
+
+            # 复制选项
+            for option in question.options.all():
+                option.pk = None
+                option.question = new_question
+                option.save()
+
+            # 复制标签
+            new_question.tags.set(question.tags.all())
 
         serializer = QuestionDetailSerializer(new_question)
         return Response({
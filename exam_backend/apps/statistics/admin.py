@@ -3,7 +3,7 @@ Statistics Admin
 """
 from django.contrib import admin
 
-from apps.statistics.models import ExamStatistics, UserStatistics
+from apps.statistics.models import DailyStatistics, ExamReport, ExamStatistics, UserStatistics, UserTagMastery
 
 
 @admin.register(ExamStatistics)
@@ -18,3 +18,25 @@ class UserStatisticsAdmin(admin.ModelAdmin):
     list_display = ['id', 'user', 'exam_count', 'average_score', 'accuracy_rate', 'updated_at']
     search_fields = ['user__username']
     ordering = ['-updated_at']
+
+
+@admin.register(UserTagMastery)
+class UserTagMasteryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'tag', 'correct_count', 'total_count', 'updated_at']
+    search_fields = ['user__username', 'tag__name']
+    ordering = ['-updated_at']
+
+
+@admin.register(ExamReport)
+class ExamReportAdmin(admin.ModelAdmin):
+    list_display = ['id', 'exam', 'format', 'status', 'row_count', 'created_by', 'finished_at']
+    list_filter = ['format', 'status']
+    search_fields = ['exam__title']
+    ordering = ['-created_at']
+
+
+@admin.register(DailyStatistics)
+class DailyStatisticsAdmin(admin.ModelAdmin):
+    list_display = ['id', 'date', 'dimension', 'dimension_id', 'submission_count', 'finished_count', 'answer_count']
+    list_filter = ['dimension']
+    ordering = ['-date']
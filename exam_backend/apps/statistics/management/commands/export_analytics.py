@@ -0,0 +1,45 @@
+"""
+导出离线分析数据（Parquet / Arrow IPC）
+"""
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.statistics.services import export
+
+
+def _date(value):
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'日期格式应为 YYYY-MM-DD：{value}')
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class Command(BaseCommand):
+    help = '将考试或一段时间内的答案、提交记录与题目导出为 Parquet / Arrow IPC 文件'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='输出目录')
+        parser.add_argument('--exam', type=int, dest='exam_id', help='仅导出指定考试')
+        parser.add_argument('--start', type=_date, help='答案创建日期起始（含），YYYY-MM-DD')
+        parser.add_argument('--end', type=_date, help='答案创建日期结束（不含），YYYY-MM-DD')
+        parser.add_argument('--format', choices=list(export.FORMATS), default='parquet', dest='fmt')
+        parser.add_argument('--chunk-size', type=int, default=export.CHUNK_SIZE, help='每批读取的行数')
+
+    def handle(self, *args, **options):
+        if options['exam_id'] is None and options['start'] is None and options['end'] is None:
+            raise CommandError('请指定 --exam 或 --start / --end')
+
+        result = export.export(
+            options['output'],
+            exam_id=options['exam_id'],
+            start=options['start'],
+            end=options['end'],
+            fmt=options['fmt'],
+            chunk_size=options['chunk_size'],
+        )
+        for name, (path, count) in result.items():
+            self.stdout.write(f'{name}: {count} 行 -> {path}')
+        self.stdout.write(self.style.SUCCESS('导出完成'))
@@ -0,0 +1,37 @@
+"""
+按数据库重建考试排行榜
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.statistics.services import leaderboard
+from apps.submissions.models import Submission
+from utils.redis import get_redis
+
+
+class Command(BaseCommand):
+    help = '按已完成的提交记录重建考试排行榜（Redis 有序集合）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--exam',
+            type=int,
+            action='append',
+            dest='exam_ids',
+            help='仅重建指定考试，可重复指定',
+        )
+
+    def handle(self, *args, **options):
+        client = get_redis()
+        if client is None:
+            raise CommandError('缓存后端不是 Redis，排行榜直接查询数据库，无需重建')
+
+        exam_ids = options['exam_ids']
+        if exam_ids is None:
+            exam_ids = Submission.objects.filter(
+                status=Submission.Status.FINISHED
+            ).order_by().values_list('exam_id', flat=True).distinct()
+
+        total = 0
+        for exam_id in exam_ids:
+            total += leaderboard.rebuild(exam_id, client)
+        self.stdout.write(self.style.SUCCESS(f'已重建排行榜，共 {total} 条成绩'))
@@ -0,0 +1,29 @@
+"""
+按已批改答案重建用户知识点掌握情况
+"""
+from django.core.management.base import BaseCommand
+
+from apps.statistics.services import mastery
+
+
+class Command(BaseCommand):
+    help = '按已批改答案重建用户知识点掌握情况，并刷新薄弱知识点'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='仅重建指定用户，可重复指定',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=mastery.REBUILD_CHUNK_SIZE,
+            help='每批处理的用户数',
+        )
+
+    def handle(self, *args, **options):
+        total = mastery.rebuild(options['user_ids'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'已重建知识点掌握情况，共 {total} 条记录'))
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:23
+
+from django.db import migrations, models
+
+
+def drop_stale_statistics(apps, schema_editor):
+    """
+    旧的统计行只有定时任务算出的结果，缺少分数频次等累计值；
+    删除后由首次查询或下一次增量更新按现有数据重建
+    """
+    ExamStatistics = apps.get_model('statistics', 'ExamStatistics')
+    ExamStatistics.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statistics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examstatistics',
+            name='pass_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='及格人数'),
+        ),
+        migrations.AddField(
+            model_name='examstatistics',
+            name='score_frequencies',
+            field=models.JSONField(blank=True, default=dict, help_text='{"85.5": 3}，可合并，用于计算中位数、最高 / 最低分', verbose_name='分数频次'),
+        ),
+        migrations.AddField(
+            model_name='examstatistics',
+            name='score_square_sum',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name='分数平方和'),
+        ),
+        migrations.AddField(
+            model_name='examstatistics',
+            name='score_sum',
+            field=models.DecimalField(decimal_places=1, default=0, max_digits=14, verbose_name='总分累计'),
+        ),
+        migrations.AddField(
+            model_name='examstatistics',
+            name='std_deviation',
+            field=models.DecimalField(decimal_places=2, max_digits=6, null=True, verbose_name='标准差'),
+        ),
+        migrations.AddField(
+            model_name='examstatistics',
+            name='version',
+            field=models.PositiveIntegerField(default=0, verbose_name='版本'),
+        ),
+        migrations.RunPython(drop_stale_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statistics', '0002_incremental_exam_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examstatistics',
+            name='is_dirty',
+            field=models.BooleanField(default=False, verbose_name='待重建'),
+        ),
+        migrations.AddIndex(
+            model_name='examstatistics',
+            index=models.Index(condition=models.Q(('is_dirty', True)), fields=['is_dirty'], name='exam_stats_dirty_idx'),
+        ),
+    ]
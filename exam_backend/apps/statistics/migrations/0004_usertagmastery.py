@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('statistics', '0003_examstatistics_is_dirty'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTagMastery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('correct_count', models.PositiveIntegerField(default=0, verbose_name='正确数')),
+                ('total_count', models.PositiveIntegerField(default=0, verbose_name='作答数')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tags.tag', verbose_name='标签')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_mastery', to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+            ],
+            options={
+                'verbose_name': '知识点掌握情况',
+                'verbose_name_plural': '知识点掌握情况',
+                'db_table': 'user_tag_mastery',
+                'unique_together': {('user', 'tag')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import utils.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('exams', '0002_exam_is_time_limited_delete_examrecord'),
+        ('statistics', '0004_usertagmastery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel')], default='xlsx', max_length=10, verbose_name='格式')),
+                ('status', models.CharField(choices=[('pending', '等待生成'), ('running', '生成中'), ('done', '已完成'), ('failed', '生成失败')], default='pending', max_length=20, verbose_name='状态')),
+                ('file', models.FileField(blank=True, storage=utils.storage.get_report_storage, upload_to='reports/%Y/%m/', verbose_name='文件')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='提交记录数')),
+                ('error', models.TextField(blank=True, verbose_name='错误信息')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='创建人')),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reports', to='exams.exam', verbose_name='考试')),
+            ],
+            options={
+                'verbose_name': '考试报表',
+                'verbose_name_plural': '考试报表',
+                'db_table': 'exam_reports',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
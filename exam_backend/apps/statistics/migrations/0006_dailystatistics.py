@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statistics', '0005_examreport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('date', models.DateField(verbose_name='日期')),
+                ('dimension', models.CharField(choices=[('global', '全站'), ('exam', '考试'), ('category', '分类'), ('tag', '标签')], max_length=20, verbose_name='维度')),
+                ('dimension_id', models.PositiveBigIntegerField(default=0, help_text='全站维度为 0', verbose_name='维度对象ID')),
+                ('submission_count', models.PositiveIntegerField(default=0, verbose_name='开始答题数')),
+                ('active_users', models.PositiveIntegerField(default=0, verbose_name='活跃用户数')),
+                ('finished_count', models.PositiveIntegerField(default=0, verbose_name='完成评分数')),
+                ('score_sum', models.DecimalField(decimal_places=1, default=0, max_digits=14, verbose_name='得分合计')),
+                ('total_score_sum', models.DecimalField(decimal_places=1, default=0, max_digits=14, verbose_name='试卷总分合计')),
+                ('answer_count', models.PositiveIntegerField(default=0, verbose_name='已批改答案数')),
+                ('correct_count', models.PositiveIntegerField(default=0, verbose_name='正确答案数')),
+                ('answer_score_sum', models.DecimalField(decimal_places=1, default=0, max_digits=14, verbose_name='答案得分合计')),
+                ('answer_max_score_sum', models.DecimalField(decimal_places=1, default=0, max_digits=14, verbose_name='答案满分合计')),
+            ],
+            options={
+                'verbose_name': '每日统计',
+                'verbose_name_plural': '每日统计',
+                'db_table': 'daily_statistics',
+                'ordering': ['date'],
+                'unique_together': {('dimension', 'dimension_id', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+"""
+为已有考试或答题记录、但尚无统计行的用户补建 UserStatistics
+增量任务遇到缺失的统计行时只建零值行，历史数据须在此一次性补齐；
+按用户分块做分组聚合，口径与 user_stats.rebuild 一致（此处保留一份固定副本）
+"""
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+CHUNK_SIZE = 1000
+
+
+def backfill_user_statistics(apps, schema_editor):
+    Submission = apps.get_model('submissions', 'Submission')
+    Answer = apps.get_model('submissions', 'Answer')
+    UserStatistics = apps.get_model('statistics', 'UserStatistics')
+
+    existing = set(UserStatistics.objects.values_list('user_id', flat=True))
+    user_ids = sorted((
+        set(Submission.objects.filter(status='finished').values_list('user_id', flat=True).distinct())
+        | set(Answer.objects.filter(status='graded').values_list('submission__user_id', flat=True).distinct())
+    ) - existing)
+
+    for start in range(0, len(user_ids), CHUNK_SIZE):
+        chunk = user_ids[start:start + CHUNK_SIZE]
+        submissions = {
+            row['user_id']: row
+            for row in Submission.objects.filter(status='finished', user_id__in=chunk).order_by()
+            .values('user_id').annotate(
+                exam_count=Count('id'),
+                passed_count=Count('id', filter=Q(score__gte=F('exam__paper__pass_score'))),
+                total_score=Sum('score'),
+                total_duration=Sum(
+                    ExpressionWrapper(
+                        Coalesce('submit_time', 'end_time') - F('start_time'), output_field=DurationField()
+                    ),
+                    filter=Q(start_time__isnull=False),
+                ),
+            )
+        }
+        answers = {
+            row['submission__user_id']: row
+            for row in Answer.objects.filter(status='graded', submission__user_id__in=chunk).order_by()
+            .values('submission__user_id').annotate(
+                question_count=Count('id'),
+                correct_count=Count('id', filter=Q(is_correct=True)),
+            )
+        }
+
+        rows = []
+        for user_id in chunk:
+            submission = submissions.get(user_id, {})
+            answer = answers.get(user_id, {})
+            exam_count = submission.get('exam_count', 0)
+            total_score = submission.get('total_score') or Decimal(0)
+            duration = submission.get('total_duration')
+            question_count = answer.get('question_count', 0)
+            correct_count = answer.get('correct_count', 0)
+            rows.append(UserStatistics(
+                user_id=user_id,
+                exam_count=exam_count,
+                passed_count=submission.get('passed_count', 0),
+                total_score=total_score,
+                average_score=round(Decimal(total_score) / exam_count, 2) if exam_count else None,
+                question_count=question_count,
+                correct_count=correct_count,
+                accuracy_rate=round(Decimal(correct_count * 100) / question_count, 2) if question_count else None,
+                total_duration=int(duration.total_seconds()) if duration else 0,
+            ))
+        UserStatistics.objects.bulk_create(rows, batch_size=CHUNK_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statistics', '0006_dailystatistics'),
+        ('submissions', '0006_submission_standing'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_user_statistics, migrations.RunPython.noop),
+    ]
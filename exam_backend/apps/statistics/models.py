@@ -5,6 +5,7 @@ from django.conf import settings
 from django.db import models
 
 from utils.mixins import TimeStampMixin
+from utils.storage import get_report_storage
 
 
 class ExamStatistics(TimeStampMixin, models.Model):
@@ -29,6 +30,18 @@ class ExamStatistics(TimeStampMixin, models.Model):
     lowest_score = models.DecimalField('最低分', max_digits=6, decimal_places=2, null=True)
     median_score = models.DecimalField('中位数', max_digits=6, decimal_places=2, null=True)
     pass_rate = models.DecimalField('及格率', max_digits=5, decimal_places=2, null=True)
+    std_deviation = models.DecimalField('标准差', max_digits=6, decimal_places=2, null=True)
+
+    # 增量累计值（随提交记录完成评分更新）
+    score_sum = models.DecimalField('总分累计', max_digits=14, decimal_places=1, default=0)
+    score_square_sum = models.DecimalField('分数平方和', max_digits=20, decimal_places=2, default=0)
+    pass_count = models.PositiveIntegerField('及格人数', default=0)
+    score_frequencies = models.JSONField(
+        '分数频次',
+        default=dict,
+        blank=True,
+        help_text='{"85.5": 3}，可合并，用于计算中位数、最高 / 最低分'
+    )
 
     # 分数分布
     score_distribution = models.JSONField('分数分布', default=dict, blank=True)
@@ -36,10 +49,19 @@ class ExamStatistics(TimeStampMixin, models.Model):
     # 题目统计
     question_stats = models.JSONField('题目统计', default=dict, blank=True)
 
+    # 每次更新递增，用作派生缓存的版本号
+    version = models.PositiveIntegerField('版本', default=0)
+
+    # 有交卷、批改、重新评分后置为 True，定时任务只重建这些考试
+    is_dirty = models.BooleanField('待重建', default=False)
+
     class Meta:
         db_table = 'exam_statistics'
         verbose_name = '考试统计'
         verbose_name_plural = verbose_name
+        indexes = [
+            models.Index(fields=['is_dirty'], condition=models.Q(is_dirty=True), name='exam_stats_dirty_idx'),
+        ]
 
     def __str__(self):
         return f'{self.exam.title} 统计'
@@ -80,3 +102,128 @@ class UserStatistics(TimeStampMixin, models.Model):
 
     def __str__(self):
         return f'{self.user.username} 统计'
+
+
+class UserTagMastery(TimeStampMixin, models.Model):
+    """
+    用户知识点掌握情况
+    按 (用户, 标签) 累计已批改答案的作答数与正确数，答案批改时增量更新
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='tag_mastery',
+        verbose_name='用户'
+    )
+    tag = models.ForeignKey(
+        'tags.Tag',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='标签'
+    )
+    correct_count = models.PositiveIntegerField('正确数', default=0)
+    total_count = models.PositiveIntegerField('作答数', default=0)
+
+    class Meta:
+        db_table = 'user_tag_mastery'
+        verbose_name = '知识点掌握情况'
+        verbose_name_plural = verbose_name
+        unique_together = [['user', 'tag']]
+
+    def __str__(self):
+        return f'{self.user.username} - {self.tag.name}'
+
+    @property
+    def correct_rate(self):
+        """正确率"""
+        if not self.total_count:
+            return 0
+        return round(self.correct_count / self.total_count * 100, 2)
+
+
+class ExamReport(TimeStampMixin, models.Model):
+    """
+    考试成绩报表
+    由 Celery 任务流式生成后写入报表存储，通过下载接口获取
+    """
+
+    class Format(models.TextChoices):
+        CSV = 'csv', 'CSV'
+        XLSX = 'xlsx', 'Excel'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', '等待生成'
+        RUNNING = 'running', '生成中'
+        DONE = 'done', '已完成'
+        FAILED = 'failed', '生成失败'
+
+    exam = models.ForeignKey(
+        'exams.Exam',
+        on_delete=models.CASCADE,
+        related_name='reports',
+        verbose_name='考试'
+    )
+    format = models.CharField('格式', max_length=10, choices=Format.choices, default=Format.XLSX)
+    status = models.CharField('状态', max_length=20, choices=Status.choices, default=Status.PENDING)
+    file = models.FileField('文件', upload_to='reports/%Y/%m/', storage=get_report_storage, blank=True)
+    row_count = models.PositiveIntegerField('提交记录数', default=0)
+    error = models.TextField('错误信息', blank=True)
+    finished_at = models.DateTimeField('完成时间', null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='创建人'
+    )
+
+    class Meta:
+        db_table = 'exam_reports'
+        verbose_name = '考试报表'
+        verbose_name_plural = verbose_name
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.exam.title} 报表 ({self.get_format_display()})'
+
+
+class DailyStatistics(TimeStampMixin, models.Model):
+    """
+    每日统计快照
+    每晚按天汇总一次，维度为全站、考试、分类、标签；趋势图直接读取汇总行
+    """
+
+    class Dimension(models.TextChoices):
+        GLOBAL = 'global', '全站'
+        EXAM = 'exam', '考试'
+        CATEGORY = 'category', '分类'
+        TAG = 'tag', '标签'
+
+    date = models.DateField('日期')
+    dimension = models.CharField('维度', max_length=20, choices=Dimension.choices)
+    dimension_id = models.PositiveBigIntegerField('维度对象ID', default=0, help_text='全站维度为 0')
+
+    # 当天开始的提交记录
+    submission_count = models.PositiveIntegerField('开始答题数', default=0)
+    active_users = models.PositiveIntegerField('活跃用户数', default=0)
+
+    # 当天交卷并完成评分的提交记录
+    finished_count = models.PositiveIntegerField('完成评分数', default=0)
+    score_sum = models.DecimalField('得分合计', max_digits=14, decimal_places=1, default=0)
+    total_score_sum = models.DecimalField('试卷总分合计', max_digits=14, decimal_places=1, default=0)
+
+    # 当天交卷的提交记录中已批改的答案
+    answer_count = models.PositiveIntegerField('已批改答案数', default=0)
+    correct_count = models.PositiveIntegerField('正确答案数', default=0)
+    answer_score_sum = models.DecimalField('答案得分合计', max_digits=14, decimal_places=1, default=0)
+    answer_max_score_sum = models.DecimalField('答案满分合计', max_digits=14, decimal_places=1, default=0)
+
+    class Meta:
+        db_table = 'daily_statistics'
+        verbose_name = '每日统计'
+        verbose_name_plural = verbose_name
+        unique_together = [['dimension', 'dimension_id', 'date']]
+        ordering = ['date']
+
+    def __str__(self):
+        return f'{self.date} {self.get_dimension_display()} {self.dimension_id}'
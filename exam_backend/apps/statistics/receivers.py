@@ -0,0 +1,51 @@
+"""
+统计模块信号处理
+"""
+from django.dispatch import receiver
+
+from apps.statistics.services import exam_stats, leaderboard, mastery, standing, user_stats
+from apps.submissions.signals import (
+    answer_graded,
+    submission_finished,
+    submission_started,
+    submission_submitted,
+)
+
+
+@receiver(submission_started)
+def count_participant(sender, submission, **kwargs):
+    """新建提交记录，计入考试参与人数"""
+    exam_stats.record_started(submission.exam_id)
+
+
+@receiver(submission_submitted)
+def count_submitted(sender, submission, **kwargs):
+    """交卷，计入考试提交人数"""
+    exam_stats.record_submitted(submission.exam_id)
+
+
+@receiver(submission_finished)
+def record_score(sender, submission, previous_score, was_finished, **kwargs):
+    """完成评分，更新考试成绩统计、百分位、排行榜与用户学习统计"""
+    exam_stats.record_finished(submission.exam_id, submission.score, previous_score, was_finished)
+    standing.record(submission)
+    leaderboard.record(submission)
+    user_stats.record_finished(submission, previous_score, was_finished)
+
+
+@receiver(answer_graded)
+def mark_graded_exams(sender, answers, **kwargs):
+    """答案被批改，标记所在考试的统计待重建"""
+    exam_stats.mark_dirty({answer.submission.exam_id for answer in answers})
+
+
+@receiver(answer_graded)
+def record_tag_mastery(sender, answers, previous, **kwargs):
+    """答案被批改，累计用户的知识点掌握情况"""
+    mastery.record_graded(answers, previous)
+
+
+@receiver(answer_graded)
+def count_graded_answers(sender, answers, previous, **kwargs):
+    """答案被批改，累计用户的答题数与正确数"""
+    user_stats.record_graded(answers, previous)
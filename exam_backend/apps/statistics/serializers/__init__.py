@@ -3,6 +3,7 @@ from .statistics import (
     UserStatisticsSerializer,
     ExamRankingSerializer,
     QuestionAnalysisSerializer,
+    ExamReportSerializer,
 )
 
 __all__ = [
@@ -10,4 +11,5 @@ __all__ = [
     'UserStatisticsSerializer',
     'ExamRankingSerializer',
     'QuestionAnalysisSerializer',
+    'ExamReportSerializer',
 ]
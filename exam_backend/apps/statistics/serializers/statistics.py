@@ -1,9 +1,10 @@
 """
 统计序列化器
 """
+from django.urls import reverse
 from rest_framework import serializers
 
-from apps.statistics.models import ExamStatistics, UserStatistics
+from apps.statistics.models import ExamReport, ExamStatistics, UserStatistics
 
 
 class ExamStatisticsSerializer(serializers.ModelSerializer):
@@ -18,8 +19,8 @@ class ExamStatisticsSerializer(serializers.ModelSerializer):
             'id', 'exam', 'exam_title',
             'participant_count', 'submitted_count', 'graded_count',
             'average_score', 'highest_score', 'lowest_score', 'median_score',
-            'pass_rate', 'score_distribution', 'question_stats',
-            'created_at', 'updated_at'
+            'std_deviation', 'pass_count', 'pass_rate', 'score_distribution', 'question_stats',
+            'version', 'created_at', 'updated_at'
         ]
 
 
@@ -64,4 +65,26 @@ class QuestionAnalysisSerializer(serializers.Serializer):
     correct_count = serializers.IntegerField()
     correct_rate = serializers.FloatField()
     average_score = serializers.FloatField()
+    average_duration = serializers.FloatField()
+    option_counts = serializers.ListField(child=serializers.DictField())
     score_distribution = serializers.DictField()
+
+
+class ExamReportSerializer(serializers.ModelSerializer):
+    """
+    考试报表序列化器
+    """
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExamReport
+        fields = [
+            'id', 'exam', 'format', 'status', 'row_count', 'error',
+            'download_url', 'created_at', 'finished_at'
+        ]
+        read_only_fields = ['exam', 'status', 'row_count', 'error', 'created_at', 'finished_at']
+
+    def get_download_url(self, obj):
+        if obj.status != ExamReport.Status.DONE:
+            return None
+        return reverse('exam-report-download', args=[obj.id])
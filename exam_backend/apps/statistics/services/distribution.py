@@ -0,0 +1,151 @@
+"""
+考试分数分布
+区间宽度按试卷总分的比例划分：PostgreSQL 上用 width_bucket 与 percentile_cont
+在一条 SQL 中得到各区间人数与百分位数；其他数据库回退为考试统计中的分数频次表。
+结果按考试统计版本号缓存
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+
+from apps.statistics.services import exam_stats
+from apps.submissions.models import Submission
+
+DEFAULT_BUCKETS = 10
+MIN_BUCKETS = 2
+MAX_BUCKETS = 50
+
+PERCENTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+# 版本号变化即失效，超时只用于回收旧版本的缓存
+DISTRIBUTION_CACHE_TIMEOUT = 24 * 3600
+
+_DISTRIBUTION_SQL = f'''
+WITH scores AS (
+    SELECT score FROM {Submission._meta.db_table}
+    WHERE exam_id = %(exam_id)s AND status = %(status)s AND score IS NOT NULL
+),
+buckets AS (
+    SELECT LEAST(GREATEST(width_bucket(score, 0, %(total)s, %(buckets)s), 1), %(buckets)s) AS bucket,
+           COUNT(*) AS total
+    FROM scores
+    GROUP BY 1
+),
+percentiles AS (
+    SELECT percentile_cont(%(percentiles)s::float8[]) WITHIN GROUP (ORDER BY score) AS value
+    FROM scores
+)
+SELECT buckets.bucket, buckets.total, percentiles.value
+FROM buckets CROSS JOIN percentiles
+ORDER BY buckets.bucket
+'''
+
+
+def cache_key(exam_id, version, buckets):
+    return f'statistics:distribution:{exam_id}:{version}:{buckets}'
+
+
+def _postgres_counts(exam_id, total_score, buckets):
+    """PostgreSQL：一次查询得到各区间人数与百分位数"""
+    with connection.cursor() as cursor:
+        cursor.execute(_DISTRIBUTION_SQL, {
+            'exam_id': exam_id,
+            'status': Submission.Status.FINISHED,
+            'total': total_score,
+            'buckets': buckets,
+            'percentiles': PERCENTILES,
+        })
+        rows = cursor.fetchall()
+
+    counts = [0] * buckets
+    for bucket, total, _ in rows:
+        counts[bucket - 1] = total
+    values = rows[0][2] if rows else [None] * len(PERCENTILES)
+    return counts, values
+
+
+def _percentile_cont(frequencies, count, fraction):
+    """与 percentile_cont 相同的线性插值"""
+    position = fraction * (count - 1)
+    lower_rank = int(position)
+    upper_rank = min(lower_rank + 1, count - 1)
+
+    lower = upper = None
+    seen = 0
+    for score, value in frequencies:
+        if lower is None and seen + value > lower_rank:
+            lower = score
+        if seen + value > upper_rank:
+            upper = score
+            break
+        seen += value
+    return float(lower) + (float(upper) - float(lower)) * (position - lower_rank)
+
+
+def _frequency_counts(stats, total_score, buckets):
+    """回退：由考试统计的分数频次表计算，无需额外查询"""
+    frequencies = sorted(
+        (Decimal(key), value) for key, value in stats.score_frequencies.items() if value > 0
+    )
+    counts = [0] * buckets
+    width = Decimal(total_score) / buckets if total_score else Decimal(1)
+    for score, value in frequencies:
+        bucket = int(score / width) if score > 0 else 0
+        counts[min(bucket, buckets - 1)] += value
+
+    count = sum(value for _, value in frequencies)
+    if not count:
+        return counts, [None] * len(PERCENTILES)
+    return counts, [_percentile_cont(frequencies, count, fraction) for fraction in PERCENTILES]
+
+
+def compute(exam, stats, buckets=DEFAULT_BUCKETS):
+    """
+    计算分数分布
+
+    Returns:
+        {'total_score', 'bucket_width', 'count', 'buckets': [...], 'percentiles': {...}}
+    """
+    total_score = exam.paper.total_score
+    if connection.vendor == 'postgresql' and total_score > 0:
+        counts, values = _postgres_counts(exam.id, total_score, buckets)
+    else:
+        counts, values = _frequency_counts(stats, total_score, buckets)
+
+    count = sum(counts)
+    width = Decimal(total_score) / buckets
+    result = []
+    cumulative = 0
+    for index, bucket_count in enumerate(counts):
+        cumulative += bucket_count
+        result.append({
+            'lower': round(float(width * index), 2),
+            'upper': round(float(width * (index + 1)), 2),
+            'count': bucket_count,
+            'percentage': round(bucket_count / count * 100, 2) if count else 0,
+            'cumulative_percentage': round(cumulative / count * 100, 2) if count else 0,
+        })
+
+    return {
+        'total_score': float(total_score),
+        'bucket_width': round(float(width), 2),
+        'count': count,
+        'buckets': result,
+        'percentiles': {
+            f'p{int(fraction * 100)}': round(value, 2) if value is not None else None
+            for fraction, value in zip(PERCENTILES, values)
+        },
+    }
+
+
+def get_distribution(exam, buckets=DEFAULT_BUCKETS):
+    """读取分数分布，考试统计版本号变化后重新计算"""
+    buckets = min(max(buckets, MIN_BUCKETS), MAX_BUCKETS)
+    stats = exam_stats.get_or_rebuild(exam)
+    key = cache_key(exam.id, stats.version, buckets)
+    distribution = cache.get(key)
+    if distribution is None:
+        distribution = compute(exam, stats, buckets)
+        cache.set(key, distribution, DISTRIBUTION_CACHE_TIMEOUT)
+    return distribution
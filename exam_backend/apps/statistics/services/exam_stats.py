@@ -0,0 +1,252 @@
+"""
+考试统计增量维护
+提交记录开始、交卷、完成评分时更新 ExamStatistics 的累计值，
+查询接口只需读取一行；统计行不存在时先建零值行（标记待重建）再累加，
+不在增量回调中重建（同一事务的多个增量会被重复计入），由定时任务通过 rebuild 校正
+"""
+import math
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from apps.exams.models import Exam
+from apps.statistics.models import ExamStatistics
+from apps.submissions.models import Submission
+
+# 已交卷（含超时自动交卷）的提交记录
+SUBMITTED_STATUSES = [
+    Submission.Status.SUBMITTED,
+    Submission.Status.TIMEOUT,
+    Submission.Status.GRADING,
+    Submission.Status.FINISHED,
+]
+
+# 概要分数分布的区间下限（占试卷总分的比例），总分 100 时即 0-59 / 60-69 / ... / 90-100
+DISTRIBUTION_RATIOS = [0, 0.6, 0.7, 0.8, 0.9]
+
+SCORE_FIELDS = [
+    'graded_count', 'score_sum', 'score_square_sum', 'score_frequencies',
+    'average_score', 'highest_score', 'lowest_score', 'median_score', 'std_deviation',
+    'pass_count', 'pass_rate', 'score_distribution', 'version', 'updated_at',
+]
+
+
+# rebuild 写回的字段
+REBUILD_FIELDS = ['participant_count', 'submitted_count'] + SCORE_FIELDS
+
+
+def _score_key(score):
+    return str(Decimal(score).quantize(Decimal('0.1')))
+
+
+def _format_score(value):
+    value = Decimal(value).quantize(Decimal('0.1'))
+    return str(value.to_integral()) if value == value.to_integral() else str(value)
+
+
+def distribution_buckets(total_score):
+    """
+    按试卷总分生成概要分布区间
+
+    Returns:
+        [(名称, 下限), ...]，按下限升序
+    """
+    total_score = Decimal(total_score)
+    lowers = [(total_score * Decimal(str(ratio))).quantize(Decimal('0.1')) for ratio in DISTRIBUTION_RATIOS]
+    buckets = []
+    for index, lower in enumerate(lowers):
+        if index + 1 < len(lowers):
+            upper = _format_score(lowers[index + 1] - (1 if lowers[index + 1] % 1 == 0 else Decimal('0.1')))
+        else:
+            upper = _format_score(total_score)
+        buckets.append((f'{_format_score(lower)}-{upper}', lower))
+    return buckets
+
+
+def _ensure(exam_id):
+    """
+    确保统计行存在；新建的零值行标记待重建，
+    由定时任务补齐建行前已有的提交记录（如迁移清空统计后仍在进行中的考试）
+    """
+    ExamStatistics.objects.get_or_create(exam_id=exam_id, defaults={'is_dirty': True})
+
+
+def _increment(exam_id, **deltas):
+    values = {field: F(field) + delta for field, delta in deltas.items()}
+    values['version'] = F('version') + 1
+    values['is_dirty'] = True
+    _ensure(exam_id)
+    ExamStatistics.objects.filter(exam_id=exam_id).update(**values)
+
+
+def record_started(exam_id):
+    """新建提交记录"""
+    transaction.on_commit(lambda: _increment(exam_id, participant_count=1))
+
+
+def record_submitted(exam_id):
+    """提交记录交卷"""
+    transaction.on_commit(lambda: _increment(exam_id, submitted_count=1))
+
+
+def record_finished(exam_id, score, previous_score=None, was_finished=False):
+    """
+    提交记录完成评分（含重新评分）
+    重新评分时先移除旧分数再计入新分数
+    """
+    transaction.on_commit(lambda: _apply_score(exam_id, score, previous_score, was_finished))
+
+
+def _apply_score(exam_id, score, previous_score, was_finished):
+    with transaction.atomic():
+        _ensure(exam_id)
+        stats = ExamStatistics.objects.select_for_update().get(exam_id=exam_id)
+        frequencies = stats.score_frequencies
+
+        if was_finished and previous_score is not None:
+            key = _score_key(previous_score)
+            if frequencies.get(key):
+                frequencies[key] -= 1
+                if not frequencies[key]:
+                    del frequencies[key]
+                stats.graded_count = max(stats.graded_count - 1, 0)
+                stats.score_sum -= Decimal(previous_score)
+                stats.score_square_sum -= Decimal(previous_score) ** 2
+
+        if score is not None:
+            key = _score_key(score)
+            frequencies[key] = frequencies.get(key, 0) + 1
+            stats.graded_count += 1
+            stats.score_sum += Decimal(score)
+            stats.score_square_sum += Decimal(score) ** 2
+
+        pass_score, total_score = Exam.objects.filter(id=exam_id).values_list(
+            'paper__pass_score', 'paper__total_score'
+        ).first()
+        _derive(stats, pass_score, total_score)
+        stats.version = F('version') + 1
+        stats.is_dirty = True
+        stats.save(update_fields=SCORE_FIELDS + ['is_dirty'])
+
+
+def mark_dirty(exam_ids):
+    """标记考试统计待重建，并使按版本号缓存的派生数据失效"""
+    exam_ids = list(exam_ids)
+    transaction.on_commit(
+        lambda: ExamStatistics.objects.filter(exam_id__in=exam_ids).update(
+            is_dirty=True, version=F('version') + 1
+        )
+    )
+
+
+def _derive(stats, pass_score, total_score):
+    """根据累计值与分数频次计算平均分、中位数、最高 / 最低分、及格率与分布"""
+    count = stats.graded_count
+    frequencies = sorted(
+        (Decimal(key), value) for key, value in stats.score_frequencies.items() if value > 0
+    )
+
+    buckets = distribution_buckets(total_score)
+    distribution = {name: 0 for name, _ in buckets}
+    pass_count = 0
+    for score, value in frequencies:
+        name = next((name for name, lower in reversed(buckets) if score >= lower), buckets[0][0])
+        distribution[name] += value
+        if pass_score is not None and score >= pass_score:
+            pass_count += value
+
+    stats.pass_count = pass_count
+    stats.score_distribution = distribution if count else {}
+
+    if not count or not frequencies:
+        stats.average_score = stats.highest_score = stats.lowest_score = None
+        stats.median_score = stats.std_deviation = stats.pass_rate = None
+        return
+
+    mean = stats.score_sum / count
+    variance = max(float(stats.score_square_sum / count - mean * mean), 0.0)
+
+    stats.average_score = round(mean, 2)
+    stats.std_deviation = round(Decimal(math.sqrt(variance)), 2)
+    stats.highest_score = frequencies[-1][0]
+    stats.lowest_score = frequencies[0][0]
+    stats.median_score = _median(frequencies, count)
+    stats.pass_rate = round(Decimal(pass_count * 100) / count, 2)
+
+
+def _median(frequencies, count):
+    """按频次表求中位数，偶数个时取中间两数的平均"""
+    lower_rank, upper_rank = (count - 1) // 2, count // 2
+    lower = upper = None
+    seen = 0
+    for score, value in frequencies:
+        if lower is None and seen + value > lower_rank:
+            lower = score
+        if seen + value > upper_rank:
+            upper = score
+            break
+        seen += value
+    return round((lower + upper) / 2, 2)
+
+
+def rebuild(exam):
+    """
+    按现有提交记录重建考试统计（两次聚合查询）
+
+    Returns:
+        ExamStatistics
+    """
+    submissions = Submission.objects.filter(exam=exam).order_by()
+    counts = submissions.aggregate(
+        participant_count=Count('id'),
+        submitted_count=Count('id', filter=Q(status__in=SUBMITTED_STATUSES)),
+    )
+    frequencies = {
+        _score_key(score): total
+        for score, total in submissions.filter(
+            status=Submission.Status.FINISHED, score__isnull=False
+        ).values('score').annotate(total=Count('id')).values_list('score', 'total')
+    }
+
+    stats, _ = ExamStatistics.objects.get_or_create(exam=exam)
+    stats.participant_count = counts['participant_count']
+    stats.submitted_count = counts['submitted_count']
+    stats.score_frequencies = frequencies
+    stats.graded_count = sum(frequencies.values())
+    stats.score_sum = sum((Decimal(key) * value for key, value in frequencies.items()), Decimal(0))
+    stats.score_square_sum = sum((Decimal(key) ** 2 * value for key, value in frequencies.items()), Decimal(0))
+    _derive(stats, exam.paper.pass_score, exam.paper.total_score)
+    stats.version += 1
+    # 不覆盖 is_dirty：重建期间新产生的标记留给下一轮
+    stats.save(update_fields=REBUILD_FIELDS)
+    return stats
+
+
+def get_or_rebuild(exam):
+    """读取考试统计；尚无记录时按现有数据生成"""
+    stats = ExamStatistics.objects.filter(exam=exam).first()
+    return stats if stats is not None else rebuild(exam)
+
+
+def to_dict(stats, exam):
+    """考试统计接口的返回格式"""
+    data = {
+        'exam_id': exam.id,
+        'exam_title': exam.title,
+        'participant_count': stats.participant_count,
+        'submitted_count': stats.submitted_count,
+        'graded_count': stats.graded_count,
+    }
+    if stats.graded_count:
+        data.update({
+            'average_score': float(stats.average_score),
+            'highest_score': float(stats.highest_score),
+            'lowest_score': float(stats.lowest_score),
+            'median_score': float(stats.median_score),
+            'std_deviation': float(stats.std_deviation),
+            'pass_count': stats.pass_count,
+            'pass_rate': float(stats.pass_rate),
+            'score_distribution': stats.score_distribution,
+        })
+    return data
@@ -0,0 +1,202 @@
+"""
+离线分析数据导出
+将一场考试或一段时间内的答案、提交记录与题目导出为 Parquet 或 Arrow IPC 文件，供 pandas / duckdb 直接加载。
+数据经 iterator（PostgreSQL 上为服务端游标）分块读取，每块转为一个 RecordBatch 写出；
+列按类型声明，枚举列使用固定字典的字典编码，各批次共享同一字典
+"""
+import os
+from decimal import Decimal
+
+from django.db.models import Q
+
+from apps.questions.models import Question
+from apps.submissions.models import Answer, Submission
+
+CHUNK_SIZE = 50000
+
+FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+# 列定义：(列名, ORM 字段路径, 类型)；类型为 choices 时按固定字典编码
+ANSWER_COLUMNS = [
+    ('answer_id', 'id', 'int64'),
+    ('submission_id', 'submission_id', 'int64'),
+    ('exam_id', 'submission__exam_id', 'int64'),
+    ('user_id', 'submission__user_id', 'int64'),
+    ('paper_question_id', 'paper_question_id', 'int64'),
+    ('question_id', 'paper_question__question_id', 'int64'),
+    ('question_number', 'paper_question__question_number', 'int32'),
+    ('question_type', 'paper_question__question__type', Question.Type.choices),
+    ('status', 'status', Answer.Status.choices),
+    ('score', 'score', 'float64'),
+    ('max_score', 'paper_question__score', 'float64'),
+    ('is_correct', 'is_correct', 'bool_'),
+    ('option_mask', 'option_mask', 'uint32'),
+    ('answer_duration', 'answer_duration', 'int32'),
+    ('answer_content', 'answer_content', 'string'),
+    ('graded_at', 'graded_at', 'timestamp'),
+    ('created_at', 'created_at', 'timestamp'),
+]
+
+SUBMISSION_COLUMNS = [
+    ('submission_id', 'id', 'int64'),
+    ('exam_id', 'exam_id', 'int64'),
+    ('user_id', 'user_id', 'int64'),
+    ('status', 'status', Submission.Status.choices),
+    ('attempt', 'attempt', 'int16'),
+    ('score', 'score', 'float64'),
+    ('objective_score', 'objective_score', 'float64'),
+    ('subjective_score', 'subjective_score', 'float64'),
+    ('switch_count', 'switch_count', 'int16'),
+    ('start_time', 'start_time', 'timestamp'),
+    ('submit_time', 'submit_time', 'timestamp'),
+]
+
+QUESTION_COLUMNS = [
+    ('question_id', 'id', 'int64'),
+    ('type', 'type', Question.Type.choices),
+    ('difficulty', 'difficulty', 'int8'),
+    ('score', 'score', 'float64'),
+    ('category_id', 'category_id', 'int64'),
+    ('title', 'title', 'string'),
+    ('use_count', 'use_count', 'int64'),
+    ('correct_count', 'correct_count', 'int64'),
+    ('is_public', 'is_public', 'bool_'),
+    ('created_at', 'created_at', 'timestamp'),
+]
+
+
+def _arrow_type(pa, kind):
+    if isinstance(kind, (list, tuple)):
+        return pa.dictionary(pa.int8(), pa.string())
+    if kind == 'timestamp':
+        return pa.timestamp('us', tz='UTC')
+    if kind == 'string':
+        return pa.large_string()
+    return getattr(pa, kind)()
+
+
+def schema(columns):
+    """按列定义生成 Arrow schema"""
+    import pyarrow as pa
+
+    return pa.schema([(name, _arrow_type(pa, kind)) for name, _, kind in columns])
+
+
+def _array(pa, values, kind, arrow_type):
+    if isinstance(kind, (list, tuple)):
+        dictionary = [value for value, _ in kind]
+        index = {value: position for position, value in enumerate(dictionary)}
+        return pa.DictionaryArray.from_arrays(
+            pa.array([index.get(value) for value in values], type=pa.int8()),
+            pa.array(dictionary, type=pa.string()),
+        )
+    if kind == 'float64':
+        values = [float(value) if isinstance(value, Decimal) else value for value in values]
+    return pa.array(values, type=arrow_type)
+
+
+def batches(queryset, columns, chunk_size=CHUNK_SIZE):
+    """
+    分块读取查询集，逐块生成 RecordBatch
+
+    Yields:
+        pyarrow.RecordBatch
+    """
+    import pyarrow as pa
+
+    arrow_schema = schema(columns)
+    paths = [path for _, path, _ in columns]
+    rows = []
+    for row in queryset.order_by().values_list(*paths).iterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            yield _batch(pa, arrow_schema, columns, rows)
+            rows = []
+    if rows:
+        yield _batch(pa, arrow_schema, columns, rows)
+
+
+def _batch(pa, arrow_schema, columns, rows):
+    values = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [
+            _array(pa, values[position], kind, arrow_schema.field(position).type)
+            for position, (_, _, kind) in enumerate(columns)
+        ],
+        schema=arrow_schema,
+    )
+
+
+def write_table(queryset, columns, path, fmt='parquet', chunk_size=CHUNK_SIZE):
+    """
+    将查询集写为 Parquet 或 Arrow IPC 文件
+
+    Returns:
+        写入的行数
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_schema = schema(columns)
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(path, arrow_schema, compression='zstd')
+        write = writer.write_batch
+    else:
+        sink = pa.OSFile(path, 'wb')
+        writer = pa.ipc.new_file(sink, arrow_schema)
+        write = writer.write_batch
+
+    count = 0
+    try:
+        for batch in batches(queryset, columns, chunk_size):
+            write(batch)
+            count += batch.num_rows
+    finally:
+        writer.close()
+        if fmt != 'parquet':
+            sink.close()
+    return count
+
+
+def querysets(exam_id=None, start=None, end=None):
+    """
+    导出范围内的答案、提交记录与题目查询集
+
+    Args:
+        exam_id: 考试 ID
+        start, end: 答案创建时间范围 [start, end)
+    """
+    condition = Q()
+    if exam_id is not None:
+        condition &= Q(submission__exam_id=exam_id)
+    if start is not None:
+        condition &= Q(created_at__gte=start)
+    if end is not None:
+        condition &= Q(created_at__lt=end)
+
+    answers = Answer.objects.filter(condition)
+    submissions = Submission.objects.filter(id__in=answers.order_by().values('submission_id'))
+    questions = Question.objects.filter(id__in=answers.order_by().values('paper_question__question_id'))
+    return {
+        'answers': (answers, ANSWER_COLUMNS),
+        'submissions': (submissions, SUBMISSION_COLUMNS),
+        'questions': (questions, QUESTION_COLUMNS),
+    }
+
+
+def export(directory, exam_id=None, start=None, end=None, fmt='parquet', chunk_size=CHUNK_SIZE):
+    """
+    导出 answers / submissions / questions 三个文件到目录
+
+    Returns:
+        {表名: (文件路径, 行数)}
+    """
+    os.makedirs(directory, exist_ok=True)
+    result = {}
+    for name, (queryset, columns) in querysets(exam_id, start, end).items():
+        path = os.path.join(directory, f'{name}{FORMATS[fmt]}')
+        result[name] = (path, write_table(queryset, columns, path, fmt, chunk_size))
+    return result
@@ -0,0 +1,110 @@
+"""
+用户考试历史
+按 (created_at, id) 降序做键集分页，使用 (user, created_at, id) 复合索引；
+是否及格与答题时长由 SQL 注解计算，单次查询得到一页
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import BooleanField, Case, DurationField, ExpressionWrapper, F, Q, When
+from django.db.models.functions import Coalesce
+
+from apps.submissions.models import Submission
+from utils.exceptions import InvalidOperationException
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+STATUS_LABELS = dict(Submission.Status.choices)
+
+# 考试信息字段，精简模式下每页只返回一次
+EXAM_FIELDS = {
+    'exam_title': 'exam__title',
+    'total_score': 'exam__paper__total_score',
+    'pass_score': 'exam__paper__pass_score',
+}
+
+
+def encode_cursor(created_at, submission_id):
+    """将排序键编码为不透明游标"""
+    raw = f'{created_at.isoformat()}|{submission_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    """解析游标，返回 (created_at, submission_id)"""
+    try:
+        created_at, submission_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(submission_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidOperationException('无效的分页游标')
+
+
+def build_queryset(user_id):
+    """用户提交记录，注解是否及格与答题时长"""
+    return Submission.objects.filter(user_id=user_id).annotate(
+        passed=Case(
+            When(score__isnull=True, then=None),
+            When(score__gte=F('exam__paper__pass_score'), then=True),
+            default=False,
+            output_field=BooleanField(),
+        ),
+        duration=ExpressionWrapper(
+            Coalesce('submit_time', 'end_time') - F('start_time'),
+            output_field=DurationField(),
+        ),
+    ).order_by('-created_at', '-id')
+
+
+def fetch_page(user_id, cursor=None, page_size=DEFAULT_PAGE_SIZE, compact=False):
+    """
+    读取一页考试历史（单次查询）
+
+    Args:
+        compact: 精简模式，记录中不重复考试信息，改为在 exams 中按考试 ID 返回一次
+
+    Returns:
+        {'results': [...], 'next_cursor': str | None[, 'exams': {...}]}
+    """
+    queryset = build_queryset(user_id)
+    if cursor:
+        created_at, submission_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=submission_id)
+        )
+
+    rows = list(queryset.values(
+        'id', 'created_at', 'exam_id', 'score', 'passed', 'status', 'attempt', 'submit_time', 'duration',
+        **{name: F(path) for name, path in EXAM_FIELDS.items()},
+    )[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    results = []
+    exams = {}
+    for row in rows:
+        item = {
+            'submission_id': row['id'],
+            'exam_id': row['exam_id'],
+            'score': row['score'],
+            'is_passed': row['passed'],
+            'status': STATUS_LABELS.get(row['status'], row['status']),
+            'attempt': row['attempt'],
+            'submit_time': row['submit_time'],
+            'duration': row['duration'].total_seconds() if row['duration'] is not None else None,
+        }
+        exam = {name: row[name] for name in EXAM_FIELDS}
+        if compact:
+            exams.setdefault(row['exam_id'], exam)
+        else:
+            item.update(exam)
+        results.append(item)
+
+    page = {
+        'results': results,
+        'next_cursor': encode_cursor(rows[-1]['created_at'], rows[-1]['id']) if has_more else None,
+    }
+    if compact:
+        page['exams'] = exams
+    return page
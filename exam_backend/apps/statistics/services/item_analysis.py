@@ -0,0 +1,206 @@
+"""
+试题分析（经典测量理论）
+将考试的得分矩阵（提交记录 × 试卷题目）一次查询载入 NumPy 数组，向量化计算：
+难度、高低分组（27%）区分度、点二列相关、Cronbach's alpha / KR-20 以及选项干扰项分析
+"""
+import math
+
+import numpy as np
+
+from apps.statistics.services import exam_stats
+from apps.submissions.models import Answer, Submission
+
+# 高分组、低分组各取总分排序的 27%
+GROUP_RATIO = 0.27
+
+
+def _clean(value, digits=4):
+    """NaN / inf 转为 None，其余保留指定位数"""
+    value = float(value)
+    if math.isnan(value) or math.isinf(value):
+        return None
+    return round(value, digits)
+
+
+def load_matrix(exam):
+    """
+    载入考试的得分矩阵与选项位掩码矩阵（试卷题目、选项、答案各一次查询）
+
+    Returns:
+        (paper_questions, scores, masks)
+        scores: (n_submissions, n_questions) float64，未作答记 0
+        masks: (n_submissions, n_questions) int64，无选择记 0
+    """
+    paper_questions = list(
+        exam.paper.paper_questions.select_related('question')
+        .prefetch_related('question__options').order_by('question_number', 'id')
+    )
+    column = {pq.id: j for j, pq in enumerate(paper_questions)}
+
+    rows = list(
+        Answer.objects.filter(
+            submission__exam=exam,
+            submission__status=Submission.Status.FINISHED,
+            paper_question_id__in=list(column),
+        ).order_by().values_list('submission_id', 'paper_question_id', 'score', 'option_mask')
+    )
+    if not rows:
+        empty = np.zeros((0, len(paper_questions)))
+        return paper_questions, empty, empty.astype(np.int64)
+
+    submission_ids, paper_question_ids, scores, masks = zip(*rows)
+    _, row_index = np.unique(np.fromiter(submission_ids, dtype=np.int64, count=len(rows)), return_inverse=True)
+    col_index = np.fromiter((column[pq_id] for pq_id in paper_question_ids), dtype=np.int64, count=len(rows))
+
+    shape = (int(row_index.max()) + 1, len(paper_questions))
+    score_matrix = np.zeros(shape)
+    score_matrix[row_index, col_index] = np.fromiter(
+        (float(score) if score is not None else 0.0 for score in scores), dtype=np.float64, count=len(rows)
+    )
+    mask_matrix = np.zeros(shape, dtype=np.int64)
+    mask_matrix[row_index, col_index] = np.fromiter(
+        (mask or 0 for mask in masks), dtype=np.int64, count=len(rows)
+    )
+    return paper_questions, score_matrix, mask_matrix
+
+
+def _alpha(matrix):
+    """Cronbach's alpha；题目为 0/1 计分时即 KR-20"""
+    k = matrix.shape[1]
+    if k < 2 or matrix.shape[0] < 2:
+        return np.nan
+    total_var = matrix.sum(axis=1).var()
+    if total_var == 0:
+        return np.nan
+    return k / (k - 1) * (1 - matrix.var(axis=0).sum() / total_var)
+
+
+def compute(scores, max_scores, masks=None, option_counts=None):
+    """
+    向量化计算试题指标
+
+    Args:
+        scores: (n, k) 得分矩阵
+        max_scores: (k,) 每题满分
+        masks: (n, k) 选项位掩码矩阵，可选
+        option_counts: (k,) 每题选项数，非选择题为 0
+
+    Returns:
+        {'difficulty', 'discrimination', 'point_biserial': (k,) 数组,
+         'alpha', 'kr20', 'options': (全体, 高分组, 低分组) 选择比例 (k, 选项数) 或 None}
+    """
+    n, k = scores.shape
+    max_scores = np.asarray(max_scores, dtype=np.float64)
+    safe_max = np.where(max_scores > 0, max_scores, np.nan)
+    totals = scores.sum(axis=1)
+
+    # 难度：平均得分率
+    difficulty = scores.mean(axis=0) / safe_max if n else np.full(k, np.nan)
+
+    # 区分度：高分组与低分组得分率之差
+    group_size = max(1, int(round(n * GROUP_RATIO))) if n else 0
+    order = np.argsort(totals, kind='stable')
+    lower, upper = order[:group_size], order[n - group_size:]
+    if n >= 2:
+        discrimination = (scores[upper].mean(axis=0) - scores[lower].mean(axis=0)) / safe_max
+    else:
+        discrimination = np.full(k, np.nan)
+
+    # 点二列相关：题目得分与去除该题后的总分（校正后的题总相关）
+    rest = totals[:, None] - scores
+    item_centered = scores - scores.mean(axis=0)
+    rest_centered = rest - rest.mean(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        point_biserial = (item_centered * rest_centered).sum(axis=0) / np.sqrt(
+            (item_centered ** 2).sum(axis=0) * (rest_centered ** 2).sum(axis=0)
+        )
+
+    # 信度：按得分计算 alpha，按是否满分的 0/1 矩阵计算 KR-20
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = _alpha(scores)
+        kr20 = _alpha((scores >= safe_max).astype(np.float64))
+
+    result = {
+        'difficulty': difficulty,
+        'discrimination': discrimination,
+        'point_biserial': point_biserial,
+        'alpha': alpha,
+        'kr20': kr20,
+        'options': None,
+    }
+
+    # 干扰项分析：各选项在全体、高分组、低分组中的选择比例
+    if masks is not None and option_counts is not None and n:
+        option_counts = np.asarray(option_counts)
+        width = int(option_counts.max(initial=0))
+        overall = np.zeros((k, width))
+        upper_rate = np.zeros((k, width))
+        lower_rate = np.zeros((k, width))
+        for position in range(width):
+            chosen = ((masks >> position) & 1).astype(bool)
+            overall[:, position] = chosen.mean(axis=0)
+            upper_rate[:, position] = chosen[upper].mean(axis=0)
+            lower_rate[:, position] = chosen[lower].mean(axis=0)
+        result['options'] = (overall, upper_rate, lower_rate)
+
+    return result
+
+
+def analyze(exam):
+    """
+    计算考试的试题分析结果
+
+    Returns:
+        {'sample_size', 'alpha', 'kr20', 'items': [...]}
+    """
+    paper_questions, scores, masks = load_matrix(exam)
+    options = [list(pq.question.options.all()) for pq in paper_questions]
+    metrics = compute(
+        scores,
+        [float(pq.score) for pq in paper_questions],
+        masks,
+        [len(item_options) if pq.question.type in ['single', 'multi'] else 0
+         for pq, item_options in zip(paper_questions, options)],
+    )
+
+    items = []
+    for j, pq in enumerate(paper_questions):
+        item = {
+            'paper_question_id': pq.id,
+            'question_id': pq.question_id,
+            'question_number': pq.question_number,
+            'difficulty': _clean(metrics['difficulty'][j]),
+            'discrimination': _clean(metrics['discrimination'][j]),
+            'point_biserial': _clean(metrics['point_biserial'][j]),
+        }
+        if metrics['options'] is not None and pq.question.type in ['single', 'multi']:
+            overall, upper_rate, lower_rate = metrics['options']
+            item['options'] = [
+                {
+                    'label': option.label,
+                    'is_correct': option.is_correct,
+                    'proportion': _clean(overall[j, position]),
+                    'upper': _clean(upper_rate[j, position]),
+                    'lower': _clean(lower_rate[j, position]),
+                    # 有效的干扰项应更多地被低分组选择
+                    'discrimination': _clean(upper_rate[j, position] - lower_rate[j, position]),
+                }
+                for position, option in enumerate(options[j])
+            ]
+        items.append(item)
+
+    return {
+        'sample_size': int(scores.shape[0]),
+        'alpha': _clean(metrics['alpha']),
+        'kr20': _clean(metrics['kr20']),
+        'items': items,
+    }
+
+
+def run(exam):
+    """计算试题分析并写入 ExamStatistics.question_stats"""
+    analysis = analyze(exam)
+    stats = exam_stats.get_or_rebuild(exam)
+    stats.question_stats = {**stats.question_stats, **analysis}
+    stats.save(update_fields=['question_stats', 'updated_at'])
+    return analysis
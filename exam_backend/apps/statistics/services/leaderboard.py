@@ -0,0 +1,207 @@
+"""
+考试排行榜
+每场考试一个 Redis 有序集合，成员为编码后的提交记录 ID；成绩相同时先交卷者排名靠前，
+交卷时间精确到秒，仍相同时 ID 小者在前。数据库回退查询按同样的规则排序，两种方式排名一致。
+提交记录完成评分（含重新评分）时增量更新；Redis 不可用时回退为数据库查询
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import TruncSecond
+
+from apps.submissions.models import Submission
+from utils.redis import get_redis
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+DEFAULT_NEIGHBORS = 5
+
+# 分值编码：成绩（0.1 分精度）占高位，交卷时间的补数占低 32 位，
+# 降序排列即为 (-score, submit_time)；在 double 的 53 位有效精度内
+_TIME_BITS = 32
+_TIME_MAX = (1 << _TIME_BITS) - 1
+
+# 成员编码：MEMBER_MAX - ID 补零到定长，同分值的成员按字典序逆序返回时即 ID 升序
+_MEMBER_DIGITS = 12
+_MEMBER_MAX = 10 ** _MEMBER_DIGITS - 1
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def key(exam_id):
+    return f'leaderboard:v2:exam:{exam_id}'
+
+
+def member(submission_id):
+    return f'{_MEMBER_MAX - submission_id:0{_MEMBER_DIGITS}d}'
+
+
+def submission_id_of(value):
+    return _MEMBER_MAX - int(value)
+
+
+def encode(score, submit_time):
+    """将 (成绩, 交卷时间) 编码为有序集合分值"""
+    timestamp = int(submit_time.timestamp()) if submit_time else _TIME_MAX
+    return int(round(float(score) * 10)) * (1 << _TIME_BITS) + (_TIME_MAX - min(timestamp, _TIME_MAX))
+
+
+def _finished(exam_id):
+    return Submission.objects.filter(exam_id=exam_id, status=Submission.Status.FINISHED, score__isnull=False)
+
+
+def rebuild(exam_id, client=None):
+    """
+    按数据库重建排行榜：写入临时键后原子替换
+
+    Returns:
+        成员数
+    """
+    client = client or get_redis()
+    if client is None:
+        return 0
+
+    temp_key = f'{key(exam_id)}:rebuild'
+    client.delete(temp_key)
+    count = 0
+    batch = {}
+    for submission_id, score, submit_time in _finished(exam_id).values_list(
+        'id', 'score', 'submit_time'
+    ).iterator(chunk_size=REBUILD_BATCH_SIZE):
+        batch[member(submission_id)] = encode(score, submit_time)
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            client.zadd(temp_key, batch)
+            count += len(batch)
+            batch = {}
+    if batch:
+        client.zadd(temp_key, batch)
+        count += len(batch)
+
+    if count:
+        client.rename(temp_key, key(exam_id))
+    else:
+        client.delete(key(exam_id))
+    return count
+
+
+def _ensure(exam_id):
+    """返回可用的 Redis 客户端，排行榜不存在时先重建；Redis 不可用返回 None"""
+    client = get_redis()
+    if client is not None and not client.exists(key(exam_id)):
+        rebuild(exam_id, client)
+    return client
+
+
+def record(submission):
+    """提交记录完成评分或重新评分后更新排行榜（事务提交后执行）"""
+    exam_id, submission_id = submission.exam_id, submission.id
+    score, submit_time = submission.score, submission.submit_time
+
+    def apply():
+        client = get_redis()
+        # 排行榜尚未建立时跳过，首次读取时按数据库重建
+        if client is None or not client.exists(key(exam_id)):
+            return
+        if score is None:
+            client.zrem(key(exam_id), member(submission_id))
+        else:
+            client.zadd(key(exam_id), {member(submission_id): encode(score, submit_time)})
+
+    transaction.on_commit(apply)
+
+
+def _entries(submission_ids, start_rank):
+    """按排名顺序组装提交记录信息（单次查询）"""
+    submissions = Submission.objects.select_related('user').in_bulk(submission_ids)
+    entries = []
+    for offset, submission_id in enumerate(submission_ids):
+        submission = submissions.get(submission_id)
+        if submission is None:
+            continue
+        entries.append({
+            'rank': start_rank + offset,
+            'submission_id': submission.id,
+            'user_id': submission.user_id,
+            'user_name': submission.user.username,
+            'score': submission.score,
+            'duration': submission.duration_seconds,
+            'submit_time': submission.submit_time,
+        })
+    return entries
+
+
+def _ordered(exam_id):
+    """与有序集合一致的排序：成绩降序、交卷时间（秒）升序且未交卷在后、ID 升序"""
+    return _finished(exam_id).annotate(submit_second=TruncSecond('submit_time')).order_by(
+        '-score', F('submit_second').asc(nulls_last=True), 'id'
+    )
+
+
+def page(exam_id, page_number=1, page_size=DEFAULT_PAGE_SIZE):
+    """
+    分页读取排行榜
+
+    Returns:
+        (entries, total)
+    """
+    start = (page_number - 1) * page_size
+    return _range(exam_id, start, start + page_size - 1)
+
+
+def _range(exam_id, start, end):
+    """读取排名区间 [start, end]（0 起始）的条目"""
+    client = _ensure(exam_id)
+    start = max(start, 0)
+    if client is not None:
+        total = client.zcard(key(exam_id))
+        submission_ids = [submission_id_of(value) for value in client.zrevrange(key(exam_id), start, end)]
+    else:
+        total = _finished(exam_id).count()
+        submission_ids = list(_ordered(exam_id).values_list('id', flat=True)[start:end + 1])
+    return _entries(submission_ids, start + 1), total
+
+
+def my_rank(exam_id, user, neighbors=DEFAULT_NEIGHBORS):
+    """
+    当前用户在考试中的排名（取其最好的一次提交）、百分位与前后相邻的考生
+
+    Returns:
+        dict 或 None（没有已完成的提交记录）
+    """
+    best = _ordered(exam_id).filter(user=user).first()
+    if best is None:
+        return None
+
+    client = _ensure(exam_id)
+    if client is not None:
+        rank = client.zrevrank(key(exam_id), member(best.id))
+        total = client.zcard(key(exam_id))
+        if rank is None:
+            return None
+    else:
+        total = _finished(exam_id).count()
+        ahead = Q(score__gt=best.score)
+        if best.submit_time is not None:
+            # 同一秒内交卷视为同时，按 ID 排序
+            second = best.submit_time.replace(microsecond=0)
+            ahead |= Q(score=best.score, submit_time__lt=second)
+            ahead |= Q(
+                score=best.score, submit_time__gte=second, submit_time__lt=second + timedelta(seconds=1),
+                id__lt=best.id,
+            )
+        else:
+            ahead |= Q(score=best.score, submit_time__isnull=False)
+            ahead |= Q(score=best.score, submit_time__isnull=True, id__lt=best.id)
+        rank = _finished(exam_id).filter(ahead).count()
+
+    around, _ = _range(exam_id, rank - neighbors, rank + neighbors)
+    return {
+        'rank': rank + 1,
+        'total': total,
+        # 超过的考生比例
+        'percentile': round((total - rank - 1) / (total - 1) * 100, 2) if total > 1 else 100.0,
+        'submission_id': best.id,
+        'score': best.score,
+        'neighbors': around,
+    }
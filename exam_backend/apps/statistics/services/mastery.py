@@ -0,0 +1,183 @@
+"""
+用户知识点掌握情况
+答案批改时按 (用户, 标签) 增量累计作答数与正确数，薄弱知识点查询只需一次索引查询；
+rebuild 按用户分块从已批改答案整体重建
+"""
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.questions.models import Question
+from apps.statistics.models import UserStatistics, UserTagMastery
+from apps.submissions.models import Answer
+
+# 至少作答 WEAK_MIN_TOTAL 道、正确率低于 WEAK_RATE% 的标签视为薄弱知识点
+WEAK_MIN_TOTAL = 5
+WEAK_RATE = 60
+WEAK_LIMIT = 10
+
+REBUILD_CHUNK_SIZE = 500
+
+_TABLE = UserTagMastery._meta.db_table
+
+# PostgreSQL 与 SQLite 均支持的累加式 upsert
+_UPSERT_SQL = f'''
+INSERT INTO {_TABLE} (user_id, tag_id, correct_count, total_count, created_at, updated_at)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON CONFLICT (user_id, tag_id) DO UPDATE SET
+    correct_count = {_TABLE}.correct_count + excluded.correct_count,
+    total_count = {_TABLE}.total_count + excluded.total_count,
+    updated_at = excluded.updated_at
+'''
+
+
+def _answer_deltas(answers, previous):
+    """
+    计算每个 (用户, 题目) 的 (正确数, 作答数) 增量
+    首次批改计入作答数；重新批改只调整正确数
+    """
+    deltas = {}
+    for answer in answers:
+        status, was_correct, _ = previous.get(answer.id, (None, None, None))
+        if status == Answer.Status.GRADED:
+            correct, total = int(bool(answer.is_correct)) - int(bool(was_correct)), 0
+        else:
+            correct, total = int(bool(answer.is_correct)), 1
+        if not (correct or total):
+            continue
+        key = (answer.submission.user_id, answer.paper_question.question_id)
+        old_correct, old_total = deltas.get(key, (0, 0))
+        deltas[key] = (old_correct + correct, old_total + total)
+    return deltas
+
+
+def record_graded(answers, previous):
+    """答案批改后累计到知识点掌握情况（事务提交后执行）"""
+    deltas = _answer_deltas(answers, previous)
+    if deltas:
+        transaction.on_commit(lambda: apply(deltas))
+
+
+def apply(deltas):
+    """
+    将 {(user_id, question_id): (correct, total)} 按题目标签展开后写入
+    """
+    question_tags = {}
+    for question_id, tag_id in Question.tags.through.objects.filter(
+        question_id__in={question_id for _, question_id in deltas}
+    ).values_list('question_id', 'tag_id'):
+        question_tags.setdefault(question_id, []).append(tag_id)
+
+    correct_by_tag = Counter()
+    total_by_tag = Counter()
+    for (user_id, question_id), (correct, total) in deltas.items():
+        for tag_id in question_tags.get(question_id, []):
+            correct_by_tag[user_id, tag_id] += correct
+            total_by_tag[user_id, tag_id] += total
+
+    keys = set(correct_by_tag) | set(total_by_tag)
+    if not keys:
+        return
+
+    now = timezone.now()
+    increments = [
+        (user_id, tag_id, correct_by_tag[user_id, tag_id], total_by_tag[user_id, tag_id], now, now)
+        for user_id, tag_id in keys
+        if correct_by_tag[user_id, tag_id] >= 0
+    ]
+    with transaction.atomic():
+        if increments:
+            with connection.cursor() as cursor:
+                cursor.executemany(_UPSERT_SQL, increments)
+
+        # 重新批改由对改错，正确数减少
+        for (user_id, tag_id), correct in correct_by_tag.items():
+            if correct < 0:
+                UserTagMastery.objects.filter(user_id=user_id, tag_id=tag_id).update(
+                    correct_count=Greatest(F('correct_count') + correct, 0),
+                    total_count=F('total_count') + total_by_tag[user_id, tag_id],
+                    updated_at=now,
+                )
+
+    refresh_weak_tags({user_id for user_id, _ in keys})
+
+
+def weak_points(user_id, limit=WEAK_LIMIT):
+    """
+    薄弱知识点（单次索引查询），按正确率升序
+
+    Returns:
+        [{'tag', 'correct_count', 'total_count', 'correct_rate'}, ...]
+    """
+    rows = UserTagMastery.objects.filter(
+        user_id=user_id,
+        total_count__gte=WEAK_MIN_TOTAL,
+    ).annotate(
+        rate=ExpressionWrapper(F('correct_count') * 100.0 / F('total_count'), output_field=FloatField())
+    ).filter(rate__lt=WEAK_RATE).order_by('rate').values(
+        'tag__name', 'correct_count', 'total_count', 'rate'
+    )[:limit]
+
+    return [
+        {
+            'tag': row['tag__name'],
+            'correct_count': row['correct_count'],
+            'total_count': row['total_count'],
+            'correct_rate': round(float(row['rate']), 2),
+        }
+        for row in rows
+    ]
+
+
+def refresh_weak_tags(user_ids):
+    """将薄弱知识点写入已有的 UserStatistics.weak_tags"""
+    for user_id in user_ids:
+        UserStatistics.objects.filter(user_id=user_id).update(weak_tags=weak_points(user_id))
+
+
+def rebuild(user_ids=None, chunk_size=REBUILD_CHUNK_SIZE):
+    """
+    按用户分块，从已批改答案重建知识点掌握情况
+
+    Args:
+        user_ids: 需要重建的用户 ID 列表，None 表示全部
+
+    Returns:
+        写入的记录数
+    """
+    if user_ids is None:
+        user_ids = get_user_model().objects.order_by('id').values_list('id', flat=True)
+    user_ids = list(user_ids)
+
+    written = 0
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        rows = Answer.objects.filter(
+            status=Answer.Status.GRADED,
+            submission__user_id__in=chunk,
+            paper_question__question__tags__isnull=False,
+        ).order_by().values(
+            'submission__user_id', 'paper_question__question__tags'
+        ).annotate(
+            total=Count('id'),
+            correct=Count('id', filter=Q(is_correct=True)),
+        )
+        records = [
+            UserTagMastery(
+                user_id=row['submission__user_id'],
+                tag_id=row['paper_question__question__tags'],
+                correct_count=row['correct'],
+                total_count=row['total'],
+            )
+            for row in rows
+        ]
+        with transaction.atomic():
+            UserTagMastery.objects.filter(user_id__in=chunk).delete()
+            UserTagMastery.objects.bulk_create(records, batch_size=1000)
+        refresh_weak_tags(chunk)
+        written += len(records)
+    return written
@@ -0,0 +1,39 @@
+"""
+选项选择分布
+基于 Answer.option_mask 在数据库中按位聚合，无需解析作答字符串
+"""
+from django.db.models import Count, F
+from django.db.models.lookups import GreaterThan
+
+
+def option_count_aggregates(option_count, prefix='option_'):
+    """
+    生成每个选项被选择次数的条件聚合表达式
+    可用于 aggregate()，也可在 values().annotate() 中按题目分组
+    """
+    return {
+        f'{prefix}{position}': Count(
+            'id', filter=GreaterThan(F('option_mask').bitand(1 << position), 0)
+        )
+        for position in range(option_count)
+    }
+
+
+def option_selection_counts(answers, option_count):
+    """
+    统计每个选项被选择的次数（单次聚合查询）
+
+    Args:
+        answers: Answer 查询集（通常已按试卷题目过滤）
+        option_count: 选项数量
+
+    Returns:
+        [count_of_option_0, count_of_option_1, ...]，按选项顺序
+    """
+    if option_count <= 0:
+        return []
+
+    result = answers.order_by().filter(option_mask__isnull=False).aggregate(
+        **option_count_aggregates(option_count)
+    )
+    return [result[f'option_{position}'] for position in range(option_count)]
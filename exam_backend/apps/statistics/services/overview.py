@@ -0,0 +1,65 @@
+"""
+系统总览
+每张表一次条件聚合查询；提交记录总数取近似值（PostgreSQL 的 pg_class.reltuples），
+结果短时缓存，管理后台的刷新不再对数据库产生持续压力
+"""
+from datetime import datetime, time
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.exams.models import Exam
+from apps.questions.models import Question
+from apps.submissions.models import Submission
+from utils.db import approximate_count, choice_counts
+
+OVERVIEW_CACHE_KEY = 'statistics:overview'
+OVERVIEW_CACHE_TIMEOUT = 60
+
+
+def compute():
+    """
+    计算系统总览（用户、题目、考试、提交记录各一次查询）
+    """
+    users = User.objects.order_by().aggregate(
+        total=Count('pk'),
+        students=Count('pk', filter=Q(role='student')),
+        teachers=Count('pk', filter=Q(role='teacher')),
+    )
+
+    questions = Question.objects.filter(is_deleted=False).order_by().aggregate(
+        total=Count('pk'),
+        **choice_counts('type', Question.Type.choices),
+    )
+
+    exams = Exam.objects.order_by().aggregate(
+        total=Count('pk', filter=Q(is_deleted=False)),
+        in_progress=Count('pk', filter=Q(status=Exam.Status.IN_PROGRESS)),
+    )
+
+    # 按当天起始时间做范围查询，可使用 created_at 上的索引
+    today = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+
+    return {
+        'users': users,
+        'questions': {
+            'total': questions['total'],
+            'by_type': {label: questions[f'type_{value}'] for value, label in Question.Type.choices},
+        },
+        'exams': exams,
+        'submissions': {
+            'total': approximate_count(Submission),
+            'today': Submission.objects.filter(created_at__gte=today).count(),
+        },
+    }
+
+
+def get_overview():
+    """读取系统总览，缓存 OVERVIEW_CACHE_TIMEOUT 秒"""
+    overview = cache.get(OVERVIEW_CACHE_KEY)
+    if overview is None:
+        overview = compute()
+        cache.set(OVERVIEW_CACHE_KEY, overview, OVERVIEW_CACHE_TIMEOUT)
+    return overview
@@ -0,0 +1,78 @@
+"""
+考试题目分析
+一次按试卷题目分组的条件聚合查询得到每道题的作答数、正确数、平均分、
+平均作答时长与各选项被选择次数；结果按考试统计版本号缓存
+"""
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q
+
+from apps.statistics.services import exam_stats
+from apps.statistics.services.options import option_count_aggregates
+from apps.submissions.models import Answer
+
+# 版本号变化即失效，超时只用于回收旧版本的缓存
+ANALYSIS_CACHE_TIMEOUT = 24 * 3600
+
+
+def cache_key(exam_id, version):
+    return f'statistics:question_analysis:{exam_id}:{version}'
+
+
+def analyze(exam):
+    """
+    计算题目分析（试卷题目、选项各一次查询，答案一次分组聚合）
+
+    Returns:
+        [{question_id, question_number, ..., option_counts, average_duration}, ...]
+    """
+    paper_questions = list(
+        exam.paper.paper_questions.select_related('question').prefetch_related('question__options')
+    )
+    option_count = max((len(pq.question.options.all()) for pq in paper_questions), default=0)
+
+    rows = Answer.objects.filter(
+        submission__exam=exam,
+        status=Answer.Status.GRADED,
+    ).order_by().values('paper_question_id').annotate(
+        total=Count('id'),
+        correct=Count('id', filter=Q(is_correct=True)),
+        avg_score=Avg('score'),
+        avg_duration=Avg('answer_duration'),
+        **option_count_aggregates(option_count),
+    )
+    rows = {row['paper_question_id']: row for row in rows}
+
+    analysis = []
+    for pq in paper_questions:
+        row = rows.get(pq.id, {})
+        total = row.get('total', 0)
+        correct = row.get('correct', 0)
+        options = pq.question.options.all()
+        analysis.append({
+            'question_id': pq.question.id,
+            'question_number': pq.question_number,
+            'question_title': pq.question.title[:50],
+            'question_type': pq.question.get_type_display(),
+            'max_score': float(pq.score),
+            'total_count': total,
+            'correct_count': correct,
+            'correct_rate': round(correct / total * 100, 2) if total > 0 else 0,
+            'average_score': round(float(row.get('avg_score') or 0), 2),
+            'average_duration': round(float(row.get('avg_duration') or 0), 1),
+            'option_counts': [
+                {'label': option.label, 'count': row.get(f'option_{position}', 0)}
+                for position, option in enumerate(options)
+            ],
+        })
+    return analysis
+
+
+def get_analysis(exam):
+    """读取题目分析，考试统计版本号变化（交卷、批改、重新评分）后重新计算"""
+    version = exam_stats.get_or_rebuild(exam).version
+    key = cache_key(exam.id, version)
+    analysis = cache.get(key)
+    if analysis is None:
+        analysis = analyze(exam)
+        cache.set(key, analysis, ANALYSIS_CACHE_TIMEOUT)
+    return analysis
@@ -0,0 +1,111 @@
+"""
+提交记录的百分位与标准分
+考试统计重建时用一次 percent_rank 窗口函数查询计算全部提交记录；
+单份提交记录完成评分（含迟到的阅卷、重新评分）时，按考试统计中的分数频次表与累计值增量计算，
+同时投递一次延迟的整场重算，使其他提交记录的百分位在 REBUILD_DELAY 秒内随之更新（同一考试合并为一次）
+"""
+import math
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import FloatField, Window
+from django.db.models.functions import Cast, PercentRank
+
+from apps.statistics.models import ExamStatistics
+from apps.submissions.models import Submission
+
+UPDATE_BATCH_SIZE = 1000
+# 整场重算的延迟（秒），期间同一考试的其他评分合并到这一次
+REBUILD_DELAY = 60
+
+_PERCENT = Decimal('0.01')
+_Z = Decimal('0.001')
+
+
+def _moments(stats):
+    """由累计值求均值与总体标准差（未经取整）"""
+    if not stats.graded_count:
+        return None, None
+    mean = stats.score_sum / stats.graded_count
+    variance = max(float(stats.score_square_sum / stats.graded_count - mean * mean), 0.0)
+    return mean, Decimal(math.sqrt(variance))
+
+
+def _z_score(score, mean, std):
+    if mean is None:
+        return None
+    if not std:
+        return Decimal(0).quantize(_Z)
+    return ((Decimal(score) - mean) / std).quantize(_Z)
+
+
+def rebuild(exam, stats):
+    """
+    重新计算考试中全部已完成提交记录的百分位与标准分（窗口函数一次查询）
+
+    Returns:
+        更新的提交记录数
+    """
+    mean, std = _moments(stats)
+    submissions = list(
+        Submission.objects.filter(
+            exam=exam, status=Submission.Status.FINISHED, score__isnull=False
+        ).annotate(
+            # 按浮点排序：Django 在 SQLite 上会把 Decimal 排序表达式错误地包进 CAST
+            rank=Window(PercentRank(), order_by=Cast('score', FloatField()).asc())
+        ).only('id', 'score')
+    )
+    for submission in submissions:
+        submission.percentile_rank = (Decimal(submission.rank) * 100).quantize(_PERCENT)
+        submission.z_score = _z_score(submission.score, mean, std)
+
+    Submission.objects.bulk_update(submissions, ['percentile_rank', 'z_score'], batch_size=UPDATE_BATCH_SIZE)
+    return len(submissions)
+
+
+def update(submission_id, exam_id, score):
+    """按考试统计中的分数频次表计算单份提交记录的百分位与标准分"""
+    if score is None:
+        Submission.objects.filter(id=submission_id).update(percentile_rank=None, z_score=None)
+        return
+
+    stats = ExamStatistics.objects.filter(exam_id=exam_id).first()
+    if stats is None or not stats.graded_count:
+        return
+
+    score = Decimal(score)
+    below = sum(value for key, value in stats.score_frequencies.items() if Decimal(key) < score)
+    # 与 percent_rank 一致：(名次 - 1) / (人数 - 1)
+    rank = Decimal(below * 100) / (stats.graded_count - 1) if stats.graded_count > 1 else Decimal(0)
+    mean, std = _moments(stats)
+    Submission.objects.filter(id=submission_id).update(
+        percentile_rank=rank.quantize(_PERCENT),
+        z_score=_z_score(score, mean, std),
+    )
+
+
+def rebuild_key(exam_id):
+    return f'statistics:standing:rebuild:{exam_id}'
+
+
+def schedule_rebuild(exam_id):
+    """投递延迟的整场重算；已有待执行的重算时不重复投递"""
+    from apps.statistics.tasks import rebuild_exam_standing
+
+    if cache.add(rebuild_key(exam_id), 1, REBUILD_DELAY * 2):
+        rebuild_exam_standing.apply_async((exam_id,), countdown=REBUILD_DELAY)
+
+
+def record(submission):
+    """
+    提交记录完成评分后更新其百分位与标准分（事务提交后、考试统计更新之后执行），
+    其他提交记录的百分位由延迟的整场重算更新
+    """
+    submission_id, exam_id, score = submission.id, submission.exam_id, submission.score
+
+    def apply():
+        update(submission_id, exam_id, score)
+        schedule_rebuild(exam_id)
+
+    transaction.on_commit(apply)
@@ -0,0 +1,209 @@
+"""
+作答用时分析
+一次查询载入考试全部已批改答案的 (提交记录, 试卷题目, 作答时长, 是否正确)，按题目分组排序后向量化计算：
+用时中位数、P90、四分位距离群值、用时与正误的点二列相关，并标记明显快于同题中位数的作答
+"""
+import numpy as np
+
+from apps.statistics.services import exam_stats
+from apps.submissions.models import Answer, Submission
+
+# 作答时长低于同题中位数的该比例视为过快
+FAST_RATIO = 0.25
+# 离群值：超过 Q3 + 1.5 × IQR
+OUTLIER_IQR = 1.5
+# 过快作答占比达到该比例（且不少于 FLAG_MIN_FAST 题）的提交记录被标记
+FLAG_FAST_RATIO = 0.5
+FLAG_MIN_FAST = 3
+MAX_FLAGGED = 100
+
+
+def _clean(value, digits=2):
+    value = float(value)
+    if np.isnan(value) or np.isinf(value):
+        return None
+    return round(value, digits)
+
+
+def load(exam):
+    """
+    载入考试的作答用时（试卷题目、答案各一次查询）
+    作答时长为 0 的答案视为未记录用时，不参与分析
+
+    Returns:
+        (paper_questions, submission_ids, columns, durations, correct)，后四项为等长的一维数组
+    """
+    paper_questions = list(exam.paper.paper_questions.order_by('question_number', 'id'))
+    column = {pq.id: j for j, pq in enumerate(paper_questions)}
+
+    rows = list(
+        Answer.objects.filter(
+            submission__exam=exam,
+            submission__status=Submission.Status.FINISHED,
+            status=Answer.Status.GRADED,
+            paper_question_id__in=list(column),
+            answer_duration__gt=0,
+        ).order_by().values_list('submission_id', 'paper_question_id', 'answer_duration', 'is_correct')
+    )
+    count = len(rows)
+    if not count:
+        empty = np.zeros(0, dtype=np.int64)
+        return paper_questions, empty, empty, empty.astype(np.float64), empty.astype(bool)
+
+    submission_ids, paper_question_ids, durations, correct = zip(*rows)
+    return (
+        paper_questions,
+        np.fromiter(submission_ids, dtype=np.int64, count=count),
+        np.fromiter((column[pq_id] for pq_id in paper_question_ids), dtype=np.int64, count=count),
+        np.fromiter(durations, dtype=np.float64, count=count),
+        np.fromiter((bool(value) for value in correct), dtype=bool, count=count),
+    )
+
+
+def _quantile(sorted_values, starts, counts, q):
+    """各组（已按组、值排序且连续存放）的分位数，线性插值，与 np.percentile 默认方式一致"""
+    position = (np.maximum(counts, 1) - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    if not len(sorted_values):
+        return np.full(len(counts), np.nan)
+    low_values = sorted_values[np.minimum(starts + lower, len(sorted_values) - 1)]
+    high_values = sorted_values[np.minimum(starts + upper, len(sorted_values) - 1)]
+    result = low_values + (high_values - low_values) * (position - lower)
+    return np.where(counts > 0, result, np.nan)
+
+
+def compute(columns, durations, correct, k):
+    """
+    按题目分组向量化计算用时指标
+
+    Args:
+        columns: (m,) 每条答案所属题目的列号
+        durations: (m,) 作答时长（秒）
+        correct: (m,) 是否正确
+        k: 题目数
+
+    Returns:
+        {'count', 'median', 'p90', 'q1', 'q3', 'outlier_count', 'fast_count', 'fast_correct_count',
+         'correct_median', 'incorrect_median', 'correlation': (k,) 数组, 'fast': (m,) 布尔数组（原顺序）}
+    """
+    order = np.lexsort((durations, columns))
+    sorted_columns = columns[order]
+    sorted_values = durations[order]
+    counts = np.bincount(columns, minlength=k)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+
+    median = _quantile(sorted_values, starts, counts, 0.5)
+    q1 = _quantile(sorted_values, starts, counts, 0.25)
+    q3 = _quantile(sorted_values, starts, counts, 0.75)
+    p90 = _quantile(sorted_values, starts, counts, 0.9)
+
+    outlier = sorted_values > (q3 + OUTLIER_IQR * (q3 - q1))[sorted_columns]
+    fast = np.zeros(len(durations), dtype=bool)
+    fast[order] = sorted_values < (median * FAST_RATIO)[sorted_columns]
+    sorted_correct = correct[order]
+
+    # 正确与错误作答各自的中位数：以 (题目, 是否正确) 为组再取一次
+    sub_groups = sorted_columns * 2 + sorted_correct
+    sub_order = np.lexsort((sorted_values, sub_groups))
+    sub_counts = np.bincount(sub_groups, minlength=2 * k)
+    sub_starts = np.concatenate(([0], np.cumsum(sub_counts)[:-1])).astype(np.int64)
+    sub_median = _quantile(sorted_values[sub_order], sub_starts, sub_counts, 0.5)
+
+    # 点二列相关：用时与是否正确的 Pearson 相关，按组累加求和后一次算出
+    y = correct.astype(np.float64)
+    n = counts.astype(np.float64)
+    sum_x = np.bincount(columns, weights=durations, minlength=k)
+    sum_y = np.bincount(columns, weights=y, minlength=k)
+    sum_xy = np.bincount(columns, weights=durations * y, minlength=k)
+    sum_xx = np.bincount(columns, weights=durations * durations, minlength=k)
+    sum_yy = np.bincount(columns, weights=y * y, minlength=k)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = (n * sum_xy - sum_x * sum_y) / np.sqrt(
+            (n * sum_xx - sum_x ** 2) * (n * sum_yy - sum_y ** 2)
+        )
+
+    return {
+        'count': counts,
+        'median': median,
+        'p90': p90,
+        'q1': q1,
+        'q3': q3,
+        'outlier_count': np.bincount(sorted_columns, weights=outlier, minlength=k).astype(np.int64),
+        'fast_count': np.bincount(columns, weights=fast, minlength=k).astype(np.int64),
+        'fast_correct_count': np.bincount(columns, weights=fast & correct, minlength=k).astype(np.int64),
+        'correct_median': sub_median[1::2],
+        'incorrect_median': sub_median[0::2],
+        'correlation': correlation,
+        'fast': fast,
+    }
+
+
+def flag_submissions(submission_ids, fast):
+    """
+    过快作答占比高的提交记录
+
+    Returns:
+        [{'submission_id', 'fast_count', 'answer_count'}]，按过快题数降序
+    """
+    if not len(submission_ids):
+        return []
+    unique_ids, index = np.unique(submission_ids, return_inverse=True)
+    answer_counts = np.bincount(index)
+    fast_counts = np.bincount(index, weights=fast).astype(np.int64)
+    flagged = np.flatnonzero((fast_counts >= FLAG_MIN_FAST) & (fast_counts >= answer_counts * FLAG_FAST_RATIO))
+    flagged = flagged[np.argsort(-fast_counts[flagged], kind='stable')][:MAX_FLAGGED]
+    return [
+        {
+            'submission_id': int(unique_ids[i]),
+            'fast_count': int(fast_counts[i]),
+            'answer_count': int(answer_counts[i]),
+        }
+        for i in flagged
+    ]
+
+
+def analyze(exam):
+    """
+    计算考试的作答用时分析
+
+    Returns:
+        {'sample_size', 'items': [...], 'flagged_submissions': [...]}
+    """
+    paper_questions, submission_ids, columns, durations, correct = load(exam)
+    metrics = compute(columns, durations, correct, len(paper_questions))
+
+    items = [
+        {
+            'paper_question_id': pq.id,
+            'question_id': pq.question_id,
+            'question_number': pq.question_number,
+            'answer_count': int(metrics['count'][j]),
+            'median': _clean(metrics['median'][j]),
+            'p90': _clean(metrics['p90'][j]),
+            'q1': _clean(metrics['q1'][j]),
+            'q3': _clean(metrics['q3'][j]),
+            'outlier_count': int(metrics['outlier_count'][j]),
+            'fast_count': int(metrics['fast_count'][j]),
+            'fast_correct_count': int(metrics['fast_correct_count'][j]),
+            'correct_median': _clean(metrics['correct_median'][j]),
+            'incorrect_median': _clean(metrics['incorrect_median'][j]),
+            'correlation': _clean(metrics['correlation'][j], 4),
+        }
+        for j, pq in enumerate(paper_questions)
+    ]
+
+    return {
+        'sample_size': int(len(np.unique(submission_ids))),
+        'items': items,
+        'flagged_submissions': flag_submissions(submission_ids, metrics['fast']),
+    }
+
+
+def run(exam):
+    """计算作答用时分析并写入 ExamStatistics.question_stats['timing']"""
+    analysis = analyze(exam)
+    stats = exam_stats.get_or_rebuild(exam)
+    stats.question_stats = {**stats.question_stats, 'timing': analysis}
+    stats.save(update_fields=['question_stats', 'updated_at'])
+    return analysis
@@ -0,0 +1,153 @@
+"""
+每日统计快照与趋势查询
+rollup 按天对提交记录与答案做分组聚合，写入全站、考试、分类、标签四个维度的汇总行；
+趋势接口只读取汇总行，不再扫描 submissions / answers
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from apps.statistics.models import DailyStatistics
+from apps.submissions.models import Answer, Submission
+
+Dimension = DailyStatistics.Dimension
+
+# 每晚重新汇总最近几天，覆盖跨天的阅卷与重新评分
+ROLLUP_LOOKBACK_DAYS = 3
+
+DEFAULT_TREND_DAYS = 30
+MAX_TREND_DAYS = 366
+
+METRIC_FIELDS = [
+    'submission_count', 'active_users', 'finished_count', 'score_sum', 'total_score_sum',
+    'answer_count', 'correct_count', 'answer_score_sum', 'answer_max_score_sum',
+]
+
+# 各维度答案聚合的分组字段
+ANSWER_GROUPS = {
+    Dimension.EXAM: 'submission__exam_id',
+    Dimension.CATEGORY: 'paper_question__question__category_id',
+    Dimension.TAG: 'paper_question__question__tags',
+}
+
+
+def day_range(day):
+    """当天 [起始, 次日起始)，按本地时区"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _answer_aggregates():
+    return {
+        'answer_count': Count('id'),
+        'correct_count': Count('id', filter=Q(is_correct=True)),
+        'answer_score_sum': Sum('score'),
+        'answer_max_score_sum': Sum('paper_question__score'),
+    }
+
+
+def compute(day):
+    """
+    计算某天各维度的汇总值
+
+    Returns:
+        {(dimension, dimension_id): {字段: 值}}
+    """
+    start, end = day_range(day)
+    rows = defaultdict(dict)
+
+    started = Submission.objects.filter(created_at__gte=start, created_at__lt=end).order_by()
+    started_aggregates = {'submission_count': Count('id'), 'active_users': Count('user_id', distinct=True)}
+    rows[Dimension.GLOBAL, 0].update(started.aggregate(**started_aggregates))
+    for row in started.values('exam_id').annotate(**started_aggregates):
+        rows[Dimension.EXAM, row.pop('exam_id')].update(row)
+
+    finished = Submission.objects.filter(
+        status=Submission.Status.FINISHED, score__isnull=False, submit_time__gte=start, submit_time__lt=end
+    ).order_by()
+    finished_aggregates = {
+        'finished_count': Count('id'),
+        'score_sum': Sum('score'),
+        'total_score_sum': Sum('exam__paper__total_score'),
+    }
+    rows[Dimension.GLOBAL, 0].update(finished.aggregate(**finished_aggregates))
+    for row in finished.values('exam_id').annotate(**finished_aggregates):
+        rows[Dimension.EXAM, row.pop('exam_id')].update(row)
+
+    answers = Answer.objects.filter(
+        status=Answer.Status.GRADED, submission__submit_time__gte=start, submission__submit_time__lt=end
+    ).order_by()
+    rows[Dimension.GLOBAL, 0].update(answers.aggregate(**_answer_aggregates()))
+    for dimension, field in ANSWER_GROUPS.items():
+        aggregates = _answer_aggregates()
+        if dimension != Dimension.EXAM:
+            aggregates['active_users'] = Count('submission__user_id', distinct=True)
+        for row in answers.filter(**{f'{field}__isnull': False}).values(field).annotate(**aggregates):
+            rows[dimension, row.pop(field)].update(row)
+
+    return {key: {field: value or 0 for field, value in values.items()} for key, values in rows.items()}
+
+
+def rollup(day):
+    """
+    汇总某天的统计并替换已有的汇总行
+
+    Returns:
+        写入的行数
+    """
+    records = [
+        DailyStatistics(date=day, dimension=dimension, dimension_id=dimension_id, **values)
+        for (dimension, dimension_id), values in compute(day).items()
+        if any(values.values())
+    ]
+    with transaction.atomic():
+        DailyStatistics.objects.filter(date=day).delete()
+        DailyStatistics.objects.bulk_create(records, batch_size=1000)
+    return len(records)
+
+
+def _ratio(numerator, denominator, scale=1):
+    if not denominator:
+        return None
+    return round(float(Decimal(numerator) * scale / Decimal(denominator)), 2)
+
+
+def _point(row):
+    return {
+        'date': row.date,
+        'submission_count': row.submission_count,
+        'active_users': row.active_users,
+        'finished_count': row.finished_count,
+        'average_score': _ratio(row.score_sum, row.finished_count),
+        'score_rate': _ratio(row.score_sum, row.total_score_sum, 100),
+        'answer_count': row.answer_count,
+        'correct_rate': _ratio(row.correct_count, row.answer_count, 100),
+        'answer_score_rate': _ratio(row.answer_score_sum, row.answer_max_score_sum, 100),
+    }
+
+
+def series(dimension, dimension_id=None, start=None, end=None):
+    """
+    读取趋势数据（单次查询，使用 (dimension, dimension_id, date) 唯一索引）
+
+    Args:
+        dimension_id: 维度对象 ID；None 表示该维度下的全部对象
+        start, end: 日期范围 [start, end]
+
+    Returns:
+        {dimension_id: [{date, ...}, ...]}
+    """
+    queryset = DailyStatistics.objects.filter(dimension=dimension, date__gte=start, date__lte=end)
+    if dimension == Dimension.GLOBAL:
+        dimension_id = 0
+    if dimension_id is not None:
+        queryset = queryset.filter(dimension_id=dimension_id)
+
+    result = defaultdict(list)
+    for row in queryset.order_by('dimension_id', 'date'):
+        result[row.dimension_id].append(_point(row))
+    return dict(result)
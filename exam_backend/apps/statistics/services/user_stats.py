@@ -0,0 +1,154 @@
+"""
+用户学习统计增量维护
+提交记录完成评分、答案批改后，事务提交时投递 Celery 任务，由任务将增量累加到
+UserStatistics；查询接口只读取一行。统计行不存在时先建零值行再累加，
+不在增量任务中重建（同一事务投递的多个增量会被重复计入）；需要校正时调用 rebuild
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from apps.exams.models import Exam
+from apps.statistics.models import UserStatistics
+from apps.statistics.services import mastery
+from apps.submissions.models import Answer, Submission
+
+# rebuild 写回的字段
+REBUILD_FIELDS = [
+    'exam_count', 'passed_count', 'total_score', 'average_score',
+    'question_count', 'correct_count', 'accuracy_rate', 'total_duration',
+]
+
+
+def finished_deltas(score, previous_score, was_finished, pass_score, duration):
+    """
+    提交记录完成评分（含重新评分）对应的增量
+    重新评分只调整总得分与及格次数
+    """
+    def passed(value):
+        return int(value is not None and Decimal(value) >= Decimal(pass_score))
+
+    score = Decimal(score) if score is not None else Decimal(0)
+    if was_finished:
+        previous = Decimal(previous_score) if previous_score is not None else Decimal(0)
+        return {
+            'total_score': score - previous,
+            'passed_count': passed(score) - passed(previous_score),
+        }
+    return {
+        'exam_count': 1,
+        'passed_count': passed(score),
+        'total_score': score,
+        'total_duration': int(duration or 0),
+    }
+
+
+def record_finished(submission, previous_score, was_finished):
+    """提交记录完成评分后投递统计任务（事务提交后执行）"""
+    from apps.statistics.tasks import apply_submission_finished
+
+    user_id, exam_id = submission.user_id, submission.exam_id
+    score = str(submission.score) if submission.score is not None else None
+    previous = str(previous_score) if previous_score is not None else None
+    duration = submission.duration_seconds
+    transaction.on_commit(
+        lambda: apply_submission_finished.delay(user_id, exam_id, score, previous, was_finished, duration)
+    )
+
+
+def record_graded(answers, previous):
+    """
+    答案批改后按用户投递答题数、正确数的增量（事务提交后执行）
+    首次批改计入答题数；重新批改只调整正确数
+    """
+    from apps.statistics.tasks import apply_user_statistics
+
+    deltas = {}
+    for answer in answers:
+        status, was_correct, _ = previous.get(answer.id, (None, None, None))
+        if status == Answer.Status.GRADED:
+            correct, total = int(bool(answer.is_correct)) - int(bool(was_correct)), 0
+        else:
+            correct, total = int(bool(answer.is_correct)), 1
+        user_deltas = deltas.setdefault(answer.submission.user_id, {'question_count': 0, 'correct_count': 0})
+        user_deltas['question_count'] += total
+        user_deltas['correct_count'] += correct
+
+    for user_id, user_deltas in deltas.items():
+        if any(user_deltas.values()):
+            transaction.on_commit(
+                lambda user_id=user_id, user_deltas=user_deltas: apply_user_statistics.delay(user_id, user_deltas)
+            )
+
+
+def apply(user_id, deltas):
+    """将增量累加到用户统计并重新计算平均分与正确率"""
+    with transaction.atomic():
+        UserStatistics.objects.get_or_create(user_id=user_id)
+        stats = UserStatistics.objects.select_for_update().get(user_id=user_id)
+        for field, delta in deltas.items():
+            value = getattr(stats, field) + (Decimal(delta) if field == 'total_score' else int(delta))
+            setattr(stats, field, max(value, 0))
+        _derive(stats)
+        stats.save(update_fields=list(deltas) + ['average_score', 'accuracy_rate', 'updated_at'])
+    return stats
+
+
+def apply_finished(user_id, exam_id, score, previous_score, was_finished, duration):
+    """按提交记录完成评分的结果更新用户统计"""
+    pass_score = Exam.objects.filter(id=exam_id).values_list('paper__pass_score', flat=True).first()
+    if pass_score is None:
+        return None
+    return apply(user_id, finished_deltas(score, previous_score, was_finished, pass_score, duration))
+
+
+def _derive(stats):
+    stats.average_score = (
+        round(Decimal(stats.total_score) / stats.exam_count, 2) if stats.exam_count else None
+    )
+    stats.accuracy_rate = (
+        round(Decimal(stats.correct_count * 100) / stats.question_count, 2) if stats.question_count else None
+    )
+
+
+def rebuild(user_id):
+    """按现有数据重建用户统计（提交记录、答案各一次聚合查询）"""
+    submissions = Submission.objects.filter(
+        user_id=user_id, status=Submission.Status.FINISHED
+    ).order_by().aggregate(
+        exam_count=Count('id'),
+        passed_count=Count('id', filter=Q(score__gte=F('exam__paper__pass_score'))),
+        total_score=Sum('score'),
+        total_duration=Sum(
+            ExpressionWrapper(Coalesce('submit_time', 'end_time') - F('start_time'), output_field=DurationField()),
+            filter=Q(start_time__isnull=False),
+        ),
+    )
+    answers = Answer.objects.filter(
+        submission__user_id=user_id, status=Answer.Status.GRADED
+    ).order_by().aggregate(
+        question_count=Count('id'),
+        correct_count=Count('id', filter=Q(is_correct=True)),
+    )
+
+    duration = submissions['total_duration']
+    values = UserStatistics(
+        user_id=user_id,
+        exam_count=submissions['exam_count'],
+        passed_count=submissions['passed_count'],
+        total_score=submissions['total_score'] or 0,
+        total_duration=int(duration.total_seconds()) if duration else 0,
+        question_count=answers['question_count'],
+        correct_count=answers['correct_count'],
+    )
+    _derive(values)
+    stats, created = UserStatistics.objects.update_or_create(
+        user_id=user_id,
+        defaults={field: getattr(values, field) for field in REBUILD_FIELDS},
+    )
+    if created:
+        mastery.refresh_weak_tags([user_id])
+        stats.refresh_from_db(fields=['weak_tags'])
+    return stats
@@ -4,88 +4,188 @@
 from celery import shared_task
 
 
+# 每个重建任务处理的考试数
+STATISTICS_CHUNK_SIZE = 50
+
+
 @shared_task
 def update_statistics():
     """
     定时更新统计数据
+    只重建被标记为待重建的考试，按块分发给多个任务并行处理
+    """
+    from apps.statistics.models import ExamStatistics
+
+    exam_ids = list(ExamStatistics.objects.filter(is_dirty=True).values_list('exam_id', flat=True))
+    for start in range(0, len(exam_ids), STATISTICS_CHUNK_SIZE):
+        rebuild_exam_statistics.delay(exam_ids[start:start + STATISTICS_CHUNK_SIZE])
+    return len(exam_ids)
+
+
+@shared_task
+def rebuild_exam_statistics(exam_ids):
+    """
+    重建指定考试的统计，校正增量更新可能产生的偏差
+    """
+    from apps.exams.models import Exam
+    from apps.statistics.models import ExamStatistics
+    from apps.statistics.services import exam_stats, item_analysis, standing, timing
+
+    # 先清除标记，重建期间的新变更会重新标记
+    ExamStatistics.objects.filter(exam_id__in=exam_ids).update(is_dirty=False)
+    for exam in Exam.objects.filter(id__in=exam_ids, is_deleted=False).select_related('paper'):
+        stats = exam_stats.rebuild(exam)
+        standing.rebuild(exam, stats)
+        item_analysis.run(exam)
+        timing.run(exam)
+
+
+@shared_task
+def rebuild_exam_standing(exam_id):
+    """
+    重新计算考试全部已完成提交记录的百分位与标准分
+    """
+    from django.core.cache import cache
+
+    from apps.exams.models import Exam
+    from apps.statistics.models import ExamStatistics
+    from apps.statistics.services import standing
+
+    # 先清除标记，重算期间的新评分会再投递一次
+    cache.delete(standing.rebuild_key(exam_id))
+    stats = ExamStatistics.objects.filter(exam_id=exam_id).first()
+    exam = Exam.objects.filter(id=exam_id).first()
+    if stats is None or exam is None:
+        return 0
+    return standing.rebuild(exam, stats)
+
+
+@shared_task
+def analyze_exam_items(exam_id):
+    """
+    试题分析：难度、区分度、点二列相关、信度与干扰项
     """
     from apps.exams.models import Exam
-    from apps.statistics.models import ExamStatistics, UserStatistics
-    from apps.submissions.models import Submission
-    from django.db.models import Avg, Count, Max, Min, Sum
+    from apps.statistics.services import item_analysis
+
+    try:
+        exam = Exam.objects.select_related('paper').get(id=exam_id)
+    except Exam.DoesNotExist:
+        return None
+
+    return item_analysis.run(exam)['sample_size']
 
-    # 更新考试统计
-    for exam in Exam.objects.filter(is_deleted=False):
-        records = Submission.objects.filter(exam=exam)
-        finished_records = records.filter(status=Submission.Status.FINISHED)
 
-        stats, created = ExamStatistics.objects.get_or_create(exam=exam)
+@shared_task
+def apply_submission_finished(user_id, exam_id, score, previous_score, was_finished, duration):
+    """
+    提交记录完成评分（含重新评分）后累加用户统计
+    """
+    from apps.statistics.services import user_stats
 
-        stats.participant_count = records.count()
-        stats.submitted_count = records.filter(status__in=[
-            Submission.Status.SUBMITTED,
-            Submission.Status.GRADING,
-            Submission.Status.FINISHED
-        ]).count()
-        stats.graded_count = finished_records.count()
+    user_stats.apply_finished(user_id, exam_id, score, previous_score, was_finished, duration)
 
-        if finished_records.exists():
-            score_data = finished_records.aggregate(
-                avg=Avg('score'),
-                max=Max('score'),
-                min=Min('score')
-            )
-            stats.average_score = score_data['avg']
-            stats.highest_score = score_data['max']
-            stats.lowest_score = score_data['min']
 
-            pass_count = finished_records.filter(score__gte=exam.paper.pass_score).count()
-            stats.pass_rate = round(pass_count / finished_records.count() * 100, 2)
+@shared_task
+def apply_user_statistics(user_id, deltas):
+    """
+    将答题数、正确数等增量累加到用户统计
+    """
+    from apps.statistics.services import user_stats
 
-        stats.save()
+    user_stats.apply(user_id, deltas)
 
 
 @shared_task
 def update_user_statistics(user_id):
     """
-    更新单个用户的统计数据
+    按现有数据重建单个用户的统计，校正增量更新可能产生的偏差
     """
     from apps.accounts.models import User
-    from apps.statistics.models import UserStatistics
-    from apps.submissions.models import Answer, Submission
-    from django.db.models import Sum, Avg
+    from apps.statistics.services import user_stats
 
-    try:
-        user = User.objects.get(id=user_id)
-    except User.DoesNotExist:
+    if not User.objects.filter(id=user_id).exists():
         return
 
-    stats, created = UserStatistics.objects.get_or_create(user=user)
+    user_stats.rebuild(user_id)
 
-    records = Submission.objects.filter(user=user, status=Submission.Status.FINISHED)
 
-    stats.exam_count = records.count()
-    stats.passed_count = sum(1 for r in records if r.is_passed)
+@shared_task
+def rollup_daily_statistics(days=None):
+    """
+    汇总每日统计快照，默认重新汇总最近几天
+    """
+    from datetime import timedelta
+
+    from django.utils import timezone
 
-    if records.exists():
-        score_data = records.aggregate(total=Sum('score'), avg=Avg('score'))
-        stats.total_score = score_data['total'] or 0
-        stats.average_score = score_data['avg']
+    from apps.statistics.services import trends
 
-    answers = Answer.objects.filter(submission__user=user, status=Answer.Status.GRADED)
-    stats.question_count = answers.count()
-    stats.correct_count = answers.filter(is_correct=True).count()
+    today = timezone.localdate()
+    days = days or trends.ROLLUP_LOOKBACK_DAYS
+    return sum(trends.rollup(today - timedelta(days=offset)) for offset in range(1, days + 1))
 
-    if stats.question_count > 0:
-        stats.accuracy_rate = round(stats.correct_count / stats.question_count * 100, 2)
 
-    stats.save()
+@shared_task
+def generate_exam_report(report_id):
+    """
+    生成考试成绩报表（CSV / XLSX）
+    """
+    from apps.statistics.models import ExamReport
+    from apps.statistics.services import report as report_service
+
+    try:
+        report = ExamReport.objects.select_related('exam__paper').get(id=report_id)
+    except ExamReport.DoesNotExist:
+        return None
+
+    try:
+        report_service.generate(report)
+    except Exception as exc:
+        ExamReport.objects.filter(id=report_id).update(status=ExamReport.Status.FAILED, error=str(exc))
+        raise
+    return report.row_count
 
 
 @shared_task
-def generate_exam_report(exam_id):
+def export_analytics(exam_id=None, start=None, end=None, fmt='parquet'):
     """
-    生成考试报告
+    导出离线分析数据到报表存储
+
+    Args:
+        start, end: ISO 格式的时间，答案创建时间范围 [start, end)，与 exam_id 至少指定一项
+
+    Returns:
+        {表名: 存储中的文件名}
     """
-    # TODO: 生成 PDF 报告
-    pass
+    import os
+    import tempfile
+
+    from django.core.files import File
+    from django.utils import timezone
+    from django.utils.dateparse import parse_datetime
+
+    from apps.statistics.services import export
+    from utils.storage import get_report_storage
+
+    if exam_id is None and not start and not end:
+        # 与 export_analytics 命令一致，不允许导出全部答案
+        raise ValueError('请指定 exam_id 或 start / end')
+
+    storage = get_report_storage()
+    scope = f'exam_{exam_id}' if exam_id is not None else 'range'
+    prefix = f'exports/{scope}_{timezone.localtime().strftime("%Y%m%d_%H%M%S")}'
+
+    names = {}
+    with tempfile.TemporaryDirectory() as directory:
+        result = export.export(
+            directory,
+            exam_id=exam_id,
+            start=parse_datetime(start) if start else None,
+            end=parse_datetime(end) if end else None,
+            fmt=fmt,
+        )
+        for name, (path, _) in result.items():
+            with open(path, 'rb') as fileobj:
+                names[name] = storage.save(f'{prefix}/{os.path.basename(path)}', File(fileobj))
+    return names
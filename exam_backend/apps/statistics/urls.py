@@ -7,8 +7,15 @@ from rest_framework.routers import DefaultRouter
 from apps.statistics.views import (
     StatisticsViewSet,
     ExamStatisticsView,
+    ExamScoreDistributionView,
     ExamRankingView,
+    MyExamRankingView,
     ExamQuestionAnalysisView,
+    ExamItemAnalysisView,
+    ExamTimingAnalysisView,
+    ExamReportView,
+    ExamReportDownloadView,
+    StatisticsTrendView,
 )
 
 router = DefaultRouter()
@@ -18,10 +25,24 @@ urlpatterns = [
     # RESTful 风格的考试统计 API
     # GET /api/statistics/exam/{id}/
     path('exam/<int:exam_id>/', ExamStatisticsView.as_view(), name='exam-statistics'),
+    # GET /api/statistics/exam/{id}/distribution/
+    path('exam/<int:exam_id>/distribution/', ExamScoreDistributionView.as_view(), name='exam-distribution'),
     # GET /api/statistics/exam/{id}/ranking/
     path('exam/<int:exam_id>/ranking/', ExamRankingView.as_view(), name='exam-ranking'),
+    # GET /api/statistics/exam/{id}/ranking/me/
+    path('exam/<int:exam_id>/ranking/me/', MyExamRankingView.as_view(), name='exam-ranking-me'),
     # GET /api/statistics/exam/{id}/question_analysis/
     path('exam/<int:exam_id>/question_analysis/', ExamQuestionAnalysisView.as_view(), name='exam-question-analysis'),
+    # GET /api/statistics/exam/{id}/item_analysis/
+    path('exam/<int:exam_id>/item_analysis/', ExamItemAnalysisView.as_view(), name='exam-item-analysis'),
+    # GET /api/statistics/exam/{id}/timing/
+    path('exam/<int:exam_id>/timing/', ExamTimingAnalysisView.as_view(), name='exam-timing-analysis'),
+    # GET / POST /api/statistics/exam/{id}/reports/
+    path('exam/<int:exam_id>/reports/', ExamReportView.as_view(), name='exam-reports'),
+    # GET /api/statistics/reports/{id}/download/
+    path('reports/<int:report_id>/download/', ExamReportDownloadView.as_view(), name='exam-report-download'),
+    # GET /api/statistics/trends/
+    path('trends/', StatisticsTrendView.as_view(), name='statistics-trends'),
 
     # 用户相关统计（保留 ViewSet 风格）
     path('', include(router.urls)),
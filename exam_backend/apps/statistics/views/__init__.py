@@ -1,13 +1,27 @@
 from .statistics import (
     StatisticsViewSet,
     ExamStatisticsView,
+    ExamScoreDistributionView,
     ExamRankingView,
+    MyExamRankingView,
     ExamQuestionAnalysisView,
+    ExamItemAnalysisView,
+    ExamTimingAnalysisView,
+    ExamReportView,
+    ExamReportDownloadView,
+    StatisticsTrendView,
 )
 
 __all__ = [
     'StatisticsViewSet',
     'ExamStatisticsView',
+    'ExamScoreDistributionView',
     'ExamRankingView',
+    'MyExamRankingView',
     'ExamQuestionAnalysisView',
+    'ExamItemAnalysisView',
+    'ExamTimingAnalysisView',
+    'ExamReportView',
+    'ExamReportDownloadView',
+    'StatisticsTrendView',
 ]
@@ -1,24 +1,38 @@
 """
 统计视图
 """
-from collections import defaultdict
+from datetime import timedelta
 
-from django.db.models import Avg, Count, Max, Min, Sum
+from django.db import transaction
+from django.http import FileResponse
 from django.shortcuts import get_object_or_404
-from rest_framework import viewsets
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.exams.models import Exam
-from apps.questions.models import Question
-from apps.statistics.models import ExamStatistics, UserStatistics
+from apps.statistics.models import DailyStatistics, ExamReport, ExamStatistics, UserStatistics
+from apps.statistics.services import (
+    distribution,
+    exam_stats,
+    history,
+    leaderboard,
+    mastery,
+    overview,
+    question_analysis,
+    report as report_service,
+    trends,
+)
 from apps.statistics.serializers import (
+    ExamReportSerializer,
     ExamStatisticsSerializer,
     UserStatisticsSerializer,
 )
-from apps.submissions.models import Answer, Submission
+from utils.exceptions import InvalidOperationException, ResourceNotFoundException
 from utils.permissions import IsTeacherOrAdmin
 
 
@@ -30,97 +44,94 @@ class ExamStatisticsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, exam_id):
-        """获取考试统计"""
-        exam = get_object_or_404(Exam, id=exam_id)
-        stats = self._calculate_exam_statistics(exam)
+        """获取考试统计（读取增量维护的统计行）"""
+        exam = get_object_or_404(Exam.objects.select_related('paper'), id=exam_id)
+        stats = exam_stats.get_or_rebuild(exam)
         return Response({
             'success': True,
-            'data': stats
+            'data': exam_stats.to_dict(stats, exam)
         })
 
-    def _calculate_exam_statistics(self, exam):
-        """计算考试统计数据"""
-        records = Submission.objects.filter(exam=exam)
-        finished_records = records.filter(status=Submission.Status.FINISHED)
-
-        stats = {
-            'exam_id': exam.id,
-            'exam_title': exam.title,
-            'participant_count': records.count(),
-            'submitted_count': records.filter(status__in=[
-                Submission.Status.SUBMITTED,
-                Submission.Status.GRADING,
-                Submission.Status.FINISHED
-            ]).count(),
-            'graded_count': finished_records.count(),
-        }
-
-        if finished_records.exists():
-            score_stats = finished_records.aggregate(
-                avg=Avg('score'),
-                max=Max('score'),
-                min=Min('score')
-            )
-            stats['average_score'] = round(float(score_stats['avg'] or 0), 2)
-            stats['highest_score'] = float(score_stats['max'] or 0)
-            stats['lowest_score'] = float(score_stats['min'] or 0)
-
-            # 及格率
-            pass_count = finished_records.filter(score__gte=exam.paper.pass_score).count()
-            stats['pass_rate'] = round(pass_count / finished_records.count() * 100, 2)
-
-            # 分数分布
-            distribution = {'0-59': 0, '60-69': 0, '70-79': 0, '80-89': 0, '90-100': 0}
-            for record in finished_records:
-                score = float(record.score or 0)
-                if score < 60:
-                    distribution['0-59'] += 1
-                elif score < 70:
-                    distribution['60-69'] += 1
-                elif score < 80:
-                    distribution['70-79'] += 1
-                elif score < 90:
-                    distribution['80-89'] += 1
-                else:
-                    distribution['90-100'] += 1
-            stats['score_distribution'] = distribution
-
-        return stats
+
+class ExamScoreDistributionView(APIView):
+    """
+    考试分数分布视图
+    GET /api/statistics/exam/{id}/distribution/?buckets=10
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, exam_id):
+        """获取分数分布（区间宽度为试卷总分 / buckets）、累计百分比与百分位数"""
+        exam = get_object_or_404(Exam.objects.select_related('paper'), id=exam_id)
+        buckets = _positive_int(request.query_params.get('buckets'), distribution.DEFAULT_BUCKETS)
+
+        return Response({
+            'success': True,
+            'data': distribution.get_distribution(exam, buckets)
+        })
 
 
 class ExamRankingView(APIView):
     """
     考试排名视图
-    GET /api/statistics/exam/{id}/ranking/
+    GET /api/statistics/exam/{id}/ranking/?page=1&page_size=50
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, exam_id):
+        """分页获取考试排名"""
+        get_object_or_404(Exam, id=exam_id)
+
+        page_number = _positive_int(request.query_params.get('page'), 1)
+        page_size = min(
+            _positive_int(request.query_params.get('page_size'), leaderboard.DEFAULT_PAGE_SIZE),
+            leaderboard.MAX_PAGE_SIZE
+        )
+        ranking, total = leaderboard.page(exam_id, page_number, page_size)
+
+        return Response({
+            'success': True,
+            'data': {
+                'count': total,
+                'total_pages': (total + page_size - 1) // page_size,
+                'current_page': page_number,
+                'page_size': page_size,
+                'results': ranking,
+            }
+        })
+
+
+class MyExamRankingView(APIView):
+    """
+    当前用户的考试排名
+    GET /api/statistics/exam/{id}/ranking/me/?neighbors=5
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, exam_id):
-        """获取考试排名"""
+        """获取当前用户的排名、百分位与相邻考生"""
         get_object_or_404(Exam, id=exam_id)
 
-        records = Submission.objects.filter(
-            exam_id=exam_id,
-            status=Submission.Status.FINISHED
-        ).select_related('user').order_by('-score', 'submit_time')
-
-        ranking = []
-        for rank, record in enumerate(records, 1):
-            ranking.append({
-                'rank': rank,
-                'user_id': record.user_id,
-                'user_name': record.user.username,
-                'score': record.score,
-                'duration': record.duration_seconds,
-                'submit_time': record.submit_time,
-            })
+        neighbors = min(_positive_int(request.query_params.get('neighbors'), leaderboard.DEFAULT_NEIGHBORS), 50)
+        data = leaderboard.my_rank(exam_id, request.user, neighbors)
+        if data is None:
+            raise ResourceNotFoundException('暂无已完成的考试成绩')
 
         return Response({
             'success': True,
-            'data': ranking
+            'data': data
         })
 
 
+def _positive_int(value, default):
+    """解析正整数查询参数，非法时使用默认值"""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
 class ExamQuestionAnalysisView(APIView):
     """
     考试题目分析视图
@@ -130,38 +141,161 @@ class ExamQuestionAnalysisView(APIView):
 
     def get(self, request, exam_id):
         """获取题目分析"""
+        exam = get_object_or_404(Exam.objects.select_related('paper'), id=exam_id)
+
+        return Response({
+            'success': True,
+            'data': question_analysis.get_analysis(exam)
+        })
+
+
+class ExamItemAnalysisView(APIView):
+    """
+    考试试题分析视图（难度、区分度、信度、干扰项）
+    GET /api/statistics/exam/{id}/item_analysis/
+    """
+    permission_classes = [IsTeacherOrAdmin]
+
+    def get(self, request, exam_id):
+        """获取试题分析，结果由统计任务预先计算"""
+        exam = get_object_or_404(Exam, id=exam_id)
+        question_stats = ExamStatistics.objects.filter(exam=exam).values_list(
+            'question_stats', flat=True
+        ).first() or {}
+
+        return Response({
+            'success': True,
+            'data': {
+                'sample_size': question_stats.get('sample_size', 0),
+                'alpha': question_stats.get('alpha'),
+                'kr20': question_stats.get('kr20'),
+                'items': question_stats.get('items', []),
+            }
+        })
+
+
+class ExamTimingAnalysisView(APIView):
+    """
+    考试作答用时分析视图（中位数、P90、离群值、用时与正误相关、过快作答）
+    GET /api/statistics/exam/{id}/timing/
+    """
+    permission_classes = [IsTeacherOrAdmin]
+
+    def get(self, request, exam_id):
+        """获取作答用时分析，结果由统计任务预先计算"""
         exam = get_object_or_404(Exam, id=exam_id)
+        question_stats = ExamStatistics.objects.filter(exam=exam).values_list(
+            'question_stats', flat=True
+        ).first() or {}
+        timing = question_stats.get('timing', {})
+
+        return Response({
+            'success': True,
+            'data': {
+                'sample_size': timing.get('sample_size', 0),
+                'items': timing.get('items', []),
+                'flagged_submissions': timing.get('flagged_submissions', []),
+            }
+        })
+
+
+class StatisticsTrendView(APIView):
+    """
+    每日趋势视图（教师/管理员）
+    GET /api/statistics/trends/?dimension=exam&id=1&start=2024-01-01&end=2024-01-31
+    """
+    permission_classes = [IsTeacherOrAdmin]
 
-        # 分析每道题的作答情况
-        analysis = []
-        for pq in exam.paper.paper_questions.select_related('question'):
-            answers = Answer.objects.filter(
-                submission__exam=exam,
-                paper_question=pq,
-                status=Answer.Status.GRADED
-            )
-
-            total = answers.count()
-            correct = answers.filter(is_correct=True).count()
-            avg_score = answers.aggregate(avg=Avg('score'))['avg'] or 0
-
-            analysis.append({
-                'question_id': pq.question.id,
-                'question_number': pq.question_number,
-                'question_title': pq.question.title[:50],
-                'question_type': pq.question.get_type_display(),
-                'max_score': float(pq.score),
-                'total_count': total,
-                'correct_count': correct,
-                'correct_rate': round(correct / total * 100, 2) if total > 0 else 0,
-                'average_score': round(float(avg_score), 2),
-            })
+    def get(self, request):
+        """读取每日统计快照，默认最近 30 天"""
+        dimension = request.query_params.get('dimension', DailyStatistics.Dimension.GLOBAL)
+        if dimension not in DailyStatistics.Dimension.values:
+            raise InvalidOperationException('无效的统计维度')
+
+        end = _date(request.query_params.get('end'), timezone.localdate())
+        start = _date(request.query_params.get('start'), end - timedelta(days=trends.DEFAULT_TREND_DAYS - 1))
+        if start > end or (end - start).days >= trends.MAX_TREND_DAYS:
+            raise InvalidOperationException(f'日期范围应在 {trends.MAX_TREND_DAYS} 天以内')
+
+        return Response({
+            'success': True,
+            'data': {
+                'dimension': dimension,
+                'start': start,
+                'end': end,
+                'series': trends.series(
+                    dimension, _positive_int(request.query_params.get('id'), None), start, end
+                ),
+            }
+        })
+
+
+def _date(value, default):
+    """解析 YYYY-MM-DD 查询参数"""
+    if not value:
+        return default
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise InvalidOperationException('日期格式应为 YYYY-MM-DD')
+    return parsed
+
+
+class ExamReportView(APIView):
+    """
+    考试成绩报表视图
+    GET /api/statistics/exam/{id}/reports/
+    POST /api/statistics/exam/{id}/reports/
+    """
+    permission_classes = [IsTeacherOrAdmin]
 
+    def get(self, request, exam_id):
+        """获取考试的报表列表"""
+        exam = get_object_or_404(Exam, id=exam_id)
+        serializer = ExamReportSerializer(exam.reports.all(), many=True)
         return Response({
             'success': True,
-            'data': analysis
+            'data': serializer.data
         })
 
+    def post(self, request, exam_id):
+        """创建报表，由异步任务生成"""
+        from apps.statistics.tasks import generate_exam_report
+
+        exam = get_object_or_404(Exam, id=exam_id)
+        serializer = ExamReportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report = serializer.save(exam=exam, created_by=request.user)
+        transaction.on_commit(lambda: generate_exam_report.delay(report.id))
+
+        return Response({
+            'success': True,
+            'message': '报表生成中',
+            'data': ExamReportSerializer(report).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class ExamReportDownloadView(APIView):
+    """
+    考试成绩报表下载视图
+    GET /api/statistics/reports/{id}/download/
+    """
+    permission_classes = [IsTeacherOrAdmin]
+
+    def get(self, request, report_id):
+        """从报表存储流式读取文件"""
+        report = get_object_or_404(ExamReport, id=report_id)
+        if report.status != ExamReport.Status.DONE:
+            raise InvalidOperationException('报表尚未生成完成')
+
+        return FileResponse(
+            report.file.open('rb'),
+            as_attachment=True,
+            filename=report_service.filename(report),
+        )
+
 
 class StatisticsViewSet(viewsets.ViewSet):
     """
@@ -175,11 +309,10 @@ class StatisticsViewSet(viewsets.ViewSet):
         获取当前用户学习统计
         GET /api/v1/statistics/my_statistics/
         """
-        user = request.user
-        stats, created = UserStatistics.objects.get_or_create(user=user)
-
-        if created or self._should_update(stats):
-            self._calculate_user_statistics(user, stats)
+        stats = UserStatistics.objects.select_related('user').filter(user=request.user).first()
+        if stats is None:
+            # 历史数据已由迁移补齐，没有统计行即尚无考试与答题记录
+            stats = UserStatistics(user=request.user)
 
         serializer = UserStatisticsSerializer(stats)
         return Response({
@@ -190,31 +323,19 @@ class StatisticsViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'])
     def my_exam_history(self, request):
         """
-        获取当前用户考试历史
-        GET /api/v1/statistics/my_exam_history/
+        获取当前用户考试历史（键集分页）
+        GET /api/v1/statistics/my_exam_history/?cursor=&page_size=20&compact=1
         """
-        records = Submission.objects.filter(
-            user=request.user
-        ).select_related('exam', 'exam__paper').order_by('-created_at')
-
-        history = []
-        for record in records:
-            history.append({
-                'exam_id': record.exam.id,
-                'exam_title': record.exam.title,
-                'score': record.score,
-                'total_score': record.exam.paper.total_score,
-                'pass_score': record.exam.paper.pass_score,
-                'is_passed': record.is_passed,
-                'status': record.get_status_display(),
-                'attempt': record.attempt,
-                'submit_time': record.submit_time,
-                'duration': record.duration_seconds,
-            })
+        page_size = min(
+            _positive_int(request.query_params.get('page_size'), history.DEFAULT_PAGE_SIZE),
+            history.MAX_PAGE_SIZE,
+        )
+        compact = request.query_params.get('compact') in ['1', 'true']
+        page = history.fetch_page(request.user.id, request.query_params.get('cursor'), page_size, compact)
 
         return Response({
             'success': True,
-            'data': history
+            'data': page
         })
 
     @action(detail=False, methods=['get'])
@@ -223,41 +344,9 @@ class StatisticsViewSet(viewsets.ViewSet):
         获取薄弱知识点
         GET /api/v1/statistics/my_weak_points/
         """
-        user = request.user
-
-        # 统计每个标签的正确率
-        tag_stats = defaultdict(lambda: {'correct': 0, 'total': 0})
-
-        answers = Answer.objects.filter(
-            submission__user=user,
-            status=Answer.Status.GRADED
-        ).select_related('paper_question__question')
-
-        for answer in answers:
-            question = answer.paper_question.question
-            for tag in question.tags.all():
-                tag_stats[tag.name]['total'] += 1
-                if answer.is_correct:
-                    tag_stats[tag.name]['correct'] += 1
-
-        # 计算正确率并排序
-        weak_points = []
-        for tag_name, stats in tag_stats.items():
-            if stats['total'] >= 5:  # 至少5道题才有意义
-                rate = stats['correct'] / stats['total'] * 100
-                if rate < 60:  # 正确率低于60%认为是薄弱点
-                    weak_points.append({
-                        'tag': tag_name,
-                        'correct_count': stats['correct'],
-                        'total_count': stats['total'],
-                        'correct_rate': round(rate, 2)
-                    })
-
-        weak_points.sort(key=lambda x: x['correct_rate'])
-
         return Response({
             'success': True,
-            'data': weak_points[:10]  # 返回前10个薄弱点
+            'data': mastery.weak_points(request.user.id)
         })
 
     @action(detail=False, methods=['get'], permission_classes=[IsTeacherOrAdmin])
@@ -266,121 +355,7 @@ class StatisticsViewSet(viewsets.ViewSet):
         获取系统总览（教师/管理员）
         GET /api/v1/statistics/overview/
         """
-        from django.utils import timezone
-        from apps.accounts.models import User
-
-        overview = {
-            'users': {
-                'total': User.objects.count(),
-                'students': User.objects.filter(role='student').count(),
-                'teachers': User.objects.filter(role='teacher').count(),
-            },
-            'questions': {
-                'total': Question.objects.filter(is_deleted=False).count(),
-                'by_type': {}
-            },
-            'exams': {
-                'total': Exam.objects.filter(is_deleted=False).count(),
-                'in_progress': Exam.objects.filter(status=Exam.Status.IN_PROGRESS).count(),
-            },
-            'submissions': {
-                'total': Submission.objects.count(),
-                'today': Submission.objects.filter(
-                    created_at__date=timezone.now().date()
-                ).count(),
-            }
-        }
-
-        for type_choice in Question.Type.choices:
-            overview['questions']['by_type'][type_choice[1]] = Question.objects.filter(
-                type=type_choice[0], is_deleted=False
-            ).count()
-
         return Response({
             'success': True,
-            'data': overview
+            'data': overview.get_overview()
         })
-
-    def _calculate_exam_statistics(self, exam):
-        """计算考试统计数据"""
-        records = Submission.objects.filter(exam=exam)
-        finished_records = records.filter(status=Submission.Status.FINISHED)
-
-        stats = {
-            'exam_id': exam.id,
-            'exam_title': exam.title,
-            'participant_count': records.count(),
-            'submitted_count': records.filter(status__in=[
-                Submission.Status.SUBMITTED,
-                Submission.Status.GRADING,
-                Submission.Status.FINISHED
-            ]).count(),
-            'graded_count': finished_records.count(),
-        }
-
-        if finished_records.exists():
-            score_stats = finished_records.aggregate(
-                avg=Avg('score'),
-                max=Max('score'),
-                min=Min('score')
-            )
-            stats['average_score'] = round(float(score_stats['avg'] or 0), 2)
-            stats['highest_score'] = float(score_stats['max'] or 0)
-            stats['lowest_score'] = float(score_stats['min'] or 0)
-
-            # 及格率
-            pass_count = finished_records.filter(score__gte=exam.paper.pass_score).count()
-            stats['pass_rate'] = round(pass_count / finished_records.count() * 100, 2)
-
-            # 分数分布
-            distribution = {'0-59': 0, '60-69': 0, '70-79': 0, '80-89': 0, '90-100': 0}
-            for record in finished_records:
-                score = float(record.score or 0)
-                if score < 60:
-                    distribution['0-59'] += 1
-                elif score < 70:
-                    distribution['60-69'] += 1
-                elif score < 80:
-                    distribution['70-79'] += 1
-                elif score < 90:
-                    distribution['80-89'] += 1
-                else:
-                    distribution['90-100'] += 1
-            stats['score_distribution'] = distribution
-
-        return stats
-
-    def _calculate_user_statistics(self, user, stats):
-        """计算用户统计数据"""
-        records = Submission.objects.filter(user=user, status=Submission.Status.FINISHED)
-
-        stats.exam_count = records.count()
-        stats.passed_count = sum(1 for r in records if r.is_passed)
-
-        if records.exists():
-            score_data = records.aggregate(total=Sum('score'), avg=Avg('score'))
-            stats.total_score = score_data['total'] or 0
-            stats.average_score = round(float(score_data['avg'] or 0), 2)
-
-        # 答题统计
-        answers = Answer.objects.filter(submission__user=user, status=Answer.Status.GRADED)
-        stats.question_count = answers.count()
-        stats.correct_count = answers.filter(is_correct=True).count()
-
-        if stats.question_count > 0:
-            stats.accuracy_rate = round(stats.correct_count / stats.question_count * 100, 2)
-
-        # 学习时长
-        stats.total_duration = sum(
-            (r.duration_seconds or 0) for r in records
-        )
-
-        stats.save()
-
-    def _should_update(self, stats):
-        """判断是否需要更新统计"""
-        from django.utils import timezone
-        if not stats.updated_at:
-            return True
-        # 如果超过1小时没更新，则更新
-        return (timezone.now() - stats.updated_at).seconds > 3600
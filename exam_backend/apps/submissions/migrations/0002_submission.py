@@ -0,0 +1,107 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:12
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_exam_records(apps, schema_editor):
+    """
+    将 exams.ExamRecord 迁移为 submissions.Submission（保留原 ID），
+    并把答题记录重新指向新的提交记录
+    """
+    ExamRecord = apps.get_model('exams', 'ExamRecord')
+    Submission = apps.get_model('submissions', 'Submission')
+    Answer = apps.get_model('submissions', 'Answer')
+
+    fields = [
+        'id', 'created_at', 'updated_at', 'exam_id', 'user_id', 'status', 'attempt',
+        'start_time', 'submit_time', 'end_time',
+        'score', 'objective_score', 'subjective_score',
+        'switch_count', 'ip_address', 'user_agent', 'question_order',
+    ]
+    batch = []
+    for record in ExamRecord.objects.all().iterator(chunk_size=2000):
+        batch.append(Submission(**{name: getattr(record, name) for name in fields}))
+        if len(batch) >= 2000:
+            Submission.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Submission.objects.bulk_create(batch)
+
+    Answer.objects.update(submission_id=models.F('exam_record_id'))
+
+    # 显式写入 ID 后需要重置序列（PostgreSQL）
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [Submission]):
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('exams', '0001_initial'),
+        ('submissions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Submission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('status', models.CharField(choices=[('not_started', '未开始'), ('in_progress', '进行中'), ('submitted', '已提交'), ('timeout', '超时'), ('grading', '阅卷中'), ('finished', '已完成')], default='not_started', max_length=20, verbose_name='状态')),
+                ('attempt', models.PositiveSmallIntegerField(default=1, verbose_name='尝试次数')),
+                ('start_time', models.DateTimeField(blank=True, null=True, verbose_name='开始答题时间')),
+                ('submit_time', models.DateTimeField(blank=True, null=True, verbose_name='提交时间')),
+                ('end_time', models.DateTimeField(blank=True, null=True, verbose_name='结束时间')),
+                ('score', models.DecimalField(blank=True, decimal_places=1, max_digits=6, null=True, verbose_name='得分')),
+                ('objective_score', models.DecimalField(blank=True, decimal_places=1, max_digits=6, null=True, verbose_name='客观题得分')),
+                ('subjective_score', models.DecimalField(blank=True, decimal_places=1, max_digits=6, null=True, verbose_name='主观题得分')),
+                ('switch_count', models.PositiveSmallIntegerField(default=0, verbose_name='切屏次数')),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True, verbose_name='IP地址')),
+                ('user_agent', models.TextField(blank=True, verbose_name='浏览器信息')),
+                ('question_order', models.JSONField(blank=True, default=list, verbose_name='题目顺序')),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='exams.exam', verbose_name='考试')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+            ],
+            options={
+                'verbose_name': '提交记录',
+                'verbose_name_plural': '提交记录',
+                'db_table': 'submissions',
+                'ordering': ['-created_at'],
+                'unique_together': {('exam', 'user', 'attempt')},
+            },
+        ),
+        migrations.AddField(
+            model_name='answer',
+            name='submission',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='submissions.submission', verbose_name='提交记录'),
+        ),
+        migrations.RunPython(copy_exam_records, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='answer',
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name='answer',
+            name='exam_record',
+        ),
+        migrations.AlterField(
+            model_name='answer',
+            name='submission',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='submissions.submission', verbose_name='提交记录'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='answer',
+            unique_together={('submission', 'paper_question')},
+        ),
+        migrations.AlterModelOptions(
+            name='answer',
+            options={'ordering': ['submission', 'paper_question__question_number'], 'verbose_name': '答题记录', 'verbose_name_plural': '答题记录'},
+        ),
+    ]
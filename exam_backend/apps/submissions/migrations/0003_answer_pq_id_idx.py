@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0002_submission'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['paper_question', 'id'], name='answers_pq_id_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:21
+
+from django.db import migrations, models
+
+BACKFILL_CHUNK_SIZE = 2000
+
+
+def backfill_option_mask(apps, schema_editor):
+    """按主键分批为已有选择题作答写入选项位掩码"""
+    Answer = apps.get_model('submissions', 'Answer')
+    Option = apps.get_model('questions', 'Option')
+
+    label_bits = {}
+
+    def load_bits(question_ids):
+        missing = set(question_ids) - set(label_bits)
+        if not missing:
+            return
+        for question_id in missing:
+            label_bits[question_id] = {}
+        options = Option.objects.filter(question_id__in=missing).order_by('question_id', 'order', 'label')
+        for question_id, label in options.values_list('question_id', 'label'):
+            bits = label_bits[question_id]
+            bits[label] = 1 << len(bits)
+
+    queryset = Answer.objects.filter(
+        paper_question__question__type__in=['single', 'multi'],
+    ).exclude(answer_content='').order_by('id')
+
+    last_id = 0
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id)
+            .values_list('id', 'answer_content', 'paper_question__question_id')[:BACKFILL_CHUNK_SIZE]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        load_bits(row[2] for row in rows)
+        updates = []
+        for answer_id, content, question_id in rows:
+            bits = label_bits[question_id]
+            mask = 0
+            for label in content.split(','):
+                label = label.strip()
+                if label:
+                    # 不属于该题的标签记为最高位之上的一位
+                    mask |= bits.get(label, 1 << len(bits))
+            updates.append(Answer(id=answer_id, option_mask=mask))
+        Answer.objects.bulk_update(updates, ['option_mask'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0002_attachment_checksum_attachment_mime_type_and_more'),
+        ('submissions', '0003_answer_pq_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='option_mask',
+            field=models.PositiveIntegerField(blank=True, help_text='选择题批改时写入，第 i 个选项（按顺序）对应 1 << i', null=True, verbose_name='选项位掩码'),
+        ),
+        migrations.AlterField(
+            model_name='answer',
+            name='answer_content',
+            field=models.TextField(blank=True, help_text='选择题存选项标识，其他题存文本', verbose_name='作答内容'),
+        ),
+        migrations.RunPython(backfill_option_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0004_answer_option_mask'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='submissions_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0005_submission_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='percentile_rank',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='百分位'),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='z_score',
+            field=models.DecimalField(blank=True, decimal_places=3, max_digits=6, null=True, verbose_name='标准分'),
+        ),
+    ]
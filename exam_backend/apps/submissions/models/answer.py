@@ -33,7 +33,13 @@ class Answer(TimeStampMixin, models.Model):
     )
 
     # 作答内容
-    answer_content = models.TextField('作答内容', blank=True, help_text='选择题存选项ID，其他题存文本')
+    answer_content = models.TextField('作答内容', blank=True, help_text='选择题存选项标识，其他题存文本')
+    option_mask = models.PositiveIntegerField(
+        '选项位掩码',
+        null=True,
+        blank=True,
+        help_text='选择题批改时写入，第 i 个选项（按顺序）对应 1 << i'
+    )
     answer_files = models.JSONField('作答附件', default=list, blank=True, help_text='编程题代码文件等')
 
     # 状态
@@ -72,6 +78,10 @@ class Answer(TimeStampMixin, models.Model):
         verbose_name_plural = verbose_name
         unique_together = [['submission', 'paper_question']]
         ordering = ['submission', 'paper_question__question_number']
+        indexes = [
+            # 阅卷答案流按 (paper_question, id) 键集分页
+            models.Index(fields=['paper_question', 'id'], name='answers_pq_id_idx'),
+        ]
 
     def __str__(self):
         return f'{self.submission.user.username} - 第{self.paper_question.question_number}题'
@@ -88,44 +98,18 @@ class Answer(TimeStampMixin, models.Model):
 
     def auto_grade(self):
         """
-        自动批改（客观题）
+        自动批改（客观题），按试卷 / 大题配置的评分策略计分
         返回是否成功批改
         """
-        question = self.question
+        from apps.grading.scoring import compile_rule
+
+        rule = compile_rule(self.paper_question)
 
         # 只有客观题才能自动批改
-        if not question.is_objective:
+        if rule is None:
             return False
 
-        correct_answer = question.answer
-        user_answer = self.answer_content
-
-        if question.type == 'single':
-            # 单选题：直接比较
-            self.is_correct = user_answer == correct_answer
-            self.score = self.max_score if self.is_correct else 0
-
-        elif question.type == 'multi':
-            # 多选题：比较集合
-            correct_set = set(correct_answer.split(','))
-            user_set = set(user_answer.split(',')) if user_answer else set()
-
-            if user_set == correct_set:
-                self.is_correct = True
-                self.score = self.max_score
-            elif user_set.issubset(correct_set) and user_set:
-                # 部分正确，给一半分
-                self.is_correct = False
-                self.score = self.max_score / 2
-            else:
-                self.is_correct = False
-                self.score = 0
-
-        elif question.type == 'judge':
-            # 判断题：比较
-            self.is_correct = user_answer.lower() == correct_answer.lower()
-            self.score = self.max_score if self.is_correct else 0
-
+        self.score, self.is_correct, self.option_mask = rule.grade(self.answer_content)
         self.status = self.Status.GRADED
         self.save()
 
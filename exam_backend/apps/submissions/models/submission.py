@@ -53,6 +53,10 @@ class Submission(TimeStampMixin, models.Model):
     objective_score = models.DecimalField('客观题得分', max_digits=6, decimal_places=1, null=True, blank=True)
     subjective_score = models.DecimalField('主观题得分', max_digits=6, decimal_places=1, null=True, blank=True)
 
+    # 在同场考试已完成评分的提交记录中的位置，随考试统计更新
+    percentile_rank = models.DecimalField('百分位', max_digits=5, decimal_places=2, null=True, blank=True)
+    z_score = models.DecimalField('标准分', max_digits=6, decimal_places=3, null=True, blank=True)
+
     # 防作弊记录
     switch_count = models.PositiveSmallIntegerField('切屏次数', default=0)
     ip_address = models.GenericIPAddressField('IP地址', null=True, blank=True)
@@ -67,6 +71,10 @@ class Submission(TimeStampMixin, models.Model):
         verbose_name_plural = verbose_name
         unique_together = [['exam', 'user', 'attempt']]
         ordering = ['-created_at']
+        indexes = [
+            # 用户考试历史的键集分页
+            models.Index(fields=['user', '-created_at', '-id'], name='submissions_user_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.username} - {self.exam.title}'
@@ -24,6 +24,7 @@ class SubmissionSerializer(serializers.ModelSerializer):
             'status', 'status_display', 'attempt',
             'start_time', 'submit_time', 'end_time',
             'score', 'objective_score', 'subjective_score', 'is_passed',
+            'percentile_rank', 'z_score',
             'switch_count', 'duration_seconds', 'remaining_time',
             'created_at'
         ]
@@ -0,0 +1,28 @@
+"""
+答题流程信号
+阅卷、统计等模块通过订阅这些信号维护各自的派生数据，
+提交 / 批改主流程只负责发送，不直接依赖下游模块
+"""
+from django.dispatch import Signal
+
+# 开始考试，新建了提交记录
+# kwargs: submission
+submission_started = Signal()
+
+# 交卷（含超时自动交卷），提交记录离开进行中状态
+# kwargs: submission
+submission_submitted = Signal()
+
+# 一批答案完成批改（自动批改、人工批改或重新批改）
+# kwargs: answers, previous
+#   previous: {answer_id: (status, is_correct, score)}，批改前的状态
+answer_graded = Signal()
+
+# 提交记录完成评分，状态变为已完成（含重新评分）
+# kwargs: submission, previous_score, was_finished
+submission_finished = Signal()
+
+
+def answer_state(answer):
+    """记录答案批改前的状态，作为 answer_graded 的 previous 值"""
+    return answer.status, answer.is_correct, answer.score
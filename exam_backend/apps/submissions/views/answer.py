@@ -65,7 +65,7 @@ class AnswerViewSet(viewsets.ReadOnlyModelViewSet):
         submission_id = request.query_params.get('submission_id')
 
         try:
-            submission = Submission.objects.get(id=submission_id, user=request.user)
+            submission = Submission.objects.select_related('exam__paper').get(id=submission_id, user=request.user)
         except Submission.DoesNotExist:
             raise ResourceNotFoundException('提交记录不存在')
 
@@ -92,6 +92,8 @@ class AnswerViewSet(viewsets.ReadOnlyModelViewSet):
                     'total_score': submission.exam.paper.total_score,
                     'pass_score': submission.exam.paper.pass_score,
                     'is_passed': submission.is_passed,
+                    'percentile_rank': submission.percentile_rank,
+                    'z_score': submission.z_score,
                 },
                 'answers': serializer.data
             }
@@ -9,6 +9,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.exams.models import Exam
+from apps.grading import scoring
 from apps.papers.models import PaperQuestion
 from apps.submissions.models import Answer, Submission
 from apps.submissions.serializers import (
@@ -17,6 +18,7 @@ from apps.submissions.serializers import (
     BatchAnswerSubmitSerializer,
     ExamSubmitSerializer,
 )
+from apps.submissions.signals import submission_finished, submission_submitted
 from utils.exceptions import (
     ExamEndedException,
     AlreadySubmittedException,
@@ -97,16 +99,8 @@ class SubmitViewSet(viewsets.ViewSet):
             submission.submit_time = now
             submission.save(update_fields=['status', 'submit_time'])
 
-            # 自动批改客观题
-            objective_score = 0
-            for answer in submission.answers.all():
-                if answer.question.is_objective:
-                    answer.auto_grade()
-                    if answer.score:
-                        objective_score += answer.score
-
-            submission.objective_score = objective_score
-            submission.save(update_fields=['objective_score'])
+            # 自动批改客观题（按试卷配置的评分策略）
+            objective_score = scoring.grade_submission(submission)
 
             # 检查是否需要人工阅卷
             has_subjective = submission.answers.filter(
@@ -122,6 +116,12 @@ class SubmitViewSet(viewsets.ViewSet):
 
             submission.save(update_fields=['status', 'score'])
 
+            submission_submitted.send(sender=Submission, submission=submission)
+            if submission.status == Submission.Status.FINISHED:
+                submission_finished.send(
+                    sender=Submission, submission=submission, previous_score=None, was_finished=False
+                )
+
         return Response({
             'success': True,
             'message': '考试已提交',
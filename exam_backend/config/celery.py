@@ -5,6 +5,7 @@ Celery configuration for exam_backend project.
 import os
 
 from celery import Celery
+from celery.schedules import crontab
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
@@ -30,6 +31,26 @@ app.conf.beat_schedule = {
         'task': 'apps.statistics.tasks.update_statistics',
         'schedule': 3600.0,  # 1 hour
     },
+    # 每分钟写回题目使用次数与正确次数
+    'flush-question-counters': {
+        'task': 'apps.questions.tasks.flush_question_counters',
+        'schedule': 60.0,
+    },
+    # 处理搜索索引发件箱（含退避后到期的重试）
+    'process-search-outbox': {
+        'task': 'apps.questions.tasks.process_search_outbox',
+        'schedule': 15.0,
+    },
+    # 定时重建题目倒排索引快照（未启用时任务直接返回）
+    'rebuild-search-index': {
+        'task': 'apps.questions.tasks.rebuild_search_index',
+        'schedule': 3600.0,
+    },
+    # 每天凌晨汇总每日统计快照
+    'rollup-daily-statistics': {
+        'task': 'apps.statistics.tasks.rollup_daily_statistics',
+        'schedule': crontab(hour=2, minute=0),
+    },
 }
 
 
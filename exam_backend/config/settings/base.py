@@ -279,6 +279,10 @@ if USE_ELASTICSEARCH:
     ELASTICSEARCH_PASSWORD = config('ELASTICSEARCH_PASSWORD', default='')
     ELASTICSEARCH_QUESTION_INDEX = config('ELASTICSEARCH_QUESTION_INDEX', default='questions')
 
+# ============ 进程内倒排索引搜索（可选，Elasticsearch 不可用时使用） ============
+USE_INVERTED_INDEX = config('USE_INVERTED_INDEX', default=False, cast=bool)
+SEARCH_INDEX_DIR = config('SEARCH_INDEX_DIR', default=str(BASE_DIR / 'search_index'))
+
 # ============ 日志配置 ============
 LOGGING = {
     'version': 1,
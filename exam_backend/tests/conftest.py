@@ -0,0 +1,104 @@
+"""
+测试公共夹具
+"""
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from config.celery import app as celery_app
+
+
+@pytest.fixture(autouse=True)
+def celery_eager():
+    """Celery 任务同步执行，测试无需消息队列"""
+    celery_app.conf.task_always_eager = True
+    yield
+    celery_app.conf.task_always_eager = False
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """各测试之间不共享缓存"""
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def make_user(db):
+    """构造用户：make_user('alice', role='student')"""
+    from apps.accounts.models import User
+
+    def _make_user(username, role='student'):
+        return User.objects.create_user(
+            username=username, email=f'{username}@example.com', password='testpass123', role=role
+        )
+
+    return _make_user
+
+
+@pytest.fixture
+def make_exam(db):
+    """
+    构造考试：make_exam(creator, [(type, answer, score), ...])
+    返回 (exam, [paper_question, ...])
+    """
+    from apps.exams.models import Exam
+    from apps.papers.models import Paper, PaperQuestion
+    from apps.questions.models import Option, Question
+
+    def _make_exam(creator, questions, status=Exam.Status.ENDED, total_score=100, pass_score=60):
+        paper = Paper.objects.create(
+            title='测试试卷', total_score=total_score, pass_score=pass_score, created_by=creator
+        )
+        paper_questions = []
+        for number, (question_type, answer, score) in enumerate(questions, 1):
+            question = Question.objects.create(
+                title=f'题目{number}', type=question_type, answer=answer, score=score, created_by=creator
+            )
+            if question_type in [Question.Type.SINGLE, Question.Type.MULTI]:
+                for order, label in enumerate('ABCD'):
+                    Option.objects.create(
+                        question=question, label=label, content=f'选项{label}',
+                        is_correct=label in answer.split(','), order=order
+                    )
+            paper_questions.append(PaperQuestion.objects.create(
+                paper=paper, question=question, score=score, question_number=number
+            ))
+
+        now = timezone.now()
+        exam = Exam.objects.create(
+            title='测试考试', paper=paper, status=status,
+            start_time=now - timedelta(hours=2), end_time=now + timedelta(hours=2),
+            created_by=creator,
+        )
+        return exam, paper_questions
+
+    return _make_exam
+
+
+@pytest.fixture
+def make_submission(db):
+    """
+    构造提交记录：make_submission(exam, user, {paper_question: answer_content}, status=...)
+    """
+    from apps.submissions.models import Answer, Submission
+
+    def _make_submission(exam, user, answers, status=Submission.Status.GRADING, score=None):
+        now = timezone.now()
+        submission = Submission.objects.create(
+            exam=exam, user=user, status=status, score=score,
+            attempt=Submission.objects.filter(exam=exam, user=user).count() + 1,
+            start_time=now - timedelta(minutes=30), submit_time=now,
+        )
+        for paper_question, content in answers.items():
+            Answer.objects.create(
+                submission=submission, paper_question=paper_question, answer_content=content,
+                status=Answer.Status.ANSWERED if content else Answer.Status.NOT_ANSWERED,
+            )
+        return submission
+
+    return _make_submission
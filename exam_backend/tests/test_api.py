@@ -115,12 +115,266 @@ class TestQuestionsAPI:
         response = authenticated_client.post('/api/v1/questions/', data, format='json')
         assert response.status_code == status.HTTP_201_CREATED
 
+    def test_statistics_single_query_cached(self, api_client, teacher_user, student_user,
+                                            django_assert_num_queries):
+        """测试题目统计按可见范围缓存"""
+        from apps.questions.models import Question
+
+        for question_type, difficulty, is_public in [('single', 1, True), ('single', 3, False), ('judge', 3, True)]:
+            Question.objects.create(
+                title='题目', type=question_type, difficulty=difficulty, answer='A',
+                is_public=is_public, created_by=teacher_user,
+            )
+
+        api_client.force_authenticate(user=teacher_user)
+        with django_assert_num_queries(1):
+            data = api_client.get('/api/v1/questions/statistics/').data['data']
+        assert (data['total'], data['by_type']['单选题'], data['by_difficulty']['困难']) == (3, 2, 2)
+        with django_assert_num_queries(0):
+            api_client.get('/api/v1/questions/statistics/')
+
+        api_client.force_authenticate(user=student_user)
+        data = api_client.get('/api/v1/questions/statistics/').data['data']
+        assert (data['total'], data['by_type']['单选题']) == (2, 1)
+
+    def test_search_falls_back_to_icontains(self, authenticated_client, teacher_user):
+        """测试非 PostgreSQL 数据库上的全文搜索降级"""
+        from apps.questions.models import Question
+
+        for title, content in [('牛顿第二定律', '力与加速度'), ('勾股定理', '直角三角形'), ('动量守恒', '牛顿摆')]:
+            Question.objects.create(title=title, content=content, type='short', answer='', created_by=teacher_user)
+
+        response = authenticated_client.get('/api/v1/questions/', {'q': '牛顿'})
+        titles = {item['title'] for item in response.data['data']['results']}
+        assert titles == {'牛顿第二定律', '动量守恒'}
+
+    def test_search_tokens_maintained_on_save(self, teacher_user):
+        """测试保存题目时维护中文分词字段"""
+        from apps.questions.models import Question
+        from apps.questions.services.tokenizer import query_text
+
+        question = Question.objects.create(
+            title='牛顿第二定律', content='F=ma 中的 a', type='short', answer='', created_by=teacher_user,
+        )
+        assert question.title_tokens == '牛 顿 第 二 定 律 牛顿 顿第 第二 二定 定律'
+        assert question.content_tokens == 'F=ma 中 的 中的 a'
+
+        question.title = '动量守恒'
+        question.save(update_fields=['title'])
+        question.refresh_from_db()
+        assert question.title_tokens == '动 量 守 恒 动量 量守 守恒'
+        # 查询切分出的二字词都包含在索引分词中
+        assert set(query_text('量守恒').split()) <= set(question.title_tokens.split())
+
     def test_unauthorized_access(self, api_client):
         """测试未认证访问"""
         response = api_client.get('/api/v1/questions/')
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+class TestInvertedIndex:
+    """进程内倒排索引搜索测试"""
+
+    @pytest.fixture(autouse=True)
+    def index_settings(self, settings, tmp_path, monkeypatch):
+        from apps.questions.services import inverted_index
+
+        settings.USE_INVERTED_INDEX = True
+        settings.SEARCH_INDEX_DIR = str(tmp_path)
+        monkeypatch.setattr(inverted_index, 'SYNC_INTERVAL', 0)
+        inverted_index.reset()
+        yield
+        inverted_index.reset()
+
+    @pytest.fixture
+    def questions(self, teacher_user):
+        from apps.questions.models import Question
+        from apps.tags.models import Tag
+
+        mechanics = Tag.objects.create(name='力学')
+        rows = [
+            ('牛顿第二定律', '物体加速度与合外力成正比', 'single', 1, True),
+            ('动量守恒', '牛顿摆演示动量守恒', 'short', 2, True),
+            ('Python generators', 'yield 关键字', 'short', 3, False),
+        ]
+        created = []
+        for title, content, question_type, difficulty, is_public in rows:
+            question = Question.objects.create(
+                title=title, content=content, type=question_type, difficulty=difficulty,
+                answer='', is_public=is_public, created_by=teacher_user,
+            )
+            created.append(question)
+        created[0].tags.add(mechanics)
+        created[1].tags.add(mechanics)
+        return created, mechanics
+
+    def test_bm25_ranking_facets_and_fuzzy(self, questions):
+        from apps.questions.services import inverted_index
+
+        (newton, momentum, generators), mechanics = questions
+        inverted_index.build()
+
+        result = inverted_index.search('牛顿', facets=True)
+        # 标题命中的权重高于内容命中
+        assert result['ids'] == [newton.id, momentum.id]
+        assert result['facets'] == {
+            'type': {'single': 1, 'short': 1},
+            'difficulty': {1: 1, 2: 1},
+            'tags': {mechanics.id: 2},
+        }
+        assert inverted_index.search('牛顿', type='short')['ids'] == [momentum.id]
+        assert inverted_index.search('守恒')['ids'] == [momentum.id]
+        assert inverted_index.search('pythn')['ids'] == [generators.id]
+        assert inverted_index.search('python', public_only=True)['total'] == 0
+
+    def test_incremental_updates_and_api(self, questions, authenticated_client,
+                                         django_capture_on_commit_callbacks):
+        from apps.questions.services import inverted_index
+
+        (newton, momentum, _), _ = questions
+        inverted_index.build()
+        assert inverted_index.search('牛顿')['total'] == 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            momentum.content = '碰撞前后总动量不变'
+            momentum.save()
+            newton.soft_delete()
+        assert inverted_index.search('牛顿')['ids'] == []
+        assert inverted_index.search('碰撞')['ids'] == [momentum.id]
+
+        # 重建快照后增量层合并进快照
+        inverted_index.build()
+        assert inverted_index.get_index().overlay == {}
+        data = authenticated_client.get('/api/v1/questions/search/', {'q': '动量'}).data['data']
+        assert [item['id'] for item in data['results']] == [momentum.id]
+        assert data['facets']['type'] == {'short': 1}
+
+        response = authenticated_client.get('/api/v1/questions/', {'q': '总动量'})
+        assert [item['id'] for item in response.data['data']['results']] == [momentum.id]
+
+
+class TestSearchOutbox:
+    """搜索索引发件箱测试"""
+
+    @pytest.fixture
+    def search_backend(self, monkeypatch):
+        from apps.questions.services.search import search_service
+
+        calls = {'index': [], 'delete': [], 'fail': False}
+
+        def bulk_index_questions(questions):
+            if calls['fail']:
+                raise ConnectionError('es down')
+            calls['index'].append({question.id: [tag.name for tag in question.tags.all()] for question in questions})
+            return {}
+
+        def bulk_delete_questions(question_ids):
+            if calls['fail']:
+                raise ConnectionError('es down')
+            calls['delete'].append(list(question_ids))
+            return {}
+
+        monkeypatch.setattr(search_service, 'use_elasticsearch', True, raising=False)
+        monkeypatch.setattr(search_service, 'es_client', object(), raising=False)
+        monkeypatch.setattr(search_service, 'bulk_index_questions', bulk_index_questions)
+        monkeypatch.setattr(search_service, 'bulk_delete_questions', bulk_delete_questions)
+        return calls
+
+    def test_changes_flow_through_outbox(self, authenticated_client, search_backend,
+                                         django_capture_on_commit_callbacks):
+        from django.utils import timezone
+
+        from apps.questions.models import Question, SearchOutbox
+        from apps.questions.services import outbox
+        from apps.tags.models import Tag
+
+        tag = Tag.objects.create(name='力学')
+        data = {'title': '牛顿第二定律', 'type': 'short', 'difficulty': 1, 'score': 5, 'answer': '', 'tag_ids': [tag.id]}
+
+        search_backend['fail'] = True
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.post('/api/v1/questions/', data, format='json')
+        question_id = Question.objects.get(title='牛顿第二定律').id
+        # 保存与标签各写一行，失败后按退避推迟
+        rows = list(SearchOutbox.objects.all())
+        assert len(rows) == 2
+        assert all(row.attempts == 1 and row.next_attempt_at > timezone.now() for row in rows)
+        assert 'es down' in rows[0].last_error
+
+        search_backend['fail'] = False
+        SearchOutbox.objects.update(next_attempt_at=timezone.now())
+        assert outbox.process() == (2, 0)
+        # 同一题目合并为一次索引，标签已预取
+        assert search_backend['index'] == [{question_id: ['力学']}]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.delete(f'/api/v1/questions/{question_id}/')
+        assert search_backend['delete'] == [[question_id]]
+        assert not SearchOutbox.objects.exists()
+
+    def test_reverse_clear_enqueues_questions(self, teacher_user, search_backend):
+        from django.db import connection
+
+        from apps.questions.models import Question, SearchOutbox
+        from apps.questions.services import outbox
+        from apps.tags.models import Tag
+
+        tag = Tag.objects.create(name='力学')
+        questions = [
+            Question.objects.create(title=f'题目{i}', type='short', difficulty=1, score=5, created_by=teacher_user)
+            for i in range(2)
+        ]
+        tag.questions.add(*questions)
+        SearchOutbox.objects.all().delete()
+
+        tag.questions.clear()
+        # 测试在同一事务内：建题、加标签、清除共写入多行，只登记一次处理任务
+        assert len([item for item in connection.run_on_commit if isinstance(item[1], outbox._Schedule)]) == 1
+        assert sorted(SearchOutbox.objects.values_list('question_id', flat=True)) == sorted(q.id for q in questions)
+
+    def test_gives_up_after_max_attempts(self, teacher_user, search_backend):
+        from apps.questions.models import SearchOutbox
+        from apps.questions.services import outbox
+
+        search_backend['fail'] = True
+        row = SearchOutbox.objects.create(question_id=1, attempts=outbox.MAX_ATTEMPTS - 1, next_attempt_at='2000-01-01T00:00Z')
+        assert outbox.process() == (0, 1)
+        row.refresh_from_db()
+        assert (row.attempts, row.next_attempt_at) == (outbox.MAX_ATTEMPTS, None)
+        assert outbox.backoff(1).total_seconds() == 30 and outbox.backoff(20) == outbox.MAX_DELAY
+
+    def test_bulk_response_errors(self, monkeypatch):
+        import sys
+        import types
+
+        from apps.questions.services.search import search_service
+
+        # helpers.bulk(raise_on_error=False) 的返回值：(成功数, 失败条目列表)
+        def bulk(client, actions, **kwargs):
+            assert kwargs == {'raise_on_error': False, 'raise_on_exception': True}
+            return 1, [
+                {'index': {'_index': 'questions', '_id': '3', 'status': 400,
+                           'error': {'type': 'mapper_parsing_exception', 'reason': 'failed to parse'}}},
+                {'delete': {'_index': 'questions', '_id': '5', 'status': 404, 'result': 'not_found'}},
+                {'delete': {'_index': 'questions', '_id': '6', 'status': 429}},
+            ]
+
+        helpers = types.ModuleType('elasticsearch.helpers')
+        helpers.bulk = bulk
+        monkeypatch.setitem(sys.modules, 'elasticsearch', types.ModuleType('elasticsearch'))
+        monkeypatch.setitem(sys.modules, 'elasticsearch.helpers', helpers)
+        monkeypatch.setattr(search_service, 'es_client', object(), raising=False)
+
+        actions = [{'_id': str(question_id)} for question_id in (3, 4, 5, 6)]
+        assert search_service._bulk(actions) == {
+            3: {'type': 'mapper_parsing_exception', 'reason': 'failed to parse'}, 5: 404, 6: 429,
+        }
+        # 删除时不存在的文档视为成功
+        assert search_service._bulk(actions, ignore_not_found=True) == {
+            3: {'type': 'mapper_parsing_exception', 'reason': 'failed to parse'}, 6: 429,
+        }
+
+
 class TestPapersAPI:
     """试卷 API 测试"""
 
@@ -0,0 +1,158 @@
+"""
+阅卷相关测试
+"""
+from rest_framework.test import APIClient
+
+from apps.grading import counters
+from apps.grading.models import ExamGradingCounter, PlagiarismMatch
+from apps.grading.plagiarism import MinHashLSH
+from apps.grading.tasks import detect_exam_plagiarism
+
+CODE = '''
+def fibonacci(n):
+    if n < 2:
+        return n
+    return fibonacci(n - 1) + fibonacci(n - 2)
+
+for i in range(10):
+    print(fibonacci(i))
+'''
+
+
+class TestPlagiarism:
+    """答案查重测试"""
+
+    def test_minhash_finds_near_duplicates(self):
+        texts = [
+            CODE,
+            CODE.replace('print(fibonacci(i))', 'print( fibonacci(i) )'),
+            '使用快速排序算法：选取基准值，将小于基准的元素放在左边，大于基准的放在右边，然后递归排序。',
+            'short',
+        ]
+        pairs = MinHashLSH(threshold=0.7).find_similar(texts)
+
+        assert [(i, j) for i, j, _ in pairs] == [(0, 1)]
+        assert pairs[0][2] >= 0.7
+
+    def test_oversized_bucket_reported_as_group(self):
+        texts = [CODE] * 6 + ['使用快速排序算法：选取基准值，将小于基准的元素放在左边，大于基准的放在右边，然后递归排序。']
+        detector = MinHashLSH(threshold=0.8, max_bucket_size=3)
+        pairs = detector.find_similar(texts)
+
+        # 雷同答案整组与首个答案配对，而不是被跳过
+        assert sorted((i, j) for i, j, _ in pairs) == [(0, j) for j in range(1, 6)]
+        assert detector.oversized_buckets > 0
+
+    def test_detect_exam_plagiarism(self, make_user, make_exam, make_submission):
+        teacher = make_user('teacher1', role='teacher')
+        exam, (pq,) = make_exam(teacher, [('programming', '', 10)])
+        first = make_submission(exam, make_user('s1'), {pq: CODE})
+        second = make_submission(exam, make_user('s2'), {pq: CODE + '\n# done'})
+        make_submission(exam, make_user('s3'), {pq: 'print("hello world, this answer is unrelated")'})
+
+        assert detect_exam_plagiarism(exam.id) == 1
+
+        match = PlagiarismMatch.objects.get(exam=exam)
+        assert {match.answer.submission_id, match.matched_answer.submission_id} == {first.id, second.id}
+
+
+class TestPendingExams:
+    """待阅卷考试测试"""
+
+    def test_counters_follow_grading(self, make_user, make_exam, make_submission, django_assert_num_queries):
+        teacher = make_user('teacher1', role='teacher')
+        exam, (single, short) = make_exam(teacher, [('single', 'A', 5), ('short', '', 10)])
+        first = make_submission(exam, make_user('s1'), {single: 'A', short: '答案一'})
+        make_submission(exam, make_user('s2'), {single: 'B', short: '答案二'})
+        counters.rebuild()
+
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/grading/pending_exams/')
+        assert response.data['data'] == [{
+            'exam_id': exam.id, 'exam_title': exam.title, 'pending_count': 2, 'total_records': 2,
+        }]
+
+        answer = first.answers.get(paper_question=short)
+        response = client.post('/api/v1/grading/grade_answer/', {'answer_id': answer.id, 'score': 8})
+        assert response.status_code == 200
+        assert ExamGradingCounter.objects.get(exam=exam).pending_count == 1
+
+        # 重新批改不重复扣减
+        client.post('/api/v1/grading/grade_answer/', {'answer_id': answer.id, 'score': 9})
+        assert ExamGradingCounter.objects.get(exam=exam).pending_count == 1
+
+    def test_submit_updates_counters(self, make_user, make_exam):
+        teacher = make_user('teacher1', role='teacher')
+        student = make_user('s1')
+        exam, (single, short) = make_exam(teacher, [('single', 'A', 5), ('short', '', 10)], status='in_progress')
+        exam.is_public = True
+        exam.save()
+
+        client = APIClient()
+        client.force_authenticate(user=student)
+        assert client.post(f'/api/v1/exams/{exam.id}/start/').status_code == 200
+        response = client.post(f'/api/v1/submissions/{exam.id}/submit/', {'answers': [
+            {'paper_question_id': single.id, 'answer_content': 'A'},
+            {'paper_question_id': short.id, 'answer_content': '我的答案'},
+        ]}, format='json')
+
+        assert response.data['data']['status'] == 'grading'
+        counter = ExamGradingCounter.objects.get(exam=exam)
+        assert (counter.submission_count, counter.pending_count) == (1, 1)
+
+
+class TestGradingFeed:
+    """阅卷答案流测试"""
+
+    def test_keyset_pages_with_prefetch(self, make_user, make_exam, make_submission):
+        from apps.grading import feed
+
+        teacher = make_user('teacher1', role='teacher')
+        exam, (short,) = make_exam(teacher, [('short', '', 10)])
+        for i in range(5):
+            make_submission(exam, make_user(f's{i}'), {short: f'答案{i}'})
+        counters.rebuild()
+
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+        response = client.get('/api/v1/grading/get_answers_to_grade/', {'exam_id': exam.id, 'page_size': 2})
+        seen = [item['id'] for item in response.data['data']]
+        cursor = response.data['next_cursor']
+        assert response.data['total'] == 5
+
+        # 下一页已被预取到缓存
+        _, from_cache = feed.get_page(teacher.id, str(exam.id), None, cursor, 2)
+        assert from_cache
+
+        while cursor:
+            response = client.get('/api/v1/grading/get_answers_to_grade/', {
+                'exam_id': exam.id, 'page_size': 2, 'cursor': cursor,
+            })
+            seen += [item['id'] for item in response.data['data']]
+            cursor = response.data['next_cursor']
+
+        assert seen == sorted(seen) and len(set(seen)) == 5
+
+    def test_total_follows_feed_filters(self, make_user, make_exam, make_submission):
+        from apps.submissions.models import Submission
+
+        teacher = make_user('teacher1', role='teacher')
+        exam, (short,) = make_exam(teacher, [('short', '', 10)])
+        deleted_exam, (deleted_short,) = make_exam(teacher, [('short', '', 10)])
+        make_submission(exam, make_user('s1'), {short: '答案'})
+        make_submission(exam, make_user('s2'), {short: '作答中'}, status=Submission.Status.IN_PROGRESS)
+        make_submission(deleted_exam, make_user('s3'), {deleted_short: '答案'})
+        deleted_exam.soft_delete()
+        counters.rebuild()
+
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+        response = client.get('/api/v1/grading/get_answers_to_grade/')
+        assert len(response.data['data']) == response.data['total'] == 1
+
+        # 计数器无法按题目过滤
+        response = client.get('/api/v1/grading/get_answers_to_grade/', {'question_id': short.question_id})
+        assert len(response.data['data']) == 1
+        assert response.data['total'] is None
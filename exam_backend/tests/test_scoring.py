@@ -0,0 +1,206 @@
+"""
+客观题评分策略测试
+"""
+from decimal import Decimal
+
+import pytest
+
+from apps.grading import scoring
+from apps.papers.models import Paper, PaperSection
+
+
+def _rule(question_type, answer, policy, config=None, max_score=4):
+    return scoring.CompiledRule(question_type, answer, max_score, scoring.get_policy(policy), config)
+
+
+class TestPolicies:
+    """各评分策略的计分规则"""
+
+    @pytest.mark.parametrize('policy,content,expected', [
+        (Paper.ScoringPolicy.HALF_CREDIT, 'A,B,C', '4.0'),
+        (Paper.ScoringPolicy.HALF_CREDIT, 'A', '2.0'),
+        (Paper.ScoringPolicy.HALF_CREDIT, 'A,D', '0.0'),
+        (Paper.ScoringPolicy.ALL_OR_NOTHING, 'A,B', '0.0'),
+        (Paper.ScoringPolicy.PROPORTIONAL, 'A,B', '2.7'),
+        (Paper.ScoringPolicy.PROPORTIONAL, 'A,B,D', '0.0'),
+        (Paper.ScoringPolicy.PER_OPTION_PENALTY, 'A,B,D', '1.3'),
+        (Paper.ScoringPolicy.PER_OPTION_PENALTY, 'A,D', '0.0'),
+        (Paper.ScoringPolicy.NEGATIVE_MARKING, 'A,B', '-1.0'),
+        (Paper.ScoringPolicy.NEGATIVE_MARKING, '', '0.0'),
+    ])
+    def test_multi(self, policy, content, expected):
+        score, is_correct = _rule('multi', 'A,B,C', policy).evaluate(content)
+        assert score == Decimal(expected)
+        assert is_correct is (content == 'A,B,C')
+
+    @pytest.mark.parametrize('policy', list(Paper.ScoringPolicy.values))
+    @pytest.mark.parametrize('answer', ['', '无'])
+    def test_multi_without_answer_key(self, policy, answer):
+        score, is_correct = _rule('multi', answer, policy).evaluate('A,B')
+        assert score <= 0
+        assert is_correct is False
+
+    def test_choice(self):
+        rule = _rule('judge', 'True', Paper.ScoringPolicy.NEGATIVE_MARKING, {'penalty': 0.5})
+        assert rule.evaluate('true') == (Decimal('4.0'), True)
+        assert rule.evaluate('false') == (Decimal('-2.0'), False)
+        assert rule.evaluate('') == (Decimal('0.0'), False)
+
+    def test_label_order_and_spacing(self):
+        rule = _rule('multi', 'A,C', Paper.ScoringPolicy.ALL_OR_NOTHING)
+        assert rule.evaluate('C, A') == (Decimal('4.0'), True)
+
+
+@pytest.mark.django_db
+class TestBatchGrading:
+    """按试卷 / 大题策略批量批改"""
+
+    def test_section_overrides_paper_policy(self, make_user, make_exam, make_submission):
+        from apps.grading.tasks import batch_auto_grade_exam
+        from apps.submissions.models import Answer, Submission
+
+        teacher = make_user('teacher', role='teacher')
+        exam, (single, multi_a, multi_b) = make_exam(teacher, [
+            ('single', 'A', 10), ('multi', 'A,B', 10), ('multi', 'A,B', 10),
+        ])
+        paper = exam.paper
+        paper.scoring_policy = Paper.ScoringPolicy.NEGATIVE_MARKING
+        paper.save(update_fields=['scoring_policy'])
+
+        section = PaperSection.objects.create(
+            paper=paper, title='二、多选题', scoring_policy=Paper.ScoringPolicy.PROPORTIONAL
+        )
+        multi_b.section = section
+        multi_b.save(update_fields=['section'])
+
+        students = [make_user(f'student{i}') for i in range(3)]
+        for student in students:
+            make_submission(exam, student, {single: 'B', multi_a: 'A', multi_b: 'A'},
+                            status=Submission.Status.SUBMITTED)
+
+        assert batch_auto_grade_exam(exam.id) == 3
+
+        scores = set(Answer.objects.filter(submission__exam=exam).values_list('paper_question_id', 'score'))
+        assert scores == {
+            (single.id, Decimal('-2.5')),
+            (multi_a.id, Decimal('-2.5')),
+            (multi_b.id, Decimal('5.0')),
+        }
+        for submission in Submission.objects.filter(exam=exam):
+            assert submission.status == Submission.Status.FINISHED
+            assert submission.score == Decimal('0.0')
+
+    def test_single_answer_auto_grade(self, make_user, make_exam, make_submission):
+        teacher = make_user('teacher', role='teacher')
+        exam, (multi,) = make_exam(teacher, [('multi', 'A,B', 6)])
+        submission = make_submission(exam, make_user('student'), {multi: 'B'})
+
+        answer = submission.answers.get()
+        assert answer.auto_grade() is True
+        answer.refresh_from_db()
+        assert answer.score == Decimal('3.0')
+        assert answer.is_correct is False
+
+    def test_option_mask_written_and_aggregated(self, make_user, make_exam, make_submission):
+        from apps.grading import scoring
+        from apps.statistics.services.options import option_selection_counts
+        from apps.submissions.models import Answer
+
+        teacher = make_user('teacher', role='teacher')
+        exam, (multi,) = make_exam(teacher, [('multi', 'A,C', 4)])
+        rules = scoring.compile_paper(exam.paper_id)
+        for i, content in enumerate(['A,C', 'C,A', 'A,B', 'D', 'A,X']):
+            scoring.grade_submission(make_submission(exam, make_user(f'student{i}'), {multi: content}), rules)
+
+        answers = Answer.objects.filter(paper_question=multi)
+        assert sorted(answers.values_list('option_mask', flat=True)) == [3, 5, 5, 8, 17]
+        assert answers.get(option_mask=17).is_correct is False
+        assert option_selection_counts(answers, 4) == [4, 1, 2, 1]
+
+
+class FakeHashes:
+    """测试用的最小 Redis 哈希实现"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        return []
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def rename(self, source, target):
+        self.data[target] = self.data.pop(source)
+
+    def hincrby(self, key, field, amount):
+        fields = self.data.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+
+    def hgetall(self, key):
+        return {field.encode(): str(value).encode() for field, value in self.data.get(key, {}).items()}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, token):
+        # 仅支持释放锁脚本
+        if self.data.get(key) == token:
+            del self.data[key]
+
+
+class TestQuestionCounters:
+    """题目使用次数与正确次数测试"""
+
+    @pytest.mark.parametrize('use_redis', [False, True])
+    def test_grading_updates_counters(self, use_redis, monkeypatch, make_user, make_exam, make_submission,
+                                      django_capture_on_commit_callbacks):
+        from apps.questions.services import counters
+        from apps.questions.tasks import flush_question_counters
+
+        fake = FakeHashes() if use_redis else None
+        monkeypatch.setattr(counters, 'get_redis', lambda: fake)
+
+        teacher = make_user('teacher', role='teacher')
+        exam, (single, judge) = make_exam(teacher, [('single', 'A', 50), ('judge', 'true', 50)])
+        rules = scoring.compile_paper(exam.paper_id)
+        for i, content in enumerate(['A', 'B', 'A']):
+            submission = make_submission(exam, make_user(f'student{i}'), {single: content, judge: 'false'})
+            with django_capture_on_commit_callbacks(execute=True):
+                scoring.grade_submission(submission, rules)
+
+        # 重新批改只调整正确次数
+        answer = single.answers.select_related('submission', 'paper_question').get(answer_content='B')
+        answer.answer_content = 'A'
+        answer.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            scoring.grade_answers([answer], rules)
+
+        if use_redis:
+            single.question.refresh_from_db()
+            assert single.question.use_count == 0
+            # 上一次写回仍持有锁时跳过，不会重复写回同一快照
+            fake.set(counters.FLUSH_LOCK_KEY, 'other')
+            assert flush_question_counters() == 0
+            fake.delete(counters.FLUSH_LOCK_KEY)
+            assert flush_question_counters() == 2
+            assert not fake.data
+
+        single.question.refresh_from_db()
+        judge.question.refresh_from_db()
+        assert (single.question.use_count, single.question.correct_count) == (3, 3)
+        assert (judge.question.use_count, judge.question.correct_count) == (3, 0)
+
+        assert counters.rebuild() == 2
+        single.question.refresh_from_db()
+        assert (single.question.use_count, single.question.correct_count) == (3, 3)
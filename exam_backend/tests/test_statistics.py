@@ -0,0 +1,782 @@
+"""
+统计相关测试
+"""
+from datetime import datetime, time
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+
+from apps.statistics.models import ExamStatistics
+from apps.statistics.services import exam_stats
+
+
+class TestExamStatistics:
+    """考试统计增量维护测试"""
+
+    def test_incremental_matches_rebuild(self, make_user, make_exam, django_capture_on_commit_callbacks,
+                                         django_assert_num_queries):
+        teacher = make_user('teacher1', role='teacher')
+        exam, (single, short) = make_exam(teacher, [('single', 'A', 40), ('short', '', 60)], status='in_progress')
+        exam.is_public = True
+        exam.save()
+
+        client = APIClient()
+        for i, choice in enumerate(['A', 'B', 'A']):
+            client.force_authenticate(user=make_user(f's{i}'))
+            with django_capture_on_commit_callbacks(execute=True):
+                client.post(f'/api/v1/exams/{exam.id}/start/')
+            with django_capture_on_commit_callbacks(execute=True):
+                client.post(f'/api/v1/submissions/{exam.id}/submit/', {'answers': [
+                    {'paper_question_id': single.id, 'answer_content': choice},
+                    {'paper_question_id': short.id, 'answer_content': '作答'},
+                ]}, format='json')
+
+        client.force_authenticate(user=teacher)
+        for answer, score in zip(short.answers.order_by('submission__user__username'), [10, 55, 55]):
+            with django_capture_on_commit_callbacks(execute=True):
+                client.post('/api/v1/grading/grade_answer/', {'answer_id': answer.id, 'score': score})
+
+        # 重新评分：移除旧分数后计入新分数
+        answer = short.answers.order_by('submission__user__username').first()
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post('/api/v1/grading/grade_answer/', {'answer_id': answer.id, 'score': 20})
+
+        stats = ExamStatistics.objects.get(exam=exam)
+        assert stats.score_frequencies == {'60.0': 1, '55.0': 1, '95.0': 1}
+        assert (stats.participant_count, stats.submitted_count, stats.graded_count) == (3, 3, 3)
+        assert stats.median_score == Decimal('60.00')
+        assert stats.pass_count == 2
+
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/statistics/exam/{exam.id}/')
+        data = response.data['data']
+        assert data['average_score'] == 70.0
+        assert (data['highest_score'], data['lowest_score']) == (95.0, 55.0)
+        assert data['score_distribution']['60-69'] == 1
+
+        incremental = {field: getattr(stats, field) for field in exam_stats.SCORE_FIELDS[:-2]}
+        rebuilt = exam_stats.rebuild(exam)
+        assert {field: getattr(rebuilt, field) for field in exam_stats.SCORE_FIELDS[:-2]} == incremental
+
+    def test_missing_row_counts_submission_once(self, make_user, make_exam, django_capture_on_commit_callbacks):
+        teacher = make_user('teacher1', role='teacher')
+        exam, (single,) = make_exam(teacher, [('single', 'A', 100)], status='in_progress')
+        exam.is_public = True
+        exam.save()
+
+        client = APIClient()
+        client.force_authenticate(user=make_user('s1'))
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(f'/api/v1/exams/{exam.id}/start/')
+        # 进行中的考试统计行被清空（如迁移 0002），交卷与评分的增量在同一事务内投递
+        ExamStatistics.objects.filter(exam=exam).delete()
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(f'/api/v1/submissions/{exam.id}/submit/', {'answers': [
+                {'paper_question_id': single.id, 'answer_content': 'A'},
+            ]}, format='json')
+
+        stats = ExamStatistics.objects.get(exam=exam)
+        assert (stats.submitted_count, stats.graded_count) == (1, 1)
+        assert stats.score_sum == 100
+        assert stats.score_frequencies == {'100.0': 1}
+        assert stats.is_dirty
+
+        # 建行前的参与人数由定时重建补齐
+        stats = exam_stats.rebuild(exam)
+        assert (stats.participant_count, stats.submitted_count, stats.graded_count) == (1, 1, 1)
+
+    def test_update_statistics_only_rebuilds_dirty(self, make_user, make_exam, make_submission,
+                                                    django_capture_on_commit_callbacks):
+        from apps.statistics.tasks import update_statistics
+
+        teacher = make_user('teacher1', role='teacher')
+        dirty_exam, (pq,) = make_exam(teacher, [('single', 'A', 100)])
+        clean_exam, _ = make_exam(teacher, [('single', 'A', 100)])
+        exam_stats.rebuild(dirty_exam)
+        exam_stats.rebuild(clean_exam)
+
+        make_submission(dirty_exam, make_user('s1'), {pq: 'A'}, status='finished', score=100)
+        with django_capture_on_commit_callbacks(execute=True):
+            exam_stats.mark_dirty([dirty_exam.id])
+
+        assert update_statistics() == 1
+        dirty, clean = ExamStatistics.objects.get(exam=dirty_exam), ExamStatistics.objects.get(exam=clean_exam)
+        assert (dirty.is_dirty, dirty.graded_count, dirty.version) == (False, 1, 3)
+        assert clean.version == 1
+
+
+class TestQuestionAnalysis:
+    """题目分析测试"""
+
+    def test_grouped_analysis_cached_by_version(self, make_user, make_exam, make_submission,
+                                                django_assert_num_queries, django_capture_on_commit_callbacks):
+        from apps.grading import scoring
+
+        teacher = make_user('teacher1', role='teacher')
+        exam, questions = make_exam(teacher, [('multi', 'A,B', 10)] + [('single', 'A', 5)] * 5)
+        multi = questions[0]
+        exam_stats.rebuild(exam)
+        rules = scoring.compile_paper(exam.paper_id)
+        for i, content in enumerate(['A,B', 'A', 'B,C']):
+            submission = make_submission(exam, make_user(f's{i}'), {pq: content for pq in questions})
+            with django_capture_on_commit_callbacks(execute=True):
+                scoring.grade_submission(submission, rules)
+        multi.answers.update(answer_duration=30)
+
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+        url = f'/api/v1/statistics/exam/{exam.id}/question_analysis/'
+        # 考试、统计行、试卷题目、选项、分组聚合
+        with django_assert_num_queries(5):
+            data = client.get(url).data['data']
+        assert len(data) == 6
+        assert (data[0]['total_count'], data[0]['correct_count'], data[0]['average_duration']) == (3, 1, 30.0)
+        assert data[0]['option_counts'] == [
+            {'label': 'A', 'count': 2}, {'label': 'B', 'count': 2},
+            {'label': 'C', 'count': 1}, {'label': 'D', 'count': 0},
+        ]
+
+        with django_assert_num_queries(2):
+            client.get(url)
+
+        # 重新批改使版本号变化，缓存失效
+        with django_capture_on_commit_callbacks(execute=True):
+            scoring.grade_answers(list(multi.answers.select_related('submission')), rules)
+        with django_assert_num_queries(5):
+            client.get(url)
+
+
+class TestItemAnalysis:
+    """试题分析测试"""
+
+    def test_compute_metrics(self):
+        import numpy as np
+
+        from apps.statistics.services.item_analysis import compute
+
+        scores = np.array([[1, 1, 1], [1, 1, 0], [1, 0, 0], [0, 0, 0]], dtype=float)
+        masks = np.array([[1, 1, 1], [1, 1, 2], [1, 2, 2], [2, 2, 2]])
+        metrics = compute(scores, [1, 1, 1], masks, [2, 2, 2])
+
+        assert np.allclose(metrics['difficulty'], [0.75, 0.5, 0.25])
+        assert np.allclose(metrics['discrimination'], [1, 1, 1])
+        assert metrics['alpha'] == pytest.approx(0.75)
+        assert metrics['kr20'] == pytest.approx(0.75)
+        assert (metrics['point_biserial'] > 0).all()
+        overall, upper, lower = metrics['options']
+        assert overall[0].tolist() == [0.75, 0.25]
+        assert (upper[0].tolist(), lower[0].tolist()) == ([1, 0], [0, 1])
+
+    def test_task_stores_question_stats(self, make_user, make_exam, make_submission):
+        from apps.grading import scoring
+        from apps.statistics.tasks import analyze_exam_items
+
+        teacher = make_user('teacher1', role='teacher')
+        exam, (single, multi) = make_exam(teacher, [('single', 'A', 5), ('multi', 'A,B', 5)])
+        rules = scoring.compile_paper(exam.paper_id)
+        for i, (first, second) in enumerate([('A', 'A,B'), ('A', 'A'), ('B', 'C'), ('C', 'A,B')]):
+            submission = make_submission(exam, make_user(f's{i}'), {single: first, multi: second}, status='finished')
+            scoring.grade_submission(submission, rules)
+
+        assert analyze_exam_items(exam.id) == 4
+
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+        data = client.get(f'/api/v1/statistics/exam/{exam.id}/item_analysis/').data['data']
+        assert data['sample_size'] == 4
+        first_item = data['items'][0]
+        assert first_item['difficulty'] == 0.5
+        assert [option['proportion'] for option in first_item['options']] == [0.5, 0.25, 0.25, 0.0]
+
+
+class TestTiming:
+    """作答用时分析测试"""
+
+    def test_compute_matches_numpy(self):
+        import numpy as np
+
+        from apps.statistics.services.timing import compute
+
+        columns = np.array([0, 0, 0, 0, 0, 1, 1, 1, 1])
+        durations = np.array([30, 40, 50, 60, 5, 10, 20, 30, 200], dtype=float)
+        correct = np.array([True, True, False, False, True, False, True, True, True])
+        metrics = compute(columns, durations, correct, 3)
+
+        assert metrics['count'].tolist() == [5, 4, 0]
+        assert metrics['median'][:2].tolist() == [40, 25]
+        assert metrics['p90'][0] == pytest.approx(np.percentile(durations[:5], 90))
+        assert metrics['p90'][1] == pytest.approx(np.percentile(durations[5:], 90))
+        assert np.isnan(metrics['median'][2])
+        assert metrics['fast'].tolist() == [False] * 4 + [True] + [False] * 4
+        assert metrics['fast_correct_count'].tolist() == [1, 0, 0]
+        assert metrics['outlier_count'].tolist() == [0, 1, 0]
+        assert metrics['correct_median'][0] == 30 and metrics['incorrect_median'][0] == 55
+        assert metrics['correlation'][0] == pytest.approx(np.corrcoef(durations[:5], correct[:5])[0, 1])
+
+    def test_task_stores_timing(self, make_user, make_exam, make_submission):
+        from apps.grading import scoring
+        from apps.statistics.tasks import rebuild_exam_statistics
+        from apps.submissions.models import Answer
+
+        teacher = make_user('teacher1', role='teacher')
+        exam, questions = make_exam(teacher, [('single', 'A', 5)] * 4)
+        rules = scoring.compile_paper(exam.paper_id)
+        for i in range(5):
+            submission = make_submission(exam, make_user(f's{i}'), {pq: 'A' for pq in questions}, status='finished')
+            # 最后一位考生每题只用 2 秒
+            submission.answers.update(answer_duration=2 if i == 4 else 60 + i)
+            scoring.grade_submission(submission, rules)
+        flagged = Answer.objects.filter(answer_duration=2).values_list('submission_id', flat=True).first()
+
+        rebuild_exam_statistics([exam.id])
+
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+        data = client.get(f'/api/v1/statistics/exam/{exam.id}/timing/').data['data']
+        assert data['sample_size'] == 5
+        assert data['items'][0]['median'] == 61
+        assert data['items'][0]['fast_count'] == 1
+        assert data['flagged_submissions'] == [{'submission_id': flagged, 'fast_count': 4, 'answer_count': 4}]
+
+
+class FakeSortedSets:
+    """测试用的最小 Redis 有序集合实现"""
+
+    def __init__(self):
+        self.data = {}
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def rename(self, source, target):
+        self.data[target] = self.data.pop(source)
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update({str(member): score for member, score in mapping.items()})
+
+    def zrem(self, key, member):
+        self.data.get(key, {}).pop(str(member), None)
+
+    def zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    def _ordered(self, key):
+        return sorted(self.data.get(key, {}).items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+    def zrevrange(self, key, start, end):
+        return [member.encode() for member, _ in self._ordered(key)[start:end + 1]]
+
+    def zrevrank(self, key, member):
+        members = [item[0] for item in self._ordered(key)]
+        return members.index(str(member)) if str(member) in members else None
+
+
+class TestLeaderboard:
+    """考试排行榜测试"""
+
+    @pytest.fixture
+    def ranked_exam(self, make_user, make_exam, make_submission):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        teacher = make_user('teacher1', role='teacher')
+        exam, (pq,) = make_exam(teacher, [('single', 'A', 100)])
+        now = timezone.now()
+        users = {}
+        for i, (score, minutes) in enumerate([(80, 3), (95, 5), (80, 1), (60, 2), (70, 4)]):
+            users[i] = make_user(f's{i}')
+            submission = make_submission(exam, users[i], {pq: 'A'}, status='finished', score=score)
+            submission.submit_time = now - timedelta(minutes=minutes)
+            submission.save(update_fields=['submit_time'])
+        return exam, users
+
+    @pytest.mark.parametrize('use_redis', [False, True])
+    def test_pages_and_my_rank(self, ranked_exam, monkeypatch, use_redis, django_capture_on_commit_callbacks):
+        from apps.statistics.services import leaderboard
+
+        exam, users = ranked_exam
+        fake = FakeSortedSets() if use_redis else None
+        monkeypatch.setattr(leaderboard, 'get_redis', lambda: fake)
+
+        client = APIClient()
+        client.force_authenticate(user=users[0])
+        data = client.get(f'/api/v1/statistics/exam/{exam.id}/ranking/?page=1&page_size=3').data['data']
+        assert (data['count'], data['total_pages']) == (5, 2)
+        # 同分时先交卷者在前
+        assert [entry['user_id'] for entry in data['results']] == [users[1].id, users[0].id, users[2].id]
+
+        data = client.get(f'/api/v1/statistics/exam/{exam.id}/ranking/me/?neighbors=1').data['data']
+        assert (data['rank'], data['total'], data['percentile']) == (2, 5, 75.0)
+        assert [entry['rank'] for entry in data['neighbors']] == [1, 2, 3]
+
+        # 重新评分后排名更新
+        submission = exam.submissions.get(user=users[3])
+        submission.score = 99
+        submission.save(update_fields=['score'])
+        with django_capture_on_commit_callbacks(execute=True):
+            leaderboard.record(submission)
+        assert client.get(f'/api/v1/statistics/exam/{exam.id}/ranking/me/').data['data']['rank'] == 3
+
+
+    @pytest.mark.parametrize('use_redis', [False, True])
+    def test_ties_ordered_the_same_in_both_backends(self, use_redis, monkeypatch, make_user, make_exam,
+                                                    make_submission):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from apps.statistics.services import leaderboard
+
+        fake = FakeSortedSets() if use_redis else None
+        monkeypatch.setattr(leaderboard, 'get_redis', lambda: fake)
+
+        teacher = make_user('teacher1', role='teacher')
+        exam, (pq,) = make_exam(teacher, [('single', 'A', 100)])
+        second = timezone.now().replace(microsecond=0)
+        users, ids = [], []
+        # 同分且同一秒交卷（微秒不同，后建的更早）：按 ID 升序；ID 跨位数以覆盖成员的字典序
+        for i in range(12):
+            users.append(make_user(f's{i}'))
+            submission = make_submission(exam, users[-1], {pq: 'A'}, status='finished', score=80)
+            submission.submit_time = second + timedelta(microseconds=900000 - i)
+            submission.save(update_fields=['submit_time'])
+            ids.append(submission.id)
+
+        entries, total = leaderboard.page(exam.id, 1, 20)
+        assert total == 12
+        assert [entry['submission_id'] for entry in entries] == sorted(ids)
+        assert leaderboard.my_rank(exam.id, users[5])['rank'] == 6
+
+
+class TestScoreDistribution:
+    """分数分布测试"""
+
+    def test_buckets_relative_to_total_score(self, make_user, make_exam, make_submission,
+                                             django_assert_num_queries):
+        teacher = make_user('teacher1', role='teacher')
+        exam, (pq,) = make_exam(teacher, [('short', '', 150)], total_score=150, pass_score=90)
+        for i, score in enumerate([0, 14.5, 15, 88, 150]):
+            make_submission(exam, make_user(f's{i}'), {pq: '作答'}, status='finished', score=score)
+        stats = exam_stats.rebuild(exam)
+        assert list(stats.score_distribution) == ['0-89', '90-104', '105-119', '120-134', '135-150']
+
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+        url = f'/api/v1/statistics/exam/{exam.id}/distribution/?buckets=10'
+        data = client.get(url).data['data']
+        assert data['bucket_width'] == 15.0
+        assert [bucket['count'] for bucket in data['buckets']] == [2, 1, 0, 0, 0, 1, 0, 0, 0, 1]
+        assert data['buckets'][1]['cumulative_percentage'] == 60.0
+        assert data['percentiles']['p50'] == 15.0
+        assert data['percentiles']['p25'] == 14.5
+
+        # 考试与统计行，分布命中缓存
+        with django_assert_num_queries(2):
+            client.get(url)
+
+
+class TestTagMastery:
+    """知识点掌握情况测试"""
+
+    def test_incremental_matches_rebuild(self, make_user, make_exam, make_submission,
+                                         django_capture_on_commit_callbacks, django_assert_num_queries):
+        from apps.grading import scoring
+        from apps.statistics.models import UserStatistics, UserTagMastery
+        from apps.statistics.services import mastery
+        from apps.tags.models import Tag
+
+        teacher = make_user('teacher1', role='teacher')
+        student = make_user('s1')
+        UserStatistics.objects.create(user=student)
+        weak, strong = Tag.objects.create(name='递归'), Tag.objects.create(name='排序')
+        exam, questions = make_exam(teacher, [('single', 'A', 10)] * 6)
+        for pq in questions:
+            pq.question.tags.add(weak)
+        for pq in questions[:3]:
+            pq.question.tags.add(strong)
+
+        rules = scoring.compile_paper(exam.paper_id)
+        submission = make_submission(exam, student, dict(zip(questions, 'AABBBB')))
+        with django_capture_on_commit_callbacks(execute=True):
+            scoring.grade_submission(submission, rules)
+
+        # 重新批改只调整正确数
+        answer = submission.answers.select_related('submission', 'paper_question').get(paper_question=questions[0])
+        answer.answer_content = 'C'
+        answer.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            scoring.grade_answers([answer], rules)
+
+        counts = dict(UserTagMastery.objects.values_list('tag__name', 'correct_count'))
+        assert counts == {'递归': 1, '排序': 1}
+        assert UserTagMastery.objects.get(tag=weak).total_count == 6
+
+        client = APIClient()
+        client.force_authenticate(user=student)
+        with django_assert_num_queries(1):
+            data = client.get('/api/v1/statistics/my_weak_points/').data['data']
+        assert data == [{'tag': '递归', 'correct_count': 1, 'total_count': 6, 'correct_rate': 16.67}]
+        assert UserStatistics.objects.get(user=student).weak_tags == data
+
+        incremental = set(UserTagMastery.objects.values_list('tag_id', 'correct_count', 'total_count'))
+        assert mastery.rebuild([student.id]) == 2
+        assert set(UserTagMastery.objects.values_list('tag_id', 'correct_count', 'total_count')) == incremental
+
+
+class TestUserStatistics:
+    """用户学习统计增量维护测试"""
+
+    def test_incremental_matches_rebuild(self, make_user, make_exam, make_submission,
+                                         django_capture_on_commit_callbacks, django_assert_num_queries):
+        from apps.grading.tasks import _grade_submission
+        from apps.statistics.models import UserStatistics
+        from apps.statistics.services import user_stats
+
+        teacher = make_user('teacher1', role='teacher')
+        student = make_user('s1')
+        UserStatistics.objects.create(user=student)
+        first_exam, first = make_exam(teacher, [('single', 'A', 50), ('single', 'B', 50)])
+        second_exam, second = make_exam(teacher, [('single', 'A', 100)])
+
+        for exam, questions, contents in [(first_exam, first, 'AC'), (second_exam, second, 'A')]:
+            submission = make_submission(exam, student, dict(zip(questions, contents)))
+            with django_capture_on_commit_callbacks(execute=True):
+                _grade_submission(submission)
+
+        # 重新评分：第一场考试改为满分
+        answer = first[1].answers.select_related('submission', 'paper_question').get()
+        answer.answer_content = 'B'
+        answer.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            _grade_submission(answer.submission)
+
+        client = APIClient()
+        client.force_authenticate(user=student)
+        with django_assert_num_queries(1):
+            data = client.get('/api/v1/statistics/my_statistics/').data['data']
+        assert (data['exam_count'], data['passed_count'], data['question_count'], data['correct_count']) == (2, 2, 3, 3)
+        assert Decimal(data['total_score']) == 200
+        assert data['total_duration'] == 3600
+
+        fields = user_stats.REBUILD_FIELDS
+        incremental = UserStatistics.objects.filter(user=student).values(*fields).get()
+        user_stats.rebuild(student.id)
+        assert UserStatistics.objects.filter(user=student).values(*fields).get() == incremental
+
+    def test_first_exam_without_statistics_row(self, make_user, make_exam, make_submission,
+                                               django_capture_on_commit_callbacks):
+        from apps.grading.tasks import _grade_submission
+        from apps.statistics.models import UserStatistics
+        from apps.statistics.services import user_stats
+
+        teacher = make_user('teacher1', role='teacher')
+        student = make_user('s1')
+        exam, questions = make_exam(teacher, [('single', 'A', 100)])
+        submission = make_submission(exam, student, {questions[0]: 'A'})
+
+        # 批改与完成评分的增量在同一事务内投递，统计行不存在时不能重复计入
+        assert not UserStatistics.objects.filter(user=student).exists()
+        with django_capture_on_commit_callbacks(execute=True):
+            _grade_submission(submission)
+
+        stats = UserStatistics.objects.get(user=student)
+        assert (stats.exam_count, stats.passed_count, stats.question_count, stats.correct_count) == (1, 1, 1, 1)
+        assert stats.total_score == 100
+
+        fields = user_stats.REBUILD_FIELDS
+        incremental = UserStatistics.objects.filter(user=student).values(*fields).get()
+        user_stats.rebuild(student.id)
+        assert UserStatistics.objects.filter(user=student).values(*fields).get() == incremental
+
+    def test_migration_backfills_missing_rows(self, make_user, make_exam, make_submission,
+                                              django_capture_on_commit_callbacks):
+        import importlib
+
+        from django.apps import apps
+
+        from apps.grading.tasks import _grade_submission
+        from apps.statistics.models import UserStatistics
+        from apps.statistics.services import user_stats
+
+        teacher = make_user('teacher1', role='teacher')
+        student = make_user('s1')
+        exam, questions = make_exam(teacher, [('single', 'A', 50), ('single', 'B', 50)])
+        with django_capture_on_commit_callbacks(execute=True):
+            _grade_submission(make_submission(exam, student, dict(zip(questions, 'AB'))))
+        rebuilt = UserStatistics.objects.filter(user=student).values(*user_stats.REBUILD_FIELDS).get()
+
+        # 部署前的历史数据：尚无统计行，查询接口返回零值且不在请求中重建
+        UserStatistics.objects.all().delete()
+        client = APIClient()
+        client.force_authenticate(user=student)
+        assert client.get('/api/v1/statistics/my_statistics/').data['data']['exam_count'] == 0
+        assert not UserStatistics.objects.exists()
+
+        migration = importlib.import_module('apps.statistics.migrations.0007_backfill_user_statistics')
+        migration.backfill_user_statistics(apps, None)
+        assert UserStatistics.objects.filter(user=student).values(*user_stats.REBUILD_FIELDS).get() == rebuilt
+        assert not UserStatistics.objects.filter(user=teacher).exists()
+
+
+class TestOverview:
+    """系统总览测试"""
+
+    def test_one_query_per_table_and_cached(self, make_user, make_exam, make_submission, django_assert_num_queries):
+        teacher = make_user('teacher1', role='teacher')
+        exam, questions = make_exam(teacher, [('single', 'A', 50), ('judge', 'A', 50)], status='in_progress')
+        make_submission(exam, make_user('s1'), {questions[0]: 'A'})
+
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+        # 用户、题目、考试、提交记录总数、当天提交数
+        with django_assert_num_queries(5):
+            data = client.get('/api/v1/statistics/overview/').data['data']
+        assert data['users'] == {'total': 2, 'students': 1, 'teachers': 1}
+        assert data['questions']['total'] == 2
+        assert data['questions']['by_type']['判断题'] == 1
+        assert data['exams'] == {'total': 1, 'in_progress': 1}
+        assert data['submissions'] == {'total': 1, 'today': 1}
+
+        with django_assert_num_queries(0):
+            client.get('/api/v1/statistics/overview/')
+
+
+class TestExamReport:
+    """考试成绩报表测试"""
+
+    @pytest.fixture
+    def graded_exam(self, make_user, make_exam, make_submission, settings, tmp_path):
+        from apps.grading.tasks import _grade_submission
+
+        settings.MEDIA_ROOT = str(tmp_path)
+        teacher = make_user('teacher1', role='teacher')
+        exam, questions = make_exam(teacher, [('single', 'A', 40), ('judge', 'true', 60)])
+        for i, contents in enumerate([('A', 'true'), ('B', 'true'), ('A', '')]):
+            submission = make_submission(exam, make_user(f's{i}'), dict(zip(questions, contents)))
+            _grade_submission(submission)
+        return teacher, exam
+
+    def _create(self, client, exam, report_format, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(f'/api/v1/statistics/exam/{exam.id}/reports/', {'format': report_format})
+        assert response.status_code == 202
+        reports = client.get(f'/api/v1/statistics/exam/{exam.id}/reports/').data['data']
+        assert (reports[0]['status'], reports[0]['row_count']) == ('done', 3)
+        response = client.get(reports[0]['download_url'])
+        assert response.status_code == 200
+        return b''.join(response.streaming_content)
+
+    def test_csv(self, graded_exam, django_capture_on_commit_callbacks):
+        teacher, exam = graded_exam
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+
+        lines = self._create(client, exam, 'csv', django_capture_on_commit_callbacks).decode('utf-8-sig').splitlines()
+        assert lines[0].endswith('第1题(40分),第2题(60分)')
+        rows = [line.split(',') for line in lines[1:4]]
+        assert [row[1] for row in rows] == ['s0', 's1', 's2']
+        assert [(row[3], row[6], row[-2], row[-1]) for row in rows] == [
+            ('100.0', '是', '40.0', '60.0'), ('60.0', '是', '0.0', '60.0'), ('40.0', '否', '40.0', '0.0'),
+        ]
+        assert '平均分,66.67' in lines
+
+    def test_xlsx(self, graded_exam, django_capture_on_commit_callbacks):
+        import io
+
+        from openpyxl import load_workbook
+
+        teacher, exam = graded_exam
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+
+        content = self._create(client, exam, 'xlsx', django_capture_on_commit_callbacks)
+        workbook = load_workbook(io.BytesIO(content), read_only=True)
+        assert workbook.sheetnames == ['成绩', '汇总', '题目']
+        rows = list(workbook['成绩'].iter_rows(values_only=True))
+        assert len(rows) == 4
+        assert (rows[1][3], rows[3][3], rows[3][6]) == (100, 40, '否')
+        questions = list(workbook['题目'].iter_rows(values_only=True))
+        assert questions[1][:5] == (1, '单选题', 40, 3, 2)
+
+
+class TestAnalyticsExport:
+    """离线分析数据导出测试"""
+
+    @pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+    def test_export_typed_columns(self, fmt, make_user, make_exam, make_submission, tmp_path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        from apps.grading.tasks import _grade_submission
+        from apps.statistics.services import export
+
+        teacher = make_user('teacher1', role='teacher')
+        exam, questions = make_exam(teacher, [('multi', 'A,B', 40), ('short', '', 60)])
+        other, (other_question,) = make_exam(teacher, [('single', 'A', 100)])
+        for i, content in enumerate(['A,B', 'A', 'C']):
+            _grade_submission(make_submission(exam, make_user(f's{i}'), dict(zip(questions, [content, '作答']))))
+        make_submission(other, make_user('other'), {other_question: 'A'})
+
+        result = export.export(str(tmp_path), exam_id=exam.id, fmt=fmt, chunk_size=2)
+        assert {name: count for name, (_, count) in result.items()} == {
+            'answers': 6, 'submissions': 3, 'questions': 2,
+        }
+
+        path = result['answers'][0]
+        if fmt == 'parquet':
+            table = pq.read_table(path)
+        else:
+            with pa.memory_map(path) as source:
+                table = pa.ipc.open_file(source).read_all()
+        assert table.num_rows == 6
+        assert pa.types.is_dictionary(table.schema.field('question_type').type)
+        assert table.schema.field('score').type == pa.float64()
+        assert table.schema.field('option_mask').type == pa.uint32()
+
+        rows = sorted(
+            zip(*[table.column(name).to_pylist() for name in ['question_type', 'option_mask', 'is_correct', 'score']]),
+            key=lambda row: (row[0], row[1] or 0),
+        )
+        assert rows[:3] == [('multi', 1, False, 20.0), ('multi', 3, True, 40.0), ('multi', 4, False, 0.0)]
+        assert [row[:3] for row in rows[3:]] == [('short', None, None)] * 3
+
+
+    def test_task_requires_scope(self):
+        from apps.statistics.tasks import export_analytics
+
+        with pytest.raises(ValueError):
+            export_analytics()
+
+class TestExamHistory:
+    """用户考试历史测试"""
+
+    def test_keyset_pages_with_annotations(self, make_user, make_exam, make_submission, django_assert_num_queries):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from apps.submissions.models import Submission
+
+        teacher = make_user('teacher1', role='teacher')
+        student = make_user('s1')
+        exam, (pq,) = make_exam(teacher, [('single', 'A', 100)])
+        now = timezone.now()
+        for attempt, score in enumerate([30, 80, None, 60, 90], 1):
+            submission = make_submission(exam, student, {pq: 'A'}, status='finished', score=score)
+            # 前两条创建时间相同，由 id 区分先后
+            Submission.objects.filter(id=submission.id).update(
+                created_at=now - timedelta(minutes=max(attempt, 2)), attempt=attempt
+            )
+
+        client = APIClient()
+        client.force_authenticate(user=student)
+        url = '/api/v1/statistics/my_exam_history/'
+        with django_assert_num_queries(1):
+            page = client.get(url, {'page_size': 2}).data['data']
+        assert [item['attempt'] for item in page['results']] == [2, 1]
+        assert page['results'][0]['exam_title'] == '测试考试'
+        assert [item['is_passed'] for item in page['results']] == [True, False]
+        assert page['results'][0]['duration'] == 1800
+
+        page = client.get(url, {'page_size': 2, 'cursor': page['next_cursor'], 'compact': 1}).data['data']
+        assert [(item['attempt'], item['is_passed']) for item in page['results']] == [(3, None), (4, True)]
+        assert 'exam_title' not in page['results'][0]
+        assert page['exams'][exam.id]['pass_score'] == 60
+
+        page = client.get(url, {'page_size': 2, 'cursor': page['next_cursor']}).data['data']
+        assert [item['attempt'] for item in page['results']] == [5]
+        assert page['next_cursor'] is None
+
+        assert client.get(url, {'cursor': 'invalid'}).status_code == 400
+
+
+class TestTrends:
+    """每日统计快照测试"""
+
+    def test_rollup_and_series(self, make_user, make_exam, make_submission, django_assert_num_queries):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from apps.grading.tasks import _grade_submission
+        from apps.tags.models import Category
+        from apps.statistics.models import DailyStatistics
+        from apps.statistics.tasks import rollup_daily_statistics
+        from apps.submissions.models import Submission
+
+        teacher = make_user('teacher1', role='teacher')
+        exam, (single, judge) = make_exam(teacher, [('single', 'A', 40), ('judge', 'true', 60)])
+        category = Category.objects.create(name='数学')
+        single.question.category = category
+        single.question.save()
+
+        yesterday = timezone.localdate() - timedelta(days=1)
+        moment = timezone.make_aware(datetime.combine(yesterday, time(10)))
+        for i, contents in enumerate([('A', 'true'), ('B', 'true')]):
+            submission = make_submission(exam, make_user(f's{i}'), dict(zip((single, judge), contents)))
+            _grade_submission(submission)
+            Submission.objects.filter(id=submission.id).update(created_at=moment, submit_time=moment)
+
+        assert rollup_daily_statistics(days=2) == 3
+        row = DailyStatistics.objects.get(date=yesterday, dimension='exam', dimension_id=exam.id)
+        assert (row.submission_count, row.active_users, row.finished_count, row.score_sum) == (2, 2, 2, 160)
+        assert (row.answer_count, row.correct_count) == (4, 3)
+
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+        with django_assert_num_queries(1):
+            data = client.get('/api/v1/statistics/trends/', {'dimension': 'category'}).data['data']
+        (point,) = data['series'][category.id]
+        assert (point['date'], point['answer_count'], point['correct_rate'], point['answer_score_rate']) == (
+            yesterday, 2, 50.0, 50.0,
+        )
+
+        data = client.get('/api/v1/statistics/trends/', {'start': str(yesterday), 'end': str(yesterday)}).data['data']
+        assert data['series'][0][0]['average_score'] == 80.0
+        assert client.get('/api/v1/statistics/trends/', {'dimension': 'unknown'}).status_code == 400
+
+
+class TestStanding:
+    """百分位与标准分测试"""
+
+    def test_incremental_matches_window_pass(self, make_user, make_exam, make_submission,
+                                             django_capture_on_commit_callbacks):
+        from apps.grading.tasks import _grade_submission
+        from apps.statistics.services import standing
+        from apps.submissions.models import Submission
+
+        teacher = make_user('teacher1', role='teacher')
+        exam, questions = make_exam(teacher, [('single', 'A', 50), ('single', 'A', 50)])
+        exam.paper.show_answer_after_submit = True
+        exam.paper.save()
+        exam_stats.rebuild(exam)
+
+        students = []
+        for i, contents in enumerate([('A', 'A'), ('A', 'B'), ('B', 'A'), ('B', 'B')]):
+            students.append(make_user(f's{i}'))
+            submission = make_submission(exam, students[-1], dict(zip(questions, contents)))
+            with django_capture_on_commit_callbacks(execute=True):
+                _grade_submission(submission)
+
+        # 最后一份交卷时已能看到全部成绩
+        last = Submission.objects.get(user=students[-1])
+        assert (last.percentile_rank, last.z_score) == (Decimal('0.00'), Decimal('-1.414'))
+
+        # 之前交卷的提交记录由延迟的整场重算更新（测试中任务同步执行）
+        expected = {'s0': Decimal('100.00'), 's1': Decimal('33.33'), 's2': Decimal('33.33'), 's3': Decimal('0.00')}
+        assert dict(Submission.objects.values_list('user__username', 'percentile_rank')) == expected
+
+        stats = ExamStatistics.objects.get(exam=exam)
+        assert standing.rebuild(exam, stats) == 4
+        assert dict(Submission.objects.values_list('user__username', 'percentile_rank')) == expected
+
+        client = APIClient()
+        client.force_authenticate(user=students[0])
+        first = Submission.objects.get(user=students[0])
+        data = client.get('/api/v1/submissions/answers/result/', {'submission_id': first.id}).data['data']
+        assert (data['submission']['percentile_rank'], data['submission']['z_score']) == (Decimal('100.00'), Decimal('1.414'))
@@ -0,0 +1,40 @@
+"""
+数据库查询工具
+"""
+from django.db import connection
+from django.db.models import Count, Q
+
+# 估算行数低于该值时改为精确计数，小表的 COUNT(*) 本身足够快
+APPROXIMATE_COUNT_THRESHOLD = 100000
+
+
+def choice_counts(field, choices, prefix=None):
+    """
+    按枚举值分别计数的条件聚合，配合 aggregate 在一次查询中得到各取值的数量
+
+    Returns:
+        {f'{prefix}{value}': Count(...)}
+    """
+    prefix = prefix if prefix is not None else f'{field}_'
+    return {
+        f'{prefix}{value}': Count('pk', filter=Q(**{field: value}))
+        for value, _ in choices
+    }
+
+
+def approximate_count(model, threshold=APPROXIMATE_COUNT_THRESHOLD):
+    """
+    表的近似行数
+    PostgreSQL 上读取 pg_class.reltuples（由 VACUUM / ANALYZE 维护），不扫描表；
+    其他数据库、表尚未分析或行数较少时返回精确计数
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= threshold:
+            return int(row[0])
+    return model._default_manager.count()
@@ -0,0 +1,23 @@
+"""
+Redis 连接
+复用 django-redis 缓存后端的连接池；缓存后端不是 Redis（如开发环境的本地内存缓存）时返回 None，
+调用方据此回退到数据库实现
+"""
+
+
+def get_redis(alias='default'):
+    """
+    获取 Redis 原生客户端
+
+    Returns:
+        redis.Redis 或 None
+    """
+    try:
+        from django_redis import get_redis_connection
+    except ImportError:
+        return None
+
+    try:
+        return get_redis_connection(alias)
+    except NotImplementedError:
+        return None
@@ -115,3 +115,24 @@ def get_media_storage():
     else:
         from django.core.files.storage import FileSystemStorage
         return FileSystemStorage()
+
+
+def get_report_storage():
+    """获取导出报表存储实例（私有，下载时鉴权）"""
+    storage_backend = getattr(settings, 'FILE_STORAGE_BACKEND', 'local')
+
+    if storage_backend == 'minio':
+        return PrivateMinIOStorage(
+            bucket_name=getattr(settings, 'MINIO_REPORTS_BUCKET', 'exam-reports')
+        )
+    elif storage_backend == 'aliyun_oss':
+        return AliyunOSSStorage(
+            bucket_name=getattr(settings, 'ALIYUN_OSS_REPORTS_BUCKET', 'exam-reports')
+        )
+    elif storage_backend == 's3':
+        return S3Boto3Storage(
+            bucket_name=getattr(settings, 'AWS_REPORTS_BUCKET', 'exam-reports')
+        )
+    else:
+        from django.core.files.storage import FileSystemStorage
+        return FileSystemStorage()